@@ -11,29 +11,180 @@ LinkedIn: https://www.linkedin.com/in/daniel-eduardo-lopez
 
 # Run this app with 'python 4-Dashboard.py' and
 # visit http://127.0.0.1:8050/ in your web browser.
+# In production, serve it with several worker processes through wsgi.py, for instance:
+# gunicorn --preload --workers 4 --bind 0.0.0.0:8050 'wsgi:create_app()'
 
 # Import required libraries
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import copy
 import numpy as np
 import pandas as pd
 import dash
+import flask
 from dash import html
 from dash import dcc
-from dash.dependencies import Input, Output
+from dash import no_update
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
 import plotly.express as px
-
-# Read the Job data into a Pandas dataframe
-df = pd.read_csv("https://raw.githubusercontent.com/DanielEduardoLopez/DataJobsMX2022/main/Dataset_Clean.csv").rename(columns = {'Average Salary': 'Salary'})
-
-max_salary = df['Salary'].max()
-min_salary = df['Salary'].min()
+from plotly.utils import PlotlyJSONEncoder
+from filter_index import FilterIndex, column_codes
+from figure_cache import FigureCache, dataset_fingerprint, filter_key, SALARY_STEP
+from filter_store import FilterStore, key_to_json, key_from_json
+from geo import load_states_geojson, GEOJSON_PATH
+from data_loader import load_dataset, source_stamp, DATASET_CSV, SNAPSHOT_DIR
+from dataset_reload import SwapLock, DatasetWatcher, row_delta, worth_refreshing
+from box_stats import group_box_statistics
+from aggregates import group_aggregates
+from figure_patch import figure_patch, payload_bytes, TransferStats
+from option_search import build_option_index
+from salary_tests import salary_groups, omnibus_tests, pairwise_tests
+from metrics import Registry, SamplingProfiler, span, SIZE_BUCKETS
+from figure_bundle import open_bundle, source_digest, common_filter_keys, BUNDLE_DIR
+from client_data import client_payload, CLIENT_MAX_ROWS
+
+# Read the Job data into a Pandas dataframe, from the local columnar snapshot of 'Dataset_Clean.csv'
+# (built the first time and whenever the CSV file changes), with Job, Company and Location as categoricals.
+# DASHBOARD_DATASET may point to another CSV file or to the store filled by pipeline.py (partial results),
+# and DASHBOARD_SNAPSHOT to another directory for the snapshot of the CSV file.
+# The arrays of the snapshot are mapped read-only, so the worker processes of a WSGI server share their pages
+dataset_source = (os.environ.get('DASHBOARD_DATASET', DATASET_CSV), os.environ.get('DASHBOARD_SNAPSHOT', SNAPSHOT_DIR))
+dataset_stamp = source_stamp(*dataset_source)
+df = load_dataset(*dataset_source).rename(columns = {'Average Salary': 'Salary'}, copy = False)
+
+# Inverted index over Job, Location and Company for filtering the data in the callbacks, with the sorted index of the
+# salaries for the salary range (see filter_index.py)
+filter_index = FilterIndex(df)
+
+# Bounds and marks of the salary slider, from the salaries of the dataset rounded to the slider step
+min_salary, max_salary = filter_index.salary_index.bounds()
+salary_marks = filter_index.salary_index.marks()
+
+# Search indexes of the options of the Company and Location dropdowns: the layout only holds the values with the most
+# vacancies, and the other ones are searched on the server as the user types (see option_search.py)
+option_indexes = {'company_dropdown': build_option_index(df['Company']),
+                  'location_dropdown': build_option_index(df['Location'])}
+
+# Client-side filtering (DASHBOARD_CLIENT_FILTERING=1): datasets of up to DASHBOARD_CLIENT_MAX_ROWS rows are sent once to
+# the browser as dictionary-encoded typed arrays, and the filter state and the six plots are computed there by the
+# clientside callbacks of assets/client_filtering.js (see client_data.py); larger datasets are still filtered on the server
+client_filtering = (os.environ.get('DASHBOARD_CLIENT_FILTERING', '0') != '0' and
+                    len(df) <= int(os.environ.get('DASHBOARD_CLIENT_MAX_ROWS', CLIENT_MAX_ROWS)))
+
+# Server-side store of the filtered row sets, shared by the callbacks of the six plots
+filter_store = FilterStore(filter_index, maxsize=64)
+
+# Cache of the figures per filter state, bound to the fingerprint of the dataset
+figure_cache = FigureCache(maxsize=128)
+dataset_token = dataset_fingerprint(df)
+
+# Partial updates of the figures: after the first render, only the changed properties are sent (see figure_patch.py),
+# and the bytes of the full figures and of the updates actually sent are counted per plot
+partial_updates = os.environ.get('DASHBOARD_PARTIAL_UPDATES', '1') != '0'
+transfer_stats = TransferStats()
+
+# Metrics of the callbacks, exposed in the Prometheus text format on /metrics: duration of each stage (filter, select,
+# plot, patch, serialize), latency of each callback and size of the payloads, and counters of the caches
+# (DASHBOARD_METRICS=0 turns the timing spans off). The sampling profiler writes one profile per callback call
+# into the directory DASHBOARD_PROFILE_DIR (off by default; see metrics.py)
+metrics_enabled = os.environ.get('DASHBOARD_METRICS', '1') != '0'
+metrics = Registry()
+stage_seconds = metrics.histogram('dashboard_stage_seconds', 'Duration of the stages of the callbacks.', ('stage', 'plot'))
+callback_seconds = metrics.histogram('dashboard_callback_seconds', 'Latency of the callbacks.', ('callback',))
+payload_size = metrics.histogram('dashboard_payload_bytes', 'Size of the updates sent to the plots (full figure or patch).',
+                                 ('plot', 'kind'), SIZE_BUCKETS)
+profiler = SamplingProfiler(os.environ.get('DASHBOARD_PROFILE_DIR'))
+
+# Geometry of the Mexican states, read from the bundled file and simplified once at startup
+# (level of detail: 'full', 'high', 'medium' or 'low')
+states_geojson = load_states_geojson(os.environ.get('DASHBOARD_MAP_DETAIL', 'medium'))
+
+# Box plot of the salaries: 'summary' (statistics computed on the server) or 'points' (every salary sent to the browser)
+boxplot_mode = os.environ.get('DASHBOARD_BOXPLOT', 'summary')
+
+# Static bundle of the figures of the most common filter states (default state, each job, each location and the top
+# companies), exported at deploy time by figure_bundle.py and opened only if it matches the dataset, the settings above
+# and the source of the plotting code and of the geometry of the map (DASHBOARD_BUNDLE_DIR set to an empty string turns
+# the bundles off)
+figure_settings = {'map_detail': os.environ.get('DASHBOARD_MAP_DETAIL', 'medium'), 'boxplot': boxplot_mode,
+                   'source': source_digest([os.path.abspath(__file__), GEOJSON_PATH] +
+                                           [sys.modules[function.__module__].__file__ for function in
+                                            (group_box_statistics, group_aggregates, load_states_geojson, pairwise_tests,
+                                             figure_patch)])}
+bundle_root = os.environ.get('DASHBOARD_BUNDLE_DIR', BUNDLE_DIR)
+figure_bundle = open_bundle(bundle_root, dataset_token, figure_settings) if bundle_root else None
+
+# Reload of the dataset while the dashboard runs (see dataset_reload.py): with DASHBOARD_RELOAD_INTERVAL set to a number
+# of seconds (0, the default, turns it off), the source of the dataset is polled, and a new version is built in the
+# background and swapped in under the writer side of swap_lock, whose reader side is held by every callback
+reload_interval = float(os.environ.get('DASHBOARD_RELOAD_INTERVAL', '0'))
+swap_lock = SwapLock()
+reload_lock = threading.Lock()
+dataset_watcher = None
+reload_stats = {'reloads': 0, 'added_rows': 0, 'removed_rows': 0}
+reload_seconds = metrics.histogram('dashboard_reload_seconds', 'Duration of the stages of the reloads of the dataset.', ('stage',))
+
+# States dictionary with corresponding ID in the geometry of the map
+location_dict = {'Aguascalientes': 'AS', 
+            'Baja California': 'BC', 
+            'Baja California Sur': 'BS', 
+            'Campeche': 'CC',
+            'Ciudad de México':'DF',
+            'Chiapas': 'CS',
+            'Chihuahua':'CH',
+            'Coahuila':'CL',
+            'Colima':'CM',
+            'Durango':'DG',
+            'Estado de México':'MC',
+            'Guanajuato':'GT',
+            'Guerrero':'GR',
+            'Hidalgo':'HG',
+            'Jalisco':'JC',
+            'Michoacán':'MN',
+            'Morelos':'MS',
+            'Nayarit':'NT',
+            'Nuevo León':'NL',
+            'Oaxaca':'OC',
+            'Puebla':'PL',
+            'Querétaro':'QT',
+            'Quintana Roo':'QR',
+            'San Luis Potosí':'SP',
+            'Sinaloa':'SL',
+            'Sonora':'SR',
+            'Tabasco':'TC',
+            'Tamaulipas':'TS',
+            'Tlaxcala':'TL',
+            'Veracruz':'VZ',
+            'Yucatán':'YN',
+            'Zacatecas':'ZS'}
+
+states_df = pd.DataFrame.from_dict(location_dict, orient='index').reset_index().rename(columns={"index": "State", 0: "ID"}).set_index('State')
+
+# Number and percentage of the vacancies per state, from the aggregates of the filtered rows
+def demand_per_state(aggregates):
+
+  demand = aggregates.vacancy_counts('Location').to_frame()
+  total = sum(demand['Count'])
+  demand['Percentage'] = (demand['Count']) / total *100
+  demand = demand.rename_axis('State').reset_index()
+
+  return states_df.merge(demand, left_on='State', right_on='State', how = 'outer').fillna(0)
 
 # Plotting functions
+# The job pie chart, the company rankings, the choropleth map, the heatmap and the contour plot are drawn from the
+# counts of the vacancies and the counts and sums of the salaries per (Location, Job) and (Company, Job), computed
+# once per filter state over the integer codes of the columns (see aggregates.py); the labels are only decoded for
+# the groups shown by the figures
 
 # Job Demand: Pie Chart
-def plot_pie_chart(df):
+def plot_pie_chart(data):
 
-  job_df = pd.DataFrame(df['Job'].value_counts().reset_index().rename(columns = {'index': 'Job', 'Job': 'Count'}))
+  job_df = group_aggregates(data).vacancy_counts('Job')[lambda counts: counts > 0].sort_values(ascending = False, kind = 'stable').reset_index()
   pie_colors = ['#06477D','#84BDEC','#B4D4EF', '#C8E4FC','white']
   demand_job_plot = px.pie(job_df, values='Count', names='Job', color = 'Job', hole = 0.7,  
                            color_discrete_sequence=px.colors.sequential.Blues_r,
@@ -46,15 +197,14 @@ def plot_pie_chart(df):
   return demand_job_plot
 
 # Company Demand: Treemap
-def plot_treemap(df):
+def plot_treemap(data):
 
   top = 20
 
   #company_df = pd.pivot_table(data = df, index = ['Company'], columns = 'Job', values = 'Location', aggfunc = 'count').fillna(0).reset_index()
-  company_df =  df.groupby(by='Company', as_index=False)['Job'].count().sort_values(by = 'Job', ascending = False).\
-                rename(columns = {'Job': 'Vacancies'})[:top]
+  # Top companies selected from the counts of the filter state, without sorting every company
+  company_df = group_aggregates(data).top_groups('Company', top)
   company_df['Company'] = company_df['Company'].map(lambda x: x[:15])
-  company_df = company_df[company_df['Vacancies'] > 0]
 
   demand_company_plot = px.treemap(company_df, path = [px.Constant("."), 'Company'], values='Vacancies', color = 'Vacancies', 
                                   color_continuous_scale=px.colors.sequential.Blues,
@@ -65,16 +215,15 @@ def plot_treemap(df):
   return demand_company_plot
 
 # Alternative: Company Demand: Bar Chart
-def plot_barchart(df):
+def plot_barchart(data):
 
   top = 15
   bar_colors = ['#84BDEC',] * 14
   bar_colors.insert(14,'#06477D')
-  company_df = df.groupby(by = 'Company', as_index= False)['Job'].count().sort_values(by = 'Job', ascending = False).rename(columns = {'Job': 'Vacancies'})[:top]
+  company_df = group_aggregates(data).top_groups('Company', top)
   company_df['Company'] = company_df['Company'].map(lambda x: x[:25])
-  company_df = company_df[company_df['Vacancies'] > 0]
 
-  demand_company_plot = px.bar(company_df.sort_values(by = 'Vacancies'), x='Vacancies', y='Company',
+  demand_company_plot = px.bar(company_df.sort_values(by = 'Vacancies', kind = 'stable'), x='Vacancies', y='Company',
             color = 'Vacancies', color_continuous_scale=bar_colors,
             #text="Vacancies", 
             height=450,
@@ -86,53 +235,13 @@ def plot_barchart(df):
   return demand_company_plot
 
 # Location Demand: Choropleth Map
-def plot_cloropleth(df):
-
-  # States dictionary with corresponding ID
-  location_dict = {'Aguascalientes': 'AS', 
-              'Baja California': 'BC', 
-              'Baja California Sur': 'BS', 
-              'Campeche': 'CC',
-              'Ciudad de México':'DF',
-              'Chiapas': 'CS',
-              'Chihuahua':'CH',
-              'Coahuila':'CL',
-              'Colima':'CM',
-              'Durango':'DG',
-              'Estado de México':'MC',
-              'Guanajuato':'GT',
-              'Guerrero':'GR',
-              'Hidalgo':'HG',
-              'Jalisco':'JC',
-              'Michoacán':'MN',
-              'Morelos':'MS',
-              'Nayarit':'NT',
-              'Nuevo León':'NL',
-              'Oaxaca':'OC',
-              'Puebla':'PL',
-              'Querétaro':'QT',
-              'Quintana Roo':'QR',
-              'San Luis Potosí':'SP',
-              'Sinaloa':'SL',
-              'Sonora':'SR',
-              'Tabasco':'TC',
-              'Tamaulipas':'TS',
-              'Tlaxcala':'TL',
-              'Veracruz':'VZ',
-              'Yucatán':'YN',
-              'Zacatecas':'ZS'}
-
-  location_df = pd.DataFrame.from_dict(location_dict, orient='index').reset_index().rename(columns={"index": "State", 0: "ID"}).set_index('State')
-
-  demand = pd.DataFrame(df['Location'].value_counts())
-  total = sum(demand['Location'])
-  demand['Percentage'] = (demand['Location']) / total *100
-  demand = demand.reset_index().rename(columns={"index": "State", "Location": "Count"})
-
-  location_df = location_df.merge(demand, left_on='State', right_on='State', how = 'outer').fillna(0)
+def plot_cloropleth(data):
+
+  aggregates = group_aggregates(data)
+  location_df = demand_per_state(aggregates)
 
   demand_location_plot = px.choropleth(location_df, 
-                            geojson = 'https://raw.githubusercontent.com/isaacarroyov/data_visualization_practice/master/Python/visualizing_mexican_wildfires_tds/data/states_mx.json', 
+                            geojson = states_geojson, 
                             locations='ID', 
                             color='Percentage',
                             color_continuous_scale="Blues",
@@ -148,9 +257,15 @@ def plot_cloropleth(df):
   return demand_location_plot
 
 # Salary Per Job: Boxplot
-def plot_boxplot(df):
+def plot_boxplot(data, mode = boxplot_mode):
 
-  salary_job_df = df.dropna(axis = 0, how='any', subset = ['Salary'])
+  if mode == 'summary':
+    # Missing salaries are skipped by the statistics, without copying the dataset
+    box_df = group_box_statistics(data, 'Job', 'Salary')
+    salary_job_df = pd.DataFrame({'Job': np.repeat(box_df.index.astype(str), box_df['points'].map(len)),
+                                  'Salary': np.concatenate([[]] + box_df['points'].tolist())})
+  else:
+    salary_job_df = data.dropna(axis = 0, how='any', subset = ['Salary'])
 
   salary_job_plot = px.box(salary_job_df, x = "Job", y = "Salary", 
                           color = "Job", points="all", 
@@ -162,6 +277,14 @@ def plot_boxplot(df):
                           title='Salary Per Data Job Category',
                           height=450
                           )
+
+  if mode == 'summary':
+    # One box per trace, drawn from the precomputed statistics, with the sampled salaries as its points
+    for trace in salary_job_plot.data:
+      box = box_df.loc[trace.name]
+      trace.update(x = [trace.name], y = [box['points']], q1 = [box['q1']], median = [box['median']], q3 = [box['q3']],
+                   lowerfence = [box['lowerfence']], upperfence = [box['upperfence']])
+
   salary_job_plot.update_traces(showlegend=False)
   salary_job_plot.update_layout(transition_duration=400, title_x=0.5, paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
   salary_job_plot.update_yaxes(tickformat = '$,~s')
@@ -170,14 +293,14 @@ def plot_boxplot(df):
 
 # Salary Per Company: Heatmap
 
-def plot_heatmap(df):
+def plot_heatmap(data):
 
   top = 30
 
-  salary_job_df = df.dropna(axis = 0, how='any', subset = ['Salary'])
-  salary_company_df = pd.pivot_table(salary_job_df, index = 'Company', columns = 'Job', values = 'Salary', aggfunc= 'mean')
+  aggregates = group_aggregates(data)
+  salary_company_df = aggregates.mean_salary('Company')
   salary_company_df['Total Average'] = salary_company_df.mean(axis=1, numeric_only= True)
-  salary_company_df = salary_company_df.fillna(0).sort_values('Total Average', ascending = False)[:top].\
+  salary_company_df = salary_company_df.fillna(0).sort_values(['Total Average', 'Company'], ascending = [False, True])[:top].\
                       sort_values('Company', ascending = False).drop(columns = 'Total Average').reset_index().\
                       rename(index = {'Job': 'Index'})
   salary_company_df = pd.melt(salary_company_df, id_vars = 'Company', var_name = 'Job', value_name = 'Salary')
@@ -194,54 +317,12 @@ def plot_heatmap(df):
   return salary_company_plot
 
 # Salary Per Location: Contour plot
-def plot_contour(df):
-
-    # States dictionary with corresponding ID
-  location_dict = {'Aguascalientes': 'AS', 
-              'Baja California': 'BC', 
-              'Baja California Sur': 'BS', 
-              'Campeche': 'CC',
-              'Ciudad de México':'DF',
-              'Chiapas': 'CS',
-              'Chihuahua':'CH',
-              'Coahuila':'CL',
-              'Colima':'CM',
-              'Durango':'DG',
-              'Estado de México':'MC',
-              'Guanajuato':'GT',
-              'Guerrero':'GR',
-              'Hidalgo':'HG',
-              'Jalisco':'JC',
-              'Michoacán':'MN',
-              'Morelos':'MS',
-              'Nayarit':'NT',
-              'Nuevo León':'NL',
-              'Oaxaca':'OC',
-              'Puebla':'PL',
-              'Querétaro':'QT',
-              'Quintana Roo':'QR',
-              'San Luis Potosí':'SP',
-              'Sinaloa':'SL',
-              'Sonora':'SR',
-              'Tabasco':'TC',
-              'Tamaulipas':'TS',
-              'Tlaxcala':'TL',
-              'Veracruz':'VZ',
-              'Yucatán':'YN',
-              'Zacatecas':'ZS'}
-
-  location_df = pd.DataFrame.from_dict(location_dict, orient='index').reset_index().rename(columns={"index": "State", 0: "ID"}).set_index('State')
-
-  demand = pd.DataFrame(df['Location'].value_counts())
-  total = sum(demand['Location'])
-  demand['Percentage'] = (demand['Location']) / total *100
-  demand = demand.reset_index().rename(columns={"index": "State", "Location": "Count"})
-
-  location_df = location_df.merge(demand, left_on='State', right_on='State', how = 'outer').fillna(0)
-
-  salary_job_df = df.dropna(axis = 0, how='any', subset = ['Salary'])
-
-  salary_location_df = pd.pivot_table(data = salary_job_df, index = 'Location', columns = 'Job', values = 'Salary', aggfunc= 'mean').reset_index().\
+def plot_contour(data):
+
+  aggregates = group_aggregates(data)
+  location_df = demand_per_state(aggregates)
+
+  salary_location_df = aggregates.mean_salary('Location').reset_index().\
       merge(location_df, left_on='Location', right_on='State', how = 'outer').set_index('State').drop(columns =['ID', 'Count', 'Percentage', 'Location']).fillna(0).\
       sort_values('State', ascending = False).reset_index()
   salary_location_df = pd.melt(salary_location_df, id_vars= 'State', var_name = 'Job', value_name = 'Salary')
@@ -265,17 +346,69 @@ def plot_contour(df):
   return salary_location_plot
 
 
+# Salary Comparisons: panel of statistical tests of the salaries of the data job categories (see salary_tests.py); not a
+# figure, so it is not named like the plotting functions
+def render_salary_tests(data):
+
+  groups = salary_groups(data, 'Job', 'Salary')
+  if len(groups) < 2:
+    return html.P("At least two data job categories with disclosed salaries are required for the comparisons.",
+                  style={'textAlign': 'center', 'color': 'navy', 'font-size': 14, 'font-family': 'Tahoma'})
+
+  # The resamples are drawn in the process of the callback, since forking a process pool from the threads of a server
+  # process is unsafe
+  omnibus_df = omnibus_tests(groups)
+  pairwise_df = pairwise_tests(groups, workers = 1)
+
+  format_salary = lambda x: f"{'-' if x < 0 else ''}${abs(x):,.0f}"
+  format_pvalue = lambda p: '<0.001' if p < 0.001 else f'{p:.3f}'
+  cell_style = {'padding': '4px 10px', 'border-bottom': '1px solid #B3D5FA'}
+
+  header = ['Data Job Categories', 'Mean Difference (95% CI)', 'Median Difference (95% CI)',
+            't-test p', 'Mann-Whitney p', 'Permutation p', 'Significant']
+  rows = [html.Tr([html.Th(column, style=cell_style) for column in header])]
+  for row in pairwise_df.to_dict('records'):
+    cells = [f"{row['A']} > {row['B']}",
+             f"{format_salary(row['Mean difference'])} ({format_salary(row['Mean CI low'])} to {format_salary(row['Mean CI high'])})",
+             f"{format_salary(row['Median difference'])} ({format_salary(row['Median CI low'])} to {format_salary(row['Median CI high'])})",
+             format_pvalue(row['t-test p (adjusted)']), format_pvalue(row['Mann-Whitney p (adjusted)']),
+             format_pvalue(row['Permutation p (adjusted)']), 'Yes' if row['Significant'] else 'No']
+    rows.append(html.Tr([html.Td(cell, style=cell_style) for cell in cells]))
+
+  summary = '; '.join(f"{test}: {statistic:,.2f} (p-value {format_pvalue(pvalue)})" for test, statistic, pvalue in omnibus_df.itertuples(index=False))
+
+  return [html.P(summary, style={'textAlign': 'center', 'color': 'black', 'font-size': 14, 'font-family': 'Tahoma'}),
+          html.Table(rows, style={'margin': 'auto', 'border-collapse': 'collapse', 'color': '#2e2d2d',
+                                  'font-size': 13, 'font-family': 'Tahoma'}),
+          html.P("One-sided tests of the higher-paid category of each pair against the other one, with Holm's correction "
+                 "for multiple comparisons (significance level of 0.05 for the three tests); bootstrap confidence "
+                 "intervals and permutation tests from 10,000 resamples.",
+                 style={'textAlign': 'center', 'color': 'navy', 'font-size': 12, 'font-family': 'Tahoma'})]
+
 # Helper function for dropdowns
+# (the values present in the column are read from the dictionary of its codes, without sorting every row)
 def create_dropdown_options(series):
-    options = [{'label': i, 'value': i} for i in series.sort_values().unique()]
+    codes, uniques = column_codes(series)
+    present = np.bincount(codes[codes >= 0], minlength = len(uniques)) > 0
+    options = [{'label': i, 'value': i} for i in uniques[present].sort_values()]
     options.insert(0, {'label': 'All', 'value': 'All'})
     return options
 
+# Helper function for the searchable dropdowns: matching values first (up to MAX_OPTIONS), then the selected ones
+def search_dropdown_options(option_index, search_value, selected):
+    values = option_index.search(search_value)
+    selected = [selected] if isinstance(selected, str) else list(selected or [])
+    values += [value for value in selected if value != 'All' and value not in values]
+    return [{'label': 'All', 'value': 'All'}] + [{'label': value, 'value': value} for value in values]
+
 # Dash application
 app = dash.Dash(__name__)
 
+# Copy of the dataset and templates of the figures for the client-side filtering (filled once the plots are defined)
+client_data_store = dcc.Store(id='client_data')
+
 # App Layout
-app.layout = html.Div(children=[
+dataset_layout = html.Div(children=[
                                 # First section
                                 # Adding Title
                                 html.Div(children=[ html.H1('Data Jobs in Mexico Dashboard',
@@ -344,7 +477,8 @@ app.layout = html.Div(children=[
                                                   'font-size': 15, 'font-family': 'Tahoma'}
                                                 ),
                                       dcc.Dropdown(id='location_dropdown',
-                                                  options=create_dropdown_options(df['Location']),
+                                                  options=(create_dropdown_options(df['Location']) if client_filtering else
+                                                           search_dropdown_options(option_indexes['location_dropdown'], None, None)),
                                                   value='All',
                                                   placeholder="Select Location",
                                                   multi=True,
@@ -361,7 +495,8 @@ app.layout = html.Div(children=[
                                                   'font-size': 15, 'font-family': 'Tahoma'}
                                                   ),
                                       dcc.Dropdown(id='company_dropdown',
-                                                  options=create_dropdown_options(df['Company']),
+                                                  options=(create_dropdown_options(df['Company']) if client_filtering else
+                                                           search_dropdown_options(option_indexes['company_dropdown'], None, None)),
                                                   value='All',
                                                   placeholder="Select Company",
                                                   multi=True,
@@ -393,8 +528,8 @@ app.layout = html.Div(children=[
                                                   'font-size': 15, 'font-family': 'Tahoma'}
                                                 ),
                                       dcc.RangeSlider(id='salary_slider',
-                                                      min=0, max=100000, step=1000,
-                                                      marks={0: '$0', 20000: '$20,000', 40000: '$40,000', 60000: '$60,000', 80000: '$80,000', 100000: '$100,000'},
+                                                      min=min_salary, max=max_salary, step=SALARY_STEP,
+                                                      marks=salary_marks,
                                                       value=[min_salary, max_salary],
                                                       ),
                                       
@@ -462,7 +597,8 @@ app.layout = html.Div(children=[
                                             html.Div(children=[       
 
                                             # Location Demand Plot: Map
-                                            dcc.Graph(id='demand_location_plot'), 
+                                            # (base map layers are hidden, so plotly.js only needs the local empty topojson)
+                                            dcc.Graph(id='demand_location_plot', config={'topojsonURL': app.get_asset_url('topojson/')}), 
                                             ], id='Map',
                                             style={'margin-top': '-380px',
                                                     'margin-left': '47%', 
@@ -513,6 +649,26 @@ app.layout = html.Div(children=[
 
                                 ], id='Third_plot_section',                                
                                 ),
+
+                                # Fourth section: Salary comparisons among the data job categories
+                                html.Div(children=[
+                                      html.H3("Salary Comparisons Among Data Job Categories",
+                                              style={'textAlign': 'center', 'color': 'navy',
+                                                     'font-size': 18, 'font-family': 'Tahoma'}),
+                                      dcc.Loading(html.Div(id='salary_tests_panel')),
+                                      ], id='Salary_tests_section',
+                                      style={'margin-top': '20px', 'margin-bottom': '20px', 'width': '100%'}
+                                ),
+
+                                # Filter state shared by the callbacks of the plots
+                                dcc.Store(id='filter_state'),
+                                client_data_store,
+
+                                # Filter state of the figure held by the browser for each plot, so the next
+                                # updates only send what changed
+                                html.Div([dcc.Store(id = figure_id + '_rendered') for figure_id in
+                                          ['demand_job_plot', 'demand_company_plot', 'demand_location_plot',
+                                           'salary_job_plot', 'salary_company_plot', 'salary_location_plot']]),
                         ])
 
                         ], id='container',
@@ -522,127 +678,382 @@ app.layout = html.Div(children=[
                                  }
                       )        
 
+# The layout is served from the current version of the dataset: a reload builds a new layout and rebinds it under the
+# writer side of the swap lock, so a request for the layout never serializes a half-updated one
+def serve_layout():
+  return dataset_layout
+
+app.layout = serve_layout
+
                              
 
+# Instrumentation of the callbacks: latency histogram and, when enabled, one sampled profile per call; each call runs
+# on a single version of the dataset (reader side of the swap lock), and its latency includes any wait for a swap
+def instrumented(name):
+  def decorator(function):
+    @functools.wraps(function)
+    def wrapper(*args):
+      with profiler.profile(name), span(callback_seconds, name, enabled = metrics_enabled), swap_lock.read():
+        return function(*args)
+    return wrapper
+  return decorator
+
+# Counters of the caches and of the updates sent, collected when the metrics are scraped
+@metrics.collector
+def dashboard_counters():
+  figure_stats = figure_cache.stats()
+  store_stats = filter_store.stats()
+  sent = transfer_stats.stats()
+  bundle_stats = figure_bundle.stats() if figure_bundle is not None else {'hits': 0, 'misses': 0}
+  return [('dashboard_figure_cache_requests_total', 'counter', 'Lookups of the figure caches.', ('plot', 'result'),
+           [((name, result), stats[key]) for name, stats in figure_stats.items()
+            for result, key in (('hit', 'hits'), ('miss', 'misses'))]),
+          ('dashboard_figure_cache_evictions_total', 'counter', 'Figures evicted from the caches.', ('plot',),
+           [((name,), stats['evictions']) for name, stats in figure_stats.items()]),
+          ('dashboard_figure_cache_size', 'gauge', 'Figures held by the caches.', ('plot',),
+           [((name,), stats['size']) for name, stats in figure_stats.items()]),
+          ('dashboard_filter_store_requests_total', 'counter', 'Lookups of the filtered row sets.', ('result',),
+           [(('hit',), store_stats['hits']), (('miss',), store_stats['misses'])]),
+          ('dashboard_filter_store_evictions_total', 'counter', 'Row sets evicted from the filter store.', (),
+           [((), store_stats['evictions'])]),
+          ('dashboard_filter_store_size', 'gauge', 'Row sets held by the filter store.', (), [((), store_stats['size'])]),
+          ('dashboard_bundle_requests_total', 'counter', 'Lookups of the static bundle of the figures.', ('result',),
+           [(('hit',), bundle_stats['hits']), (('miss',), bundle_stats['misses'])]),
+          ('dashboard_updates_total', 'counter', 'Updates sent to the plots.', ('plot', 'kind'),
+           [((name, kind), counters[kind]) for name, counters in sent.items() for kind in ('full', 'patch', 'unchanged')]),
+          ('dashboard_sent_bytes_total', 'counter', 'Bytes sent to the plots.', ('plot',),
+           [((name,), counters['sent_bytes']) for name, counters in sent.items()]),
+          ('dashboard_full_figure_bytes_total', 'counter', 'Bytes of the full figures of the updates.', ('plot',),
+           [((name,), counters['full_bytes']) for name, counters in sent.items()]),
+          ('dashboard_reloads_total', 'counter', 'Reloads of the dataset swapped in.', (), [((), reload_stats['reloads'])]),
+          ('dashboard_reload_rows_total', 'counter', 'Rows added and removed by the reloads of the dataset.', ('change',),
+           [(('added',), reload_stats['added_rows']), (('removed',), reload_stats['removed_rows'])]),
+          ('dashboard_reload_held_back_total', 'counter', 'Callbacks held back by a swap of the dataset.', (),
+           [((), swap_lock.stats()['held_back'])])]
+
+# Metrics endpoint of the Flask server behind the app, in the Prometheus text format
+@app.server.route('/metrics')
+def metrics_endpoint():
+  return flask.Response(metrics.render(), mimetype = 'text/plain; version=0.0.4')
+
 # Callback Functions
 
-# Callback function for 'job_dropdown' as input and 'demand_job_plot' as output
-@app.callback([Output(component_id='demand_job_plot', component_property='figure'),
-               Output(component_id='demand_company_plot', component_property='figure'),
-               Output(component_id='demand_location_plot', component_property='figure'),
-               Output(component_id='salary_job_plot', component_property='figure'),
-               Output(component_id='salary_company_plot', component_property='figure'),
-               Output(component_id='salary_location_plot', component_property='figure')],
-              [Input(component_id='job_dropdown', component_property='value'),
-               Input(component_id='location_dropdown', component_property='value'),
-               Input(component_id='company_dropdown', component_property='value'),
-               Input(component_id='salary_slider', component_property='value'),
-               Input(component_id='salary_filter', component_property='value')]
-              )
-def update_output(job, location, company, salary, salary_filter):
+# Callback functions for the options of the Company and Location dropdowns, searched on the server as the user types
+def register_option_search(dropdown_id):
+
+  @app.callback(Output(component_id=dropdown_id, component_property='options'),
+                Input(component_id=dropdown_id, component_property='search_value'),
+                State(component_id=dropdown_id, component_property='value'),
+                prevent_initial_call=True)
+  @instrumented(dropdown_id)
+  def update_options(search_value, selected):
+    return search_dropdown_options(option_indexes[dropdown_id], search_value, selected)
+
+  return update_options
+
+# Every option is in the layout in the client-side filtering mode
+option_callbacks = {} if client_filtering else {dropdown_id: register_option_search(dropdown_id)
+                                                for dropdown_id in option_indexes}
+
+# Callback function for the dropdowns, slider and checkbox as inputs and the shared filter state as output
+filter_state_inputs = [Input(component_id='job_dropdown', component_property='value'),
+                       Input(component_id='location_dropdown', component_property='value'),
+                       Input(component_id='company_dropdown', component_property='value'),
+                       Input(component_id='salary_slider', component_property='value'),
+                       Input(component_id='salary_filter', component_property='value')]
+
+@instrumented('filter_state')
+def update_filter_state(job, location, company, salary, salary_filter):
   """
-  This function updates the output plots based on the parameters of:
+  This function computes the rows matching the filters once, stores them on the server
+  and returns the filter state shared by the plot callbacks, based on the parameters of:
   - job
   - location
   - company
   - salary
   """
-  dff = df.copy()
+  if (job or company or location or salary) == None:
+    raise PreventUpdate
+
   low, high = salary
+  salary_range = (low, high) if salary_filter == ['Enable Salary Range Selection'] else None
+
+  # Canonical filter state: sorted selections, 'All' collapsed and salary range snapped to the slider step
+  key = filter_key(job, location, company, salary_range)
+  with span(stage_seconds, 'filter', '', enabled = metrics_enabled):
+    return filter_state_of(key)
+
+# In the client-side filtering mode, the filter state is computed in the browser, without the hash of the stored rows
+if client_filtering:
+  app.clientside_callback(ClientsideFunction(namespace='client_filtering', function_name='filter_state'),
+                          Output(component_id='filter_state', component_property='data'), filter_state_inputs,
+                          State(component_id='client_data', component_property='data'))
+else:
+  app.callback(Output(component_id='filter_state', component_property='data'), filter_state_inputs)(update_filter_state)
+
+def filter_state_of(key):
+  """
+  This function stores the rows matching a canonical filter state and returns the filter state shared by the plot callbacks.
+  """
+  return {'hash': filter_store.put(key, dataset_token), 'key': key_to_json(key)}
 
-  if salary_filter == ['Enable Salary Range Selection']:
-    mask = (dff['Salary'] >= low) & (dff['Salary'] <= high)
-    dff = dff[mask]
+def build_figure(plot_function, filter_state):
+  """
+  This function returns the figure of a plotting function for the shared filter state,
+  from the figure cache or built from the stored rows (or aggregates) matching the filters.
+  """
+  if filter_state is None:
+    raise PreventUpdate
 
-  if (job or company or location or salary) == None:
-        raise PreventUpdate 
-  
-  if 'All' in job and 'All' in location and 'All' in company:
-    
-    demand_job_plot = plot_pie_chart(dff)
-    demand_company_plot = plot_barchart(dff)
-    demand_location_plot = plot_cloropleth(dff)
-    salary_job_plot = plot_boxplot(dff)
-    salary_company_plot = plot_heatmap(dff)
-    salary_location_plot = plot_contour(dff)
+  key = key_from_json(filter_state['key'])
+
+  # The plots drawn from the aggregates share those of the filter state instead of the filtered rows
+  if plot_function in aggregate_plots:
+    select = lambda: filter_store.aggregates(df, filter_state['hash'], key)
+  else:
+    select = lambda: filter_store.select(df, filter_state['hash'], key)
+
+  def build():
+    # Figures of the common filter states are read from the static bundle, if one was exported for this dataset
+    if figure_bundle is not None:
+      with span(stage_seconds, 'bundle', plot_function.__name__, enabled = metrics_enabled):
+        bundled = figure_bundle.get(plot_function.__name__, key, dataset_token)
+      if bundled is not None:
+        return bundled
+    with span(stage_seconds, 'select', plot_function.__name__, enabled = metrics_enabled):
+      data = select()
+    with span(stage_seconds, 'plot', plot_function.__name__, enabled = metrics_enabled):
+      return plot_function(data)
+
+  return figure_cache.get_or_build(plot_function.__name__, key, build, dataset_token)
+
+# Plotting functions drawn from the aggregates of the filter state
+aggregate_plots = {plot_pie_chart, plot_treemap, plot_barchart, plot_cloropleth, plot_heatmap, plot_contour}
+
+# Plots of the dashboard and their plotting functions
+figures = {'demand_job_plot': plot_pie_chart,
+           'demand_company_plot': plot_barchart,
+           'demand_location_plot': plot_cloropleth,
+           'salary_job_plot': plot_boxplot,
+           'salary_company_plot': plot_heatmap,
+           'salary_location_plot': plot_contour}
+
+def send_figure(figure_id, plot_function, filter_state, rendered):
+  """
+  This function returns what to send to a plot for the shared filter state: the full figure
+  on the first render, and then only the changes from the figure held by the browser
+  (a dash.Patch), along with the filter state of the figure now held by the browser.
+  """
+  figure = build_figure(plot_function, filter_state)
+  with span(stage_seconds, 'serialize', plot_function.__name__, enabled = metrics_enabled):
+    full_bytes = payload_bytes(figure)
+  held = {'hash': filter_state['hash'], 'key': filter_state['key'], 'dataset': dataset_token}
+
+  # Full figure on the first render, or if the figure held by the browser was built from another dataset
+  if not partial_updates or rendered is None or rendered.get('dataset') != dataset_token:
+    return record_update(figure_id, 'full', full_bytes, full_bytes, figure), held
+
+  # The figure held by the browser is only compared if it is still cached (or bundled): plotting its filter state again
+  # (evicted, or computed by another worker) would cost more than the bytes saved, so the full figure is sent instead
+  previous = cached_figure(plot_function, key_from_json(rendered['key']))
+  if previous is None:
+    return record_update(figure_id, 'full', full_bytes, full_bytes, figure), held
+  if previous is figure:
+    record_update(figure_id, 'unchanged', full_bytes, 0)
+    return no_update, held
+  with span(stage_seconds, 'patch', plot_function.__name__, enabled = metrics_enabled):
+    patch = figure_patch(previous, figure)
+  if patch is None:
+    record_update(figure_id, 'unchanged', full_bytes, 0)
+    return no_update, held
+  with span(stage_seconds, 'serialize', plot_function.__name__, enabled = metrics_enabled):
+    sent_bytes = payload_bytes(patch)
+  if sent_bytes >= full_bytes:
+    return record_update(figure_id, 'full', full_bytes, full_bytes, figure), held
+  return record_update(figure_id, 'patch', full_bytes, sent_bytes, patch), held
+
+def cached_figure(plot_function, key):
+  """
+  This function returns the figure of a plotting function for a canonical filter state if it is in the figure cache or in
+  the static bundle, without building it (or None).
+  """
+  figure = figure_cache.peek(plot_function.__name__, key, dataset_token)
+  if figure is None and figure_bundle is not None:
+    figure = figure_bundle.get(plot_function.__name__, key, dataset_token)
+  return figure
+
+def record_update(figure_id, kind, full_bytes, sent_bytes, update = None):
+  """
+  This function counts an update sent to a plot (transfer statistics and size histogram) and returns it.
+  """
+  transfer_stats.record(figure_id, kind, full_bytes, sent_bytes)
+  if metrics_enabled:
+    payload_size.observe(sent_bytes, figure_id, kind)
+  return update
+
+# Plotting functions of the static bundles and of the warm-up of the caches
+bundled_plots = list(figures.values()) + [render_salary_tests]
 
+def bundle_builders():
+  """
+  This function returns the function computing the figure of a canonical filter state, per plotting function name,
+  as exported into the static bundles by figure_bundle.py.
+  """
+  def builder(plot_function):
+    return lambda key: build_figure(plot_function, filter_state_of(key))
+  return {plot_function.__name__: builder(plot_function) for plot_function in bundled_plots}
+
+def warm_up(keys = None, plots = None):
+  """
+  This function fills the filter store and the figure caches with the figures of the common filter states (those of the
+  static bundle if one is opened) for the given plotting functions (every bundled one by default), so the first visitors
+  do not wait for them. It returns the number of states warmed up.
+  """
+  if keys is None:
+    keys = figure_bundle.keys() if figure_bundle is not None else common_filter_keys(df)
+  for key in keys:
+    filter_state = filter_state_of(key)
+    for plot_function in (bundled_plots if plots is None else plots):
+      build_figure(plot_function, filter_state)
+  return len(keys)
+
+def client_data():
+  """
+  This function returns the copy of the dataset sent to the browser in the client-side filtering mode, with the figures
+  of the default filter state as templates and the order of the locations in the map and in the contour plot.
+  """
+  default_state = filter_state_of(filter_key(None, None, None, None))
+  templates = {figure_id: json.loads(json.dumps(build_figure(plot_function, default_state), cls = PlotlyJSONEncoder))
+               for figure_id, plot_function in figures.items()}
+
+  location_codes = {label: code for code, label in enumerate(column_codes(df['Location'])[1])}
+  states = demand_per_state(group_aggregates(df))['State']
+  map_locations = [location_codes.get(state, -1) for state in states]
+  contour_locations = [(state, location_codes.get(state, -1)) for state in sorted(states, reverse = True)]
+
+  return client_payload(df, dataset_token, templates, map_locations, contour_locations)
+
+if client_filtering:
+  client_data_store.data = client_data()
+
+def reload_dataset(new_df = None):
+  """
+  This function loads the dataset again (or takes the given one) and builds its derived structures while the callbacks
+  keep running on the current ones, applying only the changed rows to the aggregates of the common filter states, and
+  then swaps them in at once. It returns the number of rows added and removed and the seconds of the build and of the
+  swap, or None if the dataset did not change.
+  """
+  global df, filter_index, min_salary, max_salary, salary_marks, option_indexes, filter_store, dataset_token, figure_bundle
+  global dataset_layout, client_data_store
+  with reload_lock:
+    start = time.perf_counter()
+    if new_df is None:
+      new_df = load_dataset(*dataset_source).rename(columns = {'Average Salary': 'Salary'}, copy = False)
+    new_token = dataset_fingerprint(new_df)
+    if new_token == dataset_token:
+      return None
+
+    new_index = FilterIndex(new_df)
+    new_store = FilterStore(new_index, maxsize = filter_store.stats()['maxsize'])
+    new_options = {'company_dropdown': build_option_index(new_df['Company']),
+                   'location_dropdown': build_option_index(new_df['Location'])}
+    new_bounds = new_index.salary_index.bounds()
+    new_marks = new_index.salary_index.marks()
+    new_bundle = open_bundle(bundle_root, new_token, figure_settings) if bundle_root else None
+
+    # Aggregates of the largest common filter states already computed on the current dataset, refreshed with the changed
+    # rows only (the other ones are aggregated again when first requested)
+    added, removed = row_delta(df, new_df)
+    for key in (figure_bundle.keys() if figure_bundle is not None else common_filter_keys(df)):
+      aggregates = filter_store.stored_aggregates(key, dataset_token)
+      if aggregates is not None:
+        rows = new_store.rows(new_store.put(key, new_token), key)
+        if worth_refreshing(len(new_df) if rows is None else len(rows), len(added) + len(removed)):
+          new_store.seed_aggregates(key, new_token, aggregates.refreshed(new_df, rows, added, removed))
+
+    # Layout served to the next visitors: a copy of the current one with the properties of the new dataset
+    layout_properties = {('job_dropdown', 'options'): create_dropdown_options(new_df['Job']),
+                         ('salary_slider', 'min'): new_bounds[0], ('salary_slider', 'max'): new_bounds[1],
+                         ('salary_slider', 'marks'): new_marks, ('salary_slider', 'value'): list(new_bounds)}
+    for dropdown_id, column in (('location_dropdown', 'Location'), ('company_dropdown', 'Company')):
+      layout_properties[(dropdown_id, 'options')] = (create_dropdown_options(new_df[column]) if client_filtering else
+                                                     search_dropdown_options(new_options[dropdown_id], None, None))
+    new_layout = copy.deepcopy(dataset_layout)
+    for (component_id, name), value in layout_properties.items():
+      setattr(new_layout[component_id], name, value)
+    build_seconds = time.perf_counter() - start
+
+    # Swap: the callbacks in flight finish on the current dataset, and the next ones start on the new one (the copy of
+    # the dataset sent to the browser in the client-side filtering mode is built from the new figures, so during the swap)
+    start = time.perf_counter()
+    with swap_lock.write():
+      df, filter_index, filter_store, dataset_token, figure_bundle = new_df, new_index, new_store, new_token, new_bundle
+      option_indexes = new_options
+      min_salary, max_salary = new_bounds
+      salary_marks = new_marks
+      figure_cache.bind(dataset_token)
+      if client_filtering:
+        new_layout['client_data'].data = client_data()
+      dataset_layout, client_data_store = new_layout, new_layout['client_data']
+    swap_seconds = time.perf_counter() - start
+
+    reload_stats['reloads'] += 1
+    reload_stats['added_rows'] += len(added)
+    reload_stats['removed_rows'] += len(removed)
+    if metrics_enabled:
+      reload_seconds.observe(build_seconds, 'build')
+      reload_seconds.observe(swap_seconds, 'swap')
+
+    # The figures of the common filter states are computed again, from the refreshed aggregates
+    if os.environ.get('DASHBOARD_WARM_UP', '1') != '0':
+      with swap_lock.read():
+        warm_up()
+    return {'added': len(added), 'removed': len(removed), 'build_seconds': build_seconds, 'swap_seconds': swap_seconds}
+
+# Watcher of the source of the dataset, started with the first request of each process (the threads of the master
+# process of a pre-forking server do not survive the fork of its workers)
+@app.server.before_request
+def start_dataset_watcher():
+  global dataset_watcher
+  if reload_interval > 0 and dataset_watcher is None:
+    with reload_lock:
+      if dataset_watcher is None:
+        dataset_watcher = DatasetWatcher(lambda: source_stamp(*dataset_source), reload_dataset, reload_interval,
+                                         dataset_stamp).start()
+
+# Callback function for the salary comparisons, following the shared filter state
+@app.callback(Output(component_id='salary_tests_panel', component_property='children'),
+              Input(component_id='filter_state', component_property='data'))
+@instrumented('salary_tests')
+def update_salary_tests(filter_state):
+  # The filter state computed in the browser (client-side filtering) only carries the filters
+  if filter_state is not None and 'hash' not in filter_state:
+    filter_state = filter_state_of(key_from_json(filter_state['key']))
+  return build_figure(render_salary_tests, filter_state)
+
+# One callback per plot with the shared filter state as input, so each plot is rendered
+# as soon as it is ready instead of waiting for the slowest one
+def register_figure_callback(figure_id, plot_function):
+
+  @app.callback(Output(component_id=figure_id, component_property='figure'),
+                Output(component_id=figure_id + '_rendered', component_property='data'),
+                Input(component_id='filter_state', component_property='data'),
+                State(component_id=figure_id + '_rendered', component_property='data'))
+  @instrumented(figure_id)
+  def update_figure(filter_state, rendered):
+    return send_figure(figure_id, plot_function, filter_state, rendered)
+
+  return update_figure
+
+for figure_id, plot_function in figures.items():
+  if client_filtering:
+    app.clientside_callback(ClientsideFunction(namespace='client_filtering', function_name=figure_id),
+                            Output(component_id=figure_id, component_property='figure'),
+                            Input(component_id='filter_state', component_property='data'),
+                            State(component_id='client_data', component_property='data'))
   else:
+    register_figure_callback(figure_id, plot_function)
 
-        if ('All' in (company and location)) and ('All' not in job):
-          dff = dff[dff.Job.isin(job)]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)
-        
-        elif ('All' in (job and location)) and ('All' not in company):
-          dff = dff[dff.Company.isin(company)]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)
-        
-        elif ('All' in (company and job)) and ('All' not in location):
-          dff = dff[dff.Location.isin(location)]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)              
-        
-        elif ('All' in job) and ('All' not in (company and location)):
-          dff = dff[(dff.Company.isin(company)) & (dff.Location.isin(location))]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)
-
-        elif ('All' in location) and ('All' not in (company and job)):
-          dff = dff[(dff.Company.isin(company)) & (dff.Job.isin(job))]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)
-
-        elif ('All' in company) and ('All' not in (location and job)):
-          dff = dff[(dff.Location.isin(location)) & (dff.Job.isin(job))]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)
-
-        elif 'All' not in (company and location and job):
-          dff = dff[(dff.Job.isin(job)) & (dff.Location.isin(location)) & (dff.Company.isin(company))]
-
-          demand_job_plot = plot_pie_chart(dff)
-          demand_company_plot = plot_barchart(dff)
-          demand_location_plot = plot_cloropleth(dff)
-          salary_job_plot = plot_boxplot(dff)
-          salary_company_plot = plot_heatmap(dff)
-          salary_location_plot = plot_contour(dff)
-        
-        else:
-          raise PreventUpdate 
-
-  return demand_job_plot, demand_company_plot, demand_location_plot, salary_job_plot, salary_company_plot, salary_location_plot
-
-# Run the app
+# Run the app with the development server (DASHBOARD_DEBUG=0 turns the debug mode and the reloader off)
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    app.run_server(debug=os.environ.get('DASHBOARD_DEBUG', '1') != '0')
@@ -0,0 +1,286 @@
+### GROUP-BY AGGREGATES OF THE DASHBOARD PLOTS
+
+"""
+Number of vacancies and number and sum of the disclosed salaries per (Location, Job) and
+per (Company, Job), shared by the choropleth map, the heatmap, the contour plot and the
+company rankings of the dashboard.
+
+Each of these plots used to aggregate the filtered rows on its own (value_counts, one
+pivot_table each and merges against the table of states). Here, the rows of a filter
+state are aggregated once through the integer codes of their categories: every pair of
+codes is flattened into a single cell number, counted with np.bincount (weighted by the
+salaries for the sums), and the plots only reshape the resulting small matrices.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from topk import top_k_positions
+
+
+class GroupAggregates:
+    """
+    Number of vacancies per group and number and sum of the disclosed salaries per (group, Job),
+    for the groups Location and Company, of a set of rows of the job data.
+
+    Each aggregate is computed the first time it is requested, and then kept, so the plots
+    sharing the object never repeat the work (a lock keeps concurrent callbacks from
+    computing the same aggregate twice). The groups of a categorical column are all its
+    categories, as in value_counts; those of any other column are the values of the rows.
+    Rows without a job or a group are left out of the cells of that group.
+
+    The number of vacancies per group of a categorical column may be given when already known
+    (as for a salary range alone, from the cumulative counts of the salary index), so the
+    codes of the rows are not counted again.
+
+    It requires 1 input (plus 3 optional ones):
+    1. df : Dataframe with the job data (Pandas dataframe).
+    2. rows : Positions of the rows to aggregate, or None for every row (NumPy array).
+    3. salary_column : Name of the salary column (String).
+    4. vacancy_counts : Number of vacancies of each category of a column, per column (Dictionary of NumPy arrays).
+    """
+
+    def __init__(self, df, rows=None, salary_column='Salary', vacancy_counts=None):
+        self.df = df
+        self.rows = rows
+        self.salary_column = salary_column
+        self._cache = {}
+        self._vacancy_counts = vacancy_counts or {}
+        self._lock = threading.RLock()
+
+    def _cached(self, name, function):
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = function()
+            return self._cache[name]
+
+    def _column(self, column):
+        # Integer codes of a column for the aggregated rows, and the labels of the codes
+        def compute():
+            series = self.df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                return (codes if self.rows is None else codes[self.rows]), self.labels(column)
+            values = series.to_numpy() if self.rows is None else series.to_numpy()[self.rows]
+            codes, uniques = pd.factorize(values, sort=True)
+            return codes, pd.Index(uniques, name=column)
+        return self._cached(('column', column), compute)
+
+    def labels(self, column):
+        """
+        This function returns the groups of a column, in the order of the rows of the aggregates (Pandas index).
+        """
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Every category of the column, without gathering the codes of the rows
+            return self._cached(('labels', column), lambda: pd.CategoricalIndex(
+                pd.Categorical.from_codes(np.arange(len(series.cat.categories)), dtype=series.dtype), name=column))
+        return self._column(column)[1]
+
+    def _disclosed(self):
+        # Positions among the aggregated rows, job codes and values of the disclosed salaries
+        def compute():
+            salary = self.df[self.salary_column].to_numpy(dtype=np.float64)
+            if self.rows is not None:
+                salary = salary[self.rows]
+            positions = np.flatnonzero(~np.isnan(salary))
+            return positions, self._column('Job')[0][positions], salary[positions]
+        return self._cached('disclosed', compute)
+
+    def vacancy_counts(self, by):
+        """
+        This function returns the number of vacancies of each group, as value_counts.
+        """
+        def compute():
+            if by in self._vacancy_counts and isinstance(self.df[by].dtype, pd.CategoricalDtype):
+                return pd.Series(self._vacancy_counts[by], index=self.labels(by), name='Count')
+            return pd.Series(_group_counts(self._column(by)[0], len(self.labels(by))), index=self.labels(by), name='Count')
+        return self._cached(('vacancies', by), compute)
+
+    def top_groups(self, by, k):
+        """
+        This function returns the k groups with the most vacancies, without sorting every group.
+
+        It requires 2 inputs:
+        1. by : Group column, 'Location' or 'Company' (String).
+        2. k : Number of groups (Integer).
+
+        Output:
+        1. Pandas dataframe with the columns by and Vacancies, in decreasing order of vacancies
+           and then in the order of the groups (as a count per group sorted by count and group).
+        """
+        counts = self.vacancy_counts(by)
+        positions = top_k_positions(counts.to_numpy(), k)
+        return pd.DataFrame({by: np.asarray(counts.index[positions], dtype=object),
+                             'Vacancies': counts.to_numpy()[positions]})
+
+    def salary_cells(self, by):
+        """
+        This function returns the number and the sum of the disclosed salaries per group and Job.
+
+        Input:
+        1. by : Group column, 'Location' or 'Company' (String).
+
+        Output:
+        1. NumPy arrays of shape (groups, jobs) with the number of salaries and their sum.
+        """
+        def compute():
+            positions, job_codes, salary = self._disclosed()
+            return _salary_cells(self._column(by)[0][positions], job_codes, salary,
+                                 len(self.labels(by)), len(self.labels('Job')))
+        return self._cached(('salaries', by), compute)
+
+    def mean_salary(self, by):
+        """
+        This function returns the mean salary per group and Job, as pivot_table with aggfunc='mean'.
+
+        Input:
+        1. by : Group column, 'Location' or 'Company' (String).
+
+        Output:
+        1. Pandas dataframe with one row per group and one column per job with disclosed
+           salaries, NaN for the cells without salaries.
+        """
+        counts, sums = self.salary_cells(by)
+        rows = counts.sum(axis=1) > 0
+        columns = counts.sum(axis=0) > 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums[rows][:, columns] / counts[rows][:, columns]
+
+        return pd.DataFrame(means, index=self.labels(by)[rows], columns=self.labels('Job')[columns])
+
+    def refreshed(self, df, rows=None, added=None, removed=None):
+        """
+        This function returns the aggregates of the same filter state over a new version of the dataset, applying
+        only the rows added and removed since the version of these aggregates.
+
+        The vacancies and salaries already aggregated per categorical column are updated: the
+        aggregates of the removed rows are subtracted, the groups are matched by label with those
+        of the new version (new groups start at zero) and the aggregates of the added rows are
+        added. The other aggregates are computed when first requested, as usual.
+
+        It requires 1 input (plus 3 optional ones):
+        1. df : New version of the job data (Pandas dataframe).
+        2. rows : Sorted positions of the rows of the filter state in the new version, or None for every row (NumPy array).
+        3. added : Positions of the rows of the new version that are not in this one (NumPy array).
+        4. removed : Positions of the rows of this version that are not in the new one (NumPy array).
+
+        Output:
+        1. Aggregates of the new version (GroupAggregates).
+        """
+        added = np.empty(0, dtype=np.intp) if added is None else np.asarray(added, dtype=np.intp)
+        removed = np.empty(0, dtype=np.intp) if removed is None else np.asarray(removed, dtype=np.intp)
+        # Only the changed rows of the filter state count
+        if rows is not None:
+            added = added[_contains(rows, added)]
+        if self.rows is not None:
+            removed = removed[_contains(self.rows, removed)]
+
+        refreshed = GroupAggregates(df, rows, self.salary_column)
+        with self._lock:
+            cached = [(name, value) for name, value in self._cache.items()
+                      if isinstance(name, tuple) and name[0] in ('vacancies', 'salaries')]
+        old, new = _ChangedRows(self.df, removed, self.salary_column), _ChangedRows(df, added, self.salary_column)
+        positions = {}
+
+        def moved(values, column, axis):
+            # Groups of the old version moved to their position in the new one, unless the categories are the same
+            if column not in positions:
+                old_categories, new_categories = old.categories(column), new.categories(column)
+                positions[column] = (None if old_categories.equals(new_categories) else
+                                     old_categories.get_indexer(new_categories))
+            return values if positions[column] is None else _moved(values, positions[column], axis)
+
+        for (kind, by), value in cached:
+            if not all(changed.categorical(column) for changed in (old, new) for column in (by, 'Job')):
+                continue
+            if kind == 'vacancies':
+                refreshed._cache[(kind, by)] = pd.Series(moved(value.to_numpy() - old.vacancy_counts(by), by, 0) +
+                                                         new.vacancy_counts(by), index=refreshed.labels(by), name='Count')
+            else:
+                refreshed._cache[(kind, by)] = tuple(moved(moved(cells - gone_cells, by, 0), 'Job', 1) + new_cells
+                                                     for cells, gone_cells, new_cells
+                                                     in zip(value, old.salary_cells(by), new.salary_cells(by)))
+        return refreshed
+
+
+class _ChangedRows:
+    # Vacancies and salary cells of the few rows changed between two versions of the dataset, from the codes of their
+    # categorical columns (without the pandas objects of GroupAggregates, whose cost would exceed the counting)
+
+    def __init__(self, df, positions, salary_column):
+        self.df = df
+        self.positions = positions
+        salary = df[salary_column].to_numpy(dtype=np.float64)[positions]
+        self.disclosed = ~np.isnan(salary)
+        self.salary = salary[self.disclosed]
+        self._columns = {}
+
+    def categorical(self, column):
+        return isinstance(self.df[column].dtype, pd.CategoricalDtype)
+
+    def categories(self, column):
+        return self.df[column].dtype.categories
+
+    def codes(self, column):
+        if column not in self._columns:
+            self._columns[column] = self.df[column].array.codes[self.positions]
+        return self._columns[column]
+
+    def vacancy_counts(self, by):
+        return _group_counts(self.codes(by), len(self.categories(by)))
+
+    def salary_cells(self, by):
+        return _salary_cells(self.codes(by)[self.disclosed], self.codes('Job')[self.disclosed], self.salary,
+                             len(self.categories(by)), len(self.categories('Job')))
+
+
+def _contains(sorted_rows, positions):
+    # Whether each position is among the sorted rows, by binary searches
+    found = np.searchsorted(sorted_rows, positions)
+    inside = found < len(sorted_rows)
+    inside[inside] = sorted_rows[found[inside]] == positions[inside]
+    return inside
+
+
+def _group_counts(codes, n_groups):
+    # Number of rows per group from their codes, without the rows of a missing group (-1)
+    return np.bincount(codes.astype(np.intp) + 1, minlength=n_groups + 1)[1:]
+
+
+def _salary_cells(group_codes, job_codes, salary, n_groups, n_jobs):
+    # Number and sum of the salaries per (group, job) cell, with the codes shifted by one so the missing ones (-1)
+    # fall into the first row and column of the cells, dropped from the matrices
+    shape = (n_groups + 1, n_jobs + 1)
+    cells = (group_codes.astype(np.intp) + 1) * shape[1]
+    cells += job_codes
+    cells += 1
+
+    counts = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)[1:, 1:]
+    sums = np.bincount(cells, weights=salary, minlength=shape[0] * shape[1]).reshape(shape)[1:, 1:]
+    return counts, sums
+
+
+def _moved(values, positions, axis):
+    # Values of the old groups moved to the positions of the new groups along an axis, zero for the new groups
+    if values.shape[axis] == 0:
+        shape = list(values.shape)
+        shape[axis] = len(positions)
+        return np.zeros(shape, dtype=values.dtype)
+    moved = np.take(values, np.maximum(positions, 0), axis=axis)
+    missing = [slice(None)] * values.ndim
+    missing[axis] = positions < 0
+    moved[tuple(missing)] = 0
+    return moved
+
+
+def group_aggregates(data):
+    """
+    This function returns the aggregates of a dataframe, or the aggregates themselves if already computed.
+    """
+    if isinstance(data, GroupAggregates):
+        return data
+    return GroupAggregates(data)
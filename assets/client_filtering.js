@@ -0,0 +1,402 @@
+/*
+ * CLIENT-SIDE FILTERING OF THE DATA JOBS DASHBOARD
+ *
+ * Clientside callbacks of the client-side filtering mode (see client_data.py): the filter
+ * state and the six plots are computed in the browser from the dictionary-encoded copy of
+ * the dataset stored in the layout, with no request to the server.
+ *
+ * Each function follows its server-side counterpart in 4-Dashboard.py, so both modes draw
+ * the same figures: the rows are filtered as FilterIndex.query does, aggregated once per
+ * filter state as GroupAggregates does, and the data of the traces of the templates (the
+ * figures of the default state, rendered by the server) is replaced by the new one.
+ * Dash loads every script of the assets folder; these functions are only called when the
+ * dashboard runs in the client-side mode.
+ */
+
+(function () {
+  'use strict';
+
+  var ALL = 'All';
+  var SALARY_RANGE_OPTION = 'Enable Salary Range Selection';
+  var FENCE_TOLERANCE = 1e-9;
+  var TYPES = {int8: Int8Array, int16: Int16Array, int32: Int32Array, int64: BigInt64Array,
+               float32: Float32Array, float64: Float64Array};
+
+  // Decoded copy of the dataset (per dataset token) and aggregates of the last filter state
+  var dataset = {token: null};
+  var last = {id: null, aggregates: null};
+
+  function decodeArray(encoded) {
+    var binary = atob(encoded.data);
+    var bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) {
+      bytes[i] = binary.charCodeAt(i);
+    }
+    return new TYPES[encoded.dtype](bytes.buffer);
+  }
+
+  function decodeDataset(data) {
+    if (dataset.token === data.token) {
+      return dataset;
+    }
+    var columns = {};
+    Object.keys(data.columns).forEach(function (name) {
+      var column = data.columns[name];
+      // Without a prototype, so labels such as "constructor" or "toString" are only found if they are in the column
+      var codes = Object.create(null);
+      column.labels.forEach(function (label, code) { codes[label] = code; });
+      columns[name] = {codes: decodeArray(column), labels: column.labels, lookup: codes};
+    });
+    dataset = {token: data.token, rows: data.rows, columns: columns, salary: decodeArray(data.salary)};
+    last = {id: null, aggregates: null};
+    return dataset;
+  }
+
+  function isEmpty(value) {
+    return value === null || value === undefined || value === '' || (Array.isArray(value) && value.length === 0);
+  }
+
+  // Value of a dropdown as in filter_index.normalize_selection: null for 'All', sorted unique values otherwise
+  function normalizeSelection(selection) {
+    if (selection === null || selection === undefined) {
+      return null;
+    }
+    if (typeof selection === 'string') {
+      selection = [selection];
+    }
+    if (selection.indexOf(ALL) >= 0) {
+      return null;
+    }
+    return selection.filter(function (value, i) { return selection.indexOf(value) === i; }).sort(compareText);
+  }
+
+  // Comparison of strings by code point, as Python sorts them
+  function compareText(a, b) {
+    if (a === b) {
+      return 0;
+    }
+    var x = Array.from(a), y = Array.from(b);
+    for (var i = 0; i < Math.min(x.length, y.length); i++) {
+      if (x[i] !== y[i]) {
+        return x[i].codePointAt(0) - y[i].codePointAt(0);
+      }
+    }
+    return x.length - y.length;
+  }
+
+  // Membership of the codes of a column in a selection (null: every row)
+  function selectedCodes(column, selection) {
+    if (selection === null) {
+      return null;
+    }
+    var selected = new Uint8Array(column.labels.length + 1);
+    selection.forEach(function (value) {
+      if (value in column.lookup) {
+        selected[column.lookup[value] + 1] = 1;
+      }
+    });
+    return selected;
+  }
+
+  function aggregate(data, key) {
+    var id = data.token + JSON.stringify(key);
+    if (last.id === id) {
+      return last.aggregates;
+    }
+    var ds = decodeDataset(data);
+    var job = ds.columns.Job, location = ds.columns.Location, company = ds.columns.Company;
+    var jobs = job.labels.length, locations = location.labels.length, companies = company.labels.length;
+    var filters = [[job.codes, selectedCodes(job, key[0])], [location.codes, selectedCodes(location, key[1])],
+                   [company.codes, selectedCodes(company, key[2])]].filter(function (f) { return f[1] !== null; });
+    var range = key[3];
+
+    var result = {
+      jobCounts: new Float64Array(jobs), locationCounts: new Float64Array(locations),
+      companyCounts: new Float64Array(companies),
+      locationCells: {counts: new Float64Array(locations * jobs), sums: new Float64Array(locations * jobs)},
+      companyCells: {counts: new Float64Array(companies * jobs), sums: new Float64Array(companies * jobs)},
+      boxes: job.labels.map(function () { return []; })
+    };
+
+    for (var row = 0; row < ds.rows; row++) {
+      var keep = true;
+      for (var f = 0; f < filters.length; f++) {
+        if (!filters[f][1][filters[f][0][row] + 1]) {
+          keep = false;
+          break;
+        }
+      }
+      var salary = ds.salary[row];
+      if (!keep || (range !== null && !(salary >= range[0] && salary <= range[1]))) {
+        continue;
+      }
+      var j = job.codes[row], l = location.codes[row], c = company.codes[row];
+      if (j >= 0) {
+        result.jobCounts[j] += 1;
+      }
+      if (l >= 0) {
+        result.locationCounts[l] += 1;
+      }
+      if (c >= 0) {
+        result.companyCounts[c] += 1;
+      }
+      if (salary === salary && j >= 0) {
+        result.boxes[j].push(salary);
+        if (l >= 0) {
+          result.locationCells.counts[l * jobs + j] += 1;
+          result.locationCells.sums[l * jobs + j] += salary;
+        }
+        if (c >= 0) {
+          result.companyCells.counts[c * jobs + j] += 1;
+          result.companyCells.sums[c * jobs + j] += salary;
+        }
+      }
+    }
+
+    last = {id: id, aggregates: result};
+    return result;
+  }
+
+  // Figure of a template with new traces (the layout is copied, as Plotly writes into it)
+  function figure(template, traces) {
+    return {data: traces, layout: JSON.parse(JSON.stringify(template.layout))};
+  }
+
+  function withData(trace, changes) {
+    return Object.assign({}, trace, changes);
+  }
+
+  function truncate(text, length) {
+    return Array.from(text).slice(0, length).join('');
+  }
+
+  // Mean salaries per (group, job), as GroupAggregates.mean_salary: groups and jobs with salaries only
+  function meanSalary(cells, groups, jobs) {
+    var rows = [], columns = [];
+    for (var j = 0; j < jobs; j++) {
+      var any = false;
+      for (var g = 0; g < groups && !any; g++) {
+        any = cells.counts[g * jobs + j] > 0;
+      }
+      if (any) {
+        columns.push(j);
+      }
+    }
+    for (var g2 = 0; g2 < groups; g2++) {
+      for (var j2 = 0; j2 < jobs; j2++) {
+        if (cells.counts[g2 * jobs + j2] > 0) {
+          rows.push(g2);
+          break;
+        }
+      }
+    }
+    var mean = function (group, j) {
+      var count = cells.counts[group * jobs + j];
+      return count > 0 ? cells.sums[group * jobs + j] / count : NaN;
+    };
+    return {rows: rows, columns: columns, mean: mean};
+  }
+
+  // Statistics of a box as box_stats.box_statistics (linear quartiles and whiskers of Plotly)
+  function boxStatistics(values) {
+    var n = values.length;
+    var ordered = Float64Array.from(values).sort();
+    var quantile = function (p) {
+      var position = Math.min(Math.max(p * n - 0.5, 0), n - 1);
+      var floor = Math.floor(position), ceil = Math.ceil(position), fraction = position % 1;
+      return fraction * ordered[ceil] + (1 - fraction) * ordered[floor];
+    };
+    var q1 = quantile(0.25), median = quantile(0.5), q3 = quantile(0.75);
+    var step = n > 1 ? (ordered[n - 1] - ordered[0]) / (n - 1) : 1;
+    var lower = 2.5 * q1 - 1.5 * q3 - step * FENCE_TOLERANCE;
+    var upper = 2.5 * q3 - 1.5 * q1 + step * FENCE_TOLERANCE;
+    var lowerfence = q1, upperfence = q3;
+    for (var i = 0; i < n; i++) {
+      if (ordered[i] >= lower) {
+        lowerfence = Math.min(q1, ordered[i]);
+        break;
+      }
+    }
+    for (var k = n - 1; k >= 0; k--) {
+      if (ordered[k] <= upper) {
+        upperfence = Math.max(q3, ordered[k]);
+        break;
+      }
+    }
+    return {q1: q1, median: median, q3: q3, lowerfence: lowerfence, upperfence: upperfence};
+  }
+
+  // Points drawn next to a box: every salary up to maxPoints; otherwise, the outliers (up to half of the points)
+  // and evenly spaced salaries among the other ones, in their original order (the server draws a random sample)
+  function boxPoints(values, stats, maxPoints) {
+    if (values.length <= maxPoints) {
+      return values;
+    }
+    var outliers = [], inliers = [];
+    values.forEach(function (value, i) {
+      (value < stats.lowerfence || value > stats.upperfence ? outliers : inliers).push(i);
+    });
+    var spaced = function (positions, count) {
+      var picked = [];
+      for (var i = 0; i < count; i++) {
+        picked.push(positions[Math.floor(i * positions.length / count)]);
+      }
+      return picked;
+    };
+    outliers = spaced(outliers, Math.min(outliers.length, Math.floor(maxPoints / 2)));
+    inliers = spaced(inliers, Math.min(inliers.length, maxPoints - outliers.length));
+    return outliers.concat(inliers).sort(function (a, b) { return a - b; }).map(function (i) { return values[i]; });
+  }
+
+  var plots = {
+    // Job Demand: Pie Chart
+    demand_job_plot: function (data, aggregates) {
+      var ds = decodeDataset(data), labels = ds.columns.Job.labels;
+      var order = [];
+      aggregates.jobCounts.forEach(function (count, j) {
+        if (count > 0) {
+          order.push(j);
+        }
+      });
+      order.sort(function (a, b) { return aggregates.jobCounts[b] - aggregates.jobCounts[a] || a - b; });
+      var template = data.templates.demand_job_plot;
+      return figure(template, [withData(template.data[0], {
+        labels: order.map(function (j) { return labels[j]; }),
+        values: order.map(function (j) { return aggregates.jobCounts[j]; }),
+        customdata: order.map(function (j) { return [labels[j]]; })
+      })]);
+    },
+
+    // Company Demand: Bar Chart of the top 15 companies
+    demand_company_plot: function (data, aggregates) {
+      var ds = decodeDataset(data), labels = ds.columns.Company.labels, counts = aggregates.companyCounts;
+      var top = [];
+      counts.forEach(function (count, c) {
+        if (count > 0) {
+          top.push(c);
+        }
+      });
+      top.sort(function (a, b) { return counts[b] - counts[a] || a - b; });
+      top = top.slice(0, 15).sort(function (a, b) { return counts[a] - counts[b] || a - b; });
+      var template = data.templates.demand_company_plot;
+      return figure(template, [withData(template.data[0], {
+        x: top.map(function (c) { return counts[c]; }),
+        y: top.map(function (c) { return truncate(labels[c], 25); })
+      })]);
+    },
+
+    // Location Demand: Choropleth Map of the percentage of the vacancies per state
+    demand_location_plot: function (data, aggregates) {
+      var total = 0;
+      aggregates.locationCounts.forEach(function (count) { total += count; });
+      var template = data.templates.demand_location_plot;
+      return figure(template, [withData(template.data[0], {
+        z: data.map_locations.map(function (l) {
+          return l >= 0 && total > 0 ? aggregates.locationCounts[l] / total * 100 : 0;
+        })
+      })]);
+    },
+
+    // Salary Per Job: Boxplot, one trace per job of the template with salaries
+    salary_job_plot: function (data, aggregates) {
+      var ds = decodeDataset(data), template = data.templates.salary_job_plot;
+      var traces = [];
+      template.data.forEach(function (trace) {
+        var values = aggregates.boxes[ds.columns.Job.lookup[trace.name]] || [];
+        if (values.length === 0) {
+          return;
+        }
+        if (!('q1' in trace)) {
+          traces.push(withData(trace, {x: values.map(function () { return trace.name; }), y: values}));
+          return;
+        }
+        var stats = boxStatistics(values);
+        traces.push(withData(trace, {
+          x: [trace.name], y: [boxPoints(values, stats, data.max_points)], q1: [stats.q1], median: [stats.median],
+          q3: [stats.q3], lowerfence: [stats.lowerfence], upperfence: [stats.upperfence]
+        }));
+      });
+      var result = figure(template, traces);
+      if (traces.length === 0 && result.layout.legend) {
+        // Plotly Express only titles the legend of the boxes it draws
+        delete result.layout.legend.title;
+      }
+      return result;
+    },
+
+    // Salary Per Company: Heatmap of the 30 companies with the highest average salary
+    salary_company_plot: function (data, aggregates) {
+      var ds = decodeDataset(data), jobLabels = ds.columns.Job.labels, labels = ds.columns.Company.labels;
+      var means = meanSalary(aggregates.companyCells, labels.length, jobLabels.length);
+      var total = {};
+      means.rows.forEach(function (c) {
+        var sum = 0, count = 0;
+        means.columns.forEach(function (j) {
+          var mean = means.mean(c, j);
+          if (mean === mean) {
+            sum += mean;
+            count += 1;
+          }
+        });
+        total[c] = count > 0 ? sum / count : 0;
+      });
+      var top = means.rows.slice().sort(function (a, b) { return total[b] - total[a] || a - b; })
+        .slice(0, 30).sort(function (a, b) { return b - a; });
+      var x = [], y = [], z = [];
+      means.columns.forEach(function (j) {
+        top.forEach(function (c) {
+          var mean = means.mean(c, j);
+          x.push(jobLabels[j]);
+          y.push(labels[c]);
+          z.push(mean === mean ? mean : 0);
+        });
+      });
+      var template = data.templates.salary_company_plot;
+      return figure(template, [withData(template.data[0], {x: x, y: y, z: z})]);
+    },
+
+    // Salary Per Location: Contour plot of the average salary per state and job
+    salary_location_plot: function (data, aggregates) {
+      var ds = decodeDataset(data), jobLabels = ds.columns.Job.labels;
+      var means = meanSalary(aggregates.locationCells, ds.columns.Location.labels.length, jobLabels.length);
+      var x = [], y = [], z = [];
+      means.columns.forEach(function (j) {
+        data.contour_locations.forEach(function (location) {
+          var mean = location[1] >= 0 ? means.mean(location[1], j) : NaN;
+          x.push(jobLabels[j]);
+          y.push(location[0]);
+          z.push(mean === mean ? mean : 0);
+        });
+      });
+      var template = data.templates.salary_location_plot;
+      return figure(template, [withData(template.data[0], {x: x, y: y, z: z})]);
+    }
+  };
+
+  var callbacks = {
+    // Canonical filter state, as update_filter_state and figure_cache.filter_key compute it on the server
+    filter_state: function (job, location, company, salary, salaryFilter, data) {
+      if (isEmpty(job) && isEmpty(company) && isEmpty(location) && (salary === null || salary === undefined)) {
+        return window.dash_clientside.no_update;
+      }
+      var range = null;
+      if (Array.isArray(salaryFilter) && salaryFilter.length === 1 && salaryFilter[0] === SALARY_RANGE_OPTION &&
+          Array.isArray(salary)) {
+        range = [Math.floor(salary[0] / data.salary_step) * data.salary_step,
+                 Math.ceil(salary[1] / data.salary_step) * data.salary_step];
+      }
+      return {key: [normalizeSelection(job), normalizeSelection(location), normalizeSelection(company), range]};
+    }
+  };
+
+  Object.keys(plots).forEach(function (figureId) {
+    callbacks[figureId] = function (filterState, data) {
+      if (!filterState || !data) {
+        return window.dash_clientside.no_update;
+      }
+      return plots[figureId](data, aggregate(data, filterState.key));
+    };
+  });
+
+  window.dash_clientside = Object.assign({}, window.dash_clientside, {client_filtering: callbacks});
+})();
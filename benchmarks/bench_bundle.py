@@ -0,0 +1,110 @@
+### BENCHMARK: STATIC BUNDLES OF THE FIGURES AND WARM-UP OF THE CACHES
+
+"""
+Benchmark of the first requests of the common filter states of the dashboard (the default
+state, each job category, each location and the companies with the most vacancies), as the
+first visitors after a deploy send them: every figure computed from the data, every figure
+read from a static bundle (figure_bundle.py), and every figure served by caches warmed up
+before the server accepts requests. The time of the export and of the warm-up, with and
+without a bundle, and the size of the bundle are reported as well.
+
+Each figure read from the bundle is checked against the figure computed from the data.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_bundle --rows 0 100000
+(0 rows stands for the actual dataset of the repository)
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+from benchmarks.dashboard import load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+from figure_bundle import common_filter_keys, export_bundle, open_bundle
+
+
+def serve_states(dashboard, keys):
+    """
+    This function requests every bundled plot of each filter state and returns the time per state (seconds).
+    """
+    seconds = []
+    for key in keys:
+        start = time.perf_counter()
+        filter_state = dashboard.filter_state_of(key)
+        for plot_function in dashboard.bundled_plots:
+            dashboard.build_figure(plot_function, filter_state)
+        seconds.append(time.perf_counter() - start)
+    return np.array(seconds)
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, names in os.walk(directory) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the static bundles of the figures and of the warm-up.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[0, 100_000])
+    parser.add_argument('--top-companies', type=int, default=20)
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    base_df = dashboard.df
+
+    for n_rows in args.rows:
+        df = base_df if n_rows == 0 else make_dataset(n_rows)
+        keys = common_filter_keys(df, args.top_companies)
+
+        with tempfile.TemporaryDirectory() as root:
+            use_dataset(dashboard, df)
+            dashboard.figure_bundle = None
+            start = time.perf_counter()
+            directory = export_bundle(root, dashboard.dataset_token, dashboard.figure_settings,
+                                      dashboard.bundle_builders(), keys)
+            export_seconds = time.perf_counter() - start
+            bundle = open_bundle(root, dashboard.dataset_token, dashboard.figure_settings)
+
+            # First requests with cold caches: figures computed from the data (as long as a warm-up without a bundle)
+            use_dataset(dashboard, df)
+            computed = serve_states(dashboard, keys)
+
+            # First requests with cold caches: figures read from the bundle, checked against the computed ones
+            use_dataset(dashboard, df)
+            dashboard.figure_bundle = bundle
+            bundled = serve_states(dashboard, keys)
+            assert bundle.stats()['hits'] == len(keys) * len(dashboard.bundled_plots)
+            for key in keys:
+                filter_state = dashboard.filter_state_of(key)
+                for plot_function in dashboard.bundled_plots:
+                    expected = json.dumps(plot_function(dashboard.filter_store.aggregates(dashboard.df, filter_state['hash'], key)
+                                                        if plot_function in dashboard.aggregate_plots else
+                                                        dashboard.filter_store.select(dashboard.df, filter_state['hash'], key)),
+                                          cls=PlotlyJSONEncoder)
+                    assert json.dumps(dashboard.build_figure(plot_function, filter_state), cls=PlotlyJSONEncoder) == expected, \
+                        f'{plot_function.__name__} differs from the bundle for {key}'
+
+            use_dataset(dashboard, df)
+            start = time.perf_counter()
+            dashboard.warm_up()
+            warm_up_bundled = time.perf_counter() - start
+
+            # Requests served by the warmed-up caches
+            warmed = serve_states(dashboard, keys)
+            bundle_bytes = directory_bytes(directory)
+            dashboard.figure_bundle = None
+
+        print(f'{len(df):,} rows, {len(keys)} common filter states x {len(dashboard.bundled_plots)} plots: '
+              f'export {export_seconds:.1f} s, bundle {bundle_bytes / 1024 / 1024:.1f} MB; '
+              f'warm-up {computed.sum():.1f} s computed, {warm_up_bundled:.2f} s from the bundle')
+        for label, seconds in (('computed', computed), ('bundle', bundled), ('warmed-up caches', warmed)):
+            print(f'{label:>18}: first request of a state p50 {np.percentile(seconds, 50) * 1000:8.2f} ms   '
+                  f'p90 {np.percentile(seconds, 90) * 1000:8.2f} ms   total {seconds.sum():6.2f} s')
+
+
+if __name__ == '__main__':
+    main()
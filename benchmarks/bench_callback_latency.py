@@ -0,0 +1,120 @@
+### BENCHMARK: END-TO-END LATENCY OF THE DASHBOARD CALLBACKS
+
+"""
+Benchmark of the latency of a dashboard update, from the change of the filters until the
+figures are serialized, for:
+- the former monolithic callback, which filtered the data and built the six figures one
+  after another, and
+- the split callbacks, where the rows matching the filters are computed once and the six
+  figure callbacks run concurrently (as the browser sends them as parallel requests).
+
+The figure cache is cleared before every update so each one is a cold computation.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_callback_latency --rows 0 100000
+(0 rows stands for the actual dataset of the repository)
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import plotly.io as pio
+
+from benchmarks.dashboard import load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+from figure_cache import filter_key
+
+
+def random_states(df, n_states, seed=0):
+    """
+    This function returns random filter states (job, location, company, salary, salary_filter).
+    """
+    rng = np.random.default_rng(seed)
+    jobs = df['Job'].unique().tolist()
+    locations = df['Location'].value_counts().index[:8].tolist()
+    companies = df['Company'].value_counts().index[:30].tolist()
+
+    def pick(values):
+        if rng.random() < 0.5:
+            return ['All']
+        return rng.choice(values, size=rng.integers(1, 4), replace=False).tolist()
+
+    states = []
+    for _ in range(n_states):
+        salary_filter = ['Enable Salary Range Selection'] if rng.random() < 0.3 else None
+        states.append((pick(jobs), pick(locations), pick(companies), [10000, 80000], salary_filter))
+    return states
+
+
+def monolithic_update(dashboard, state):
+    """
+    Former update_output: one filter pass, then the six figures built and serialized sequentially.
+    """
+    job, location, company, salary, salary_filter = state
+    salary_range = tuple(salary) if salary_filter else None
+    job, location, company, salary_range = filter_key(job, location, company, salary_range)
+    dff = dashboard.filter_index.select(dashboard.df, job, location, company, salary_range)
+    for plot_function in dashboard.figures.values():
+        pio.to_json(plot_function(dff), validate=False)
+
+
+def split_update(dashboard, state, executor):
+    """
+    Split callbacks: filter state callback, then the six figure callbacks concurrently.
+
+    Output:
+    1. Elapsed seconds until each figure is serialized, in completion order.
+    """
+    start = time.perf_counter()
+    filter_state = dashboard.update_filter_state(*state)
+
+    def figure_callback(plot_function):
+        pio.to_json(dashboard.build_figure(plot_function, filter_state), validate=False)
+        return time.perf_counter() - start
+
+    futures = [executor.submit(figure_callback, plot_function) for plot_function in dashboard.figures.values()]
+    return sorted(future.result() for future in futures)
+
+
+def percentiles(values):
+    return np.percentile(np.array(values) * 1000, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the latency of the dashboard callbacks.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[0, 100_000])
+    parser.add_argument('--states', type=int, default=40)
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    base_df = dashboard.df
+
+    with ThreadPoolExecutor(max_workers=len(dashboard.figures)) as executor:
+        for n_rows in args.rows:
+            use_dataset(dashboard, base_df if n_rows == 0 else make_dataset(n_rows))
+            states = random_states(dashboard.df, args.states)
+
+            monolithic, first_figure, all_figures = [], [], []
+            for state in states:
+                dashboard.figure_cache.clear()
+                start = time.perf_counter()
+                monolithic_update(dashboard, state)
+                monolithic.append(time.perf_counter() - start)
+
+                dashboard.figure_cache.clear()
+                completions = split_update(dashboard, state, executor)
+                first_figure.append(completions[0])
+                all_figures.append(completions[-1])
+
+            label = f'{len(dashboard.df):,} rows'
+            for name, values in (('monolithic (all figures)', monolithic),
+                                 ('split (first figure)', first_figure),
+                                 ('split (all figures)', all_figures)):
+                p50, p95 = percentiles(values)
+                print(f'{label:>14} {name:>26}: p50 {p50:8.1f} ms   p95 {p95:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
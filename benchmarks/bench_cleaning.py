@@ -0,0 +1,71 @@
+### BENCHMARK: VECTORIZED CLEANING OF THE SCRAPED JOB DATA
+
+"""
+Benchmark of the cleaning of the raw job data: the loops of 2-DataWrangling.ipynb (one
+map of a lambda over every row for each rule, rebuilding the lists of keys and values of
+the dictionaries at every call) against cleaning.clean_dataframe.
+
+The raw datasets repeat the vacancies of Dataset_Raw.csv, each repetition with different
+company names, so the shares of duplicates, non data-related jobs and salary formats are
+those of the actual crawl. Both implementations must return the same data.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_cleaning --rows 100000 1000000 10000000 --legacy-max 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_pipeline import notebook_clean
+from benchmarks.occ_standin import RAW_CSV
+from cleaning import clean_dataframe
+
+
+def make_raw_dataset(n_rows):
+    """
+    This function returns n_rows raw vacancies, repeating the vacancies of Dataset_Raw.csv.
+    """
+    raw = pd.read_csv(RAW_CSV)
+    positions = np.arange(n_rows) % len(raw)
+    repetitions = np.arange(n_rows) // len(raw)
+
+    df = raw.take(positions).reset_index(drop=True)
+    company = df['Company'].to_numpy(dtype=object)
+    suffixed = (repetitions > 0) & df['Company'].notna().to_numpy()
+    company[suffixed] = [f'{name} {repetition}' for name, repetition in zip(company[suffixed], repetitions[suffixed])]
+    df['Company'] = company
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the vectorized cleaning.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--legacy-max', type=int, default=1_000_000, help='largest dataset cleaned with the notebook loops')
+    args = parser.parse_args()
+
+    print(f"{'rows':>11} {'kept':>10} {'notebook s':>11} {'vectorized s':>13} {'speedup':>8}")
+    for n_rows in args.rows:
+        df = make_raw_dataset(n_rows)
+
+        start = time.perf_counter()
+        clean = clean_dataframe(df)
+        vectorized = time.perf_counter() - start
+
+        legacy = float('nan')
+        if n_rows <= args.legacy_max:
+            start = time.perf_counter()
+            reference = notebook_clean(df.copy()).reset_index(drop=True)
+            legacy = time.perf_counter() - start
+            if not clean.equals(reference):
+                raise AssertionError(f'Different results for {n_rows} rows')
+
+        speedup = f'{legacy / vectorized:.1f}x' if legacy == legacy else '-'
+        print(f'{n_rows:>11,} {len(clean):>10,} {legacy:>11.2f} {vectorized:>13.2f} {speedup:>8}')
+        del df, clean
+
+
+if __name__ == '__main__':
+    main()
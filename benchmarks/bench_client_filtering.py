@@ -0,0 +1,144 @@
+### BENCHMARK: CLIENT-SIDE FILTERING AGAINST SERVER-SIDE FILTERING
+
+"""
+Benchmark of a session of filter changes in both modes of the dashboard:
+- server-side filtering: every change sends the filter state callback and the six figure
+  callbacks to the server (in process, through the Flask test client, with the partial
+  updates), and
+- client-side filtering: the copy of the dataset is sent once with the layout, and every
+  change is handled by the clientside callbacks of assets/client_filtering.js, run here
+  under Node.js on the same inputs.
+
+The latency of an interaction and the server CPU time of the session are reported for both
+modes (the CPU time of the server mode includes the test client). The rendering of the
+figures by Plotly.js and the panel of the salary tests, computed on the server in both
+modes, are left out. The figures of the first interactions computed under Node.js are
+checked against the figures of the server; the points drawn next to the boxes of more than
+1,000 salaries are sampled differently and are not compared.
+
+Run it from the root of the repository (Node.js is required):
+python -m benchmarks.bench_client_filtering --rows 0 100000
+(0 rows stands for the actual dataset of the repository)
+"""
+
+import argparse
+import base64
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+from benchmarks.bench_callback_latency import random_states
+from benchmarks.bench_metrics import run_pass
+from benchmarks.bench_suite import dashboard_frame
+from benchmarks.bench_throughput import FIGURE_IDS
+from benchmarks.dashboard import ROOT, load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+from filter_store import key_from_json
+
+DRIVER = os.path.join(ROOT, 'benchmarks', 'client_filtering_driver.js')
+
+
+def plain(value):
+    """
+    This function decodes the typed arrays of the JSON of a figure ({'dtype', 'bdata'}) into lists.
+    """
+    if isinstance(value, dict):
+        if 'bdata' in value and 'dtype' in value:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            return array.reshape(value['shape']).tolist() if 'shape' in value else array.tolist()
+        return {name: plain(item) for name, item in value.items()}
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
+
+
+def server_figure(dashboard, figure_id, key, max_points):
+    figure = plain(json.loads(json.dumps(dashboard.build_figure(dashboard.figures[figure_id], dashboard.filter_state_of(key)),
+                                         cls=PlotlyJSONEncoder)))
+    return without_sampled_points(figure, max_points)
+
+
+def without_sampled_points(figure, max_points):
+    # The points of the boxes with more salaries than max_points are sampled differently by the server and the browser
+    for trace in figure['data']:
+        if trace.get('type') == 'box' and 'q1' in trace and len(trace['y'][0]) >= max_points:
+            trace['y'] = None
+    return figure
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the client-side filtering against the server-side filtering.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[0, 100_000])
+    parser.add_argument('--states', type=int, default=40)
+    parser.add_argument('--compared', type=int, default=20, help='Number of interactions whose figures are compared')
+    args = parser.parse_args()
+
+    if shutil.which('node') is None:
+        raise SystemExit('Node.js is required to run the clientside callbacks')
+
+    dashboard = load_dashboard()
+    base_df = dashboard.df
+
+    for n_rows in args.rows:
+        df = base_df if n_rows == 0 else dashboard_frame(make_dataset(n_rows))
+        states = random_states(df, args.states)
+
+        # Server-side filtering: filter state and six figure callbacks per change
+        use_dataset(dashboard, df)
+        client = dashboard.app.server.test_client()
+        rendered = {figure_id: None for figure_id in FIGURE_IDS}
+        server_seconds = []
+        cpu_start = time.process_time()
+        for state in states:
+            start = time.perf_counter()
+            run_pass(client, [state], rendered)
+            server_seconds.append(time.perf_counter() - start)
+        server_cpu = time.process_time() - cpu_start
+
+        # Client-side filtering: the copy of the dataset is sent once with the layout
+        use_dataset(dashboard, df)
+        cpu_start = time.process_time()
+        data = dashboard.client_data()
+        dashboard.client_data_store.data = data
+        layout_bytes = len(client.get('/_dash-layout').data)
+        client_cpu = time.process_time() - cpu_start
+        dashboard.client_data_store.data = None
+        data_bytes = len(json.dumps(data).encode('utf-8'))
+        encoded_bytes = sum(len(column['data']) for column in data['columns'].values()) + len(data['salary']['data'])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'input.json'), 'w', encoding='utf-8') as file:
+                json.dump({'data': data, 'states': states, 'figures': args.compared}, file)
+            subprocess.run(['node', DRIVER, os.path.join(temp_dir, 'input.json'), os.path.join(temp_dir, 'output.json')],
+                           check=True)
+            with open(os.path.join(temp_dir, 'output.json'), encoding='utf-8') as file:
+                output = json.load(file)
+        client_seconds = np.array(output['seconds'])
+
+        # Figures of the browser against the figures of the server
+        for interaction in output['figures']:
+            key = key_from_json(interaction['key'])
+            for figure_id in FIGURE_IDS:
+                expected = server_figure(dashboard, figure_id, key, data['max_points'])
+                actual = without_sampled_points(interaction['figures'][figure_id], data['max_points'])
+                assert actual == expected, f'{figure_id} differs from the server for {key}'
+
+        server_seconds = np.array(server_seconds)
+        print(f'{len(df):,} rows, {args.states} filter changes ({len(output["figures"])} compared with the server)')
+        print(f'  server-side: interaction p50 {np.percentile(server_seconds, 50) * 1000:8.2f} ms   '
+              f'p90 {np.percentile(server_seconds, 90) * 1000:8.2f} ms   server CPU {server_cpu:6.2f} s per session')
+        print(f'  client-side: interaction p50 {np.percentile(client_seconds[1:], 50) * 1000:8.2f} ms   '
+              f'p90 {np.percentile(client_seconds[1:], 90) * 1000:8.2f} ms   server CPU {client_cpu:6.2f} s per session '
+              f'(first interaction, with the decoding: {client_seconds[0] * 1000:.1f} ms)')
+        print(f'  copy of the dataset {data_bytes / 1024:,.1f} KB ({encoded_bytes / 1024:,.1f} KB of encoded columns), '
+              f'layout {layout_bytes / 1024:,.1f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+### BENCHMARK: ENTITY RESOLUTION OF THE COMPANY NAMES
+
+"""
+Benchmark of the entity resolution of the company names (company_resolution.py) on
+synthetic names: companies made of random words, each one published under several
+variants (letter case, legal form, accents, truncation by the website and typos), up to a
+number of distinct raw names. The time and the comparisons of the resolution are reported
+along with its pairwise precision and recall against the true companies, the time of an
+incremental resolution of a new scrape, and the time the naive comparison of every pair of
+keys would take (measured on a sample and extrapolated, as it is quadratic).
+
+Run it from the root of the repository:
+python -m benchmarks.bench_company_resolution --names 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from company_resolution import CompanyResolver, company_key, jaccard, THRESHOLD
+
+LEGAL_FORMS = ['S.A. de C.V.', 'SA de CV', 'S.A.P.I. de C.V.', 'S. de R.L. de C.V.', 'S.C.', 'SAB de CV']
+SYLLABLES = ['ba', 'co', 'de', 'fi', 'ga', 'lo', 'ma', 'ne', 'po', 'ra', 'si', 'te', 'vu', 'xa', 'zo', 'tri', 'mex',
+             'tec', 'sol', 'gru', 'in', 'cor', 'ser', 'al', 'es', 'ción', 'ría', 'án']
+
+
+def make_companies(n_companies, rng):
+    """
+    This function returns the names of distinct synthetic companies, made of two to four random words.
+    """
+    words = np.unique([''.join(rng.choice(SYLLABLES, size=rng.integers(2, 5))).title() for _ in range(20_000)])
+    names = set()
+    while len(names) < n_companies:
+        sizes = rng.integers(2, 5, size=n_companies)
+        for size in sizes:
+            names.add(' '.join(rng.choice(words, size=size)))
+    return sorted(names)[:n_companies]
+
+
+def variant(name, rng):
+    """
+    This function returns a variant of a company name, as published by another recruiter of the company.
+    """
+    kind = rng.integers(6)
+    if kind == 0:
+        return name + ', ' + LEGAL_FORMS[rng.integers(len(LEGAL_FORMS))]
+    if kind == 1:
+        return name.upper() + ' ' + LEGAL_FORMS[rng.integers(len(LEGAL_FORMS))]
+    if kind == 2:
+        return (name + ' ' + LEGAL_FORMS[rng.integers(len(LEGAL_FORMS))])[:rng.integers(20, 34)].rstrip() + '...'
+    if kind == 3:
+        return name.replace('ó', 'o').replace('í', 'i').replace('á', 'a').lower()
+    # Typo: a letter of the name replaced or removed
+    position = rng.integers(len(name))
+    letter = 'aeioulnrst'[rng.integers(10)] if kind == 4 else ''
+    return name[:position] + letter + name[position + 1:]
+
+
+def make_names(n_names, rng, variants=5):
+    """
+    This function returns distinct raw company names and the number of their true company.
+    """
+    companies = make_companies(n_names // variants, rng)
+    names = {}
+    for number, company in enumerate(companies):
+        names.setdefault(company, number)
+        for _ in range(variants * 2):
+            if len(names) >= (number + 1) * variants:
+                break
+            names.setdefault(variant(company, rng), number)
+    raw = pd.Series(list(names.keys()), dtype=object)
+    return raw, np.array(list(names.values()))
+
+
+def pair_counts(labels):
+    counts = np.bincount(pd.factorize(labels)[0])
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def pairwise_scores(predicted, truth):
+    """
+    This function returns the pairwise precision and recall of the predicted companies against the true ones.
+    """
+    both = pair_counts(pd.Series(predicted).astype(str) + '-' + pd.Series(truth).astype(str))
+    return both / max(pair_counts(predicted), 1), both / max(pair_counts(truth), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the entity resolution of the company names.')
+    parser.add_argument('--names', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--new', type=int, default=10_000, help='names of the incremental scrape')
+    parser.add_argument('--naive-sample', type=int, default=1_000, help='keys of the naive comparison')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n_names in args.names:
+        raw, truth = make_names(n_names + args.new, rng)
+        order = rng.permutation(len(raw))
+        first, new = order[:n_names], order[n_names:]
+
+        resolver = CompanyResolver()
+        start = time.perf_counter()
+        resolved = resolver.resolve(raw.iloc[first])
+        seconds = time.perf_counter() - start
+        precision, recall = pairwise_scores(resolved['Company ID'].to_numpy(), truth[first])
+        stats = resolver.stats()
+        print(f'{len(first):,} distinct names ({len(np.unique(truth[first])):,} true companies): {seconds:.1f} s, '
+              f'{stats["keys"]:,} keys, {stats["companies"]:,} companies, {stats["comparisons"]:,} comparisons; '
+              f'pairwise precision {precision:.4f}, recall {recall:.4f}')
+
+        # Incremental scrape: new names resolved against the known ones
+        start = time.perf_counter()
+        resolved_new = resolver.resolve(raw.iloc[new])
+        seconds = time.perf_counter() - start
+        all_ids = np.concatenate([resolver.resolve(raw.iloc[first])['Company ID'].to_numpy(), resolved_new['Company ID'].to_numpy()])
+        precision, recall = pairwise_scores(all_ids, np.concatenate([truth[first], truth[new]]))
+        print(f'  incremental scrape of {len(new):,} names: {seconds:.2f} s; pairwise precision {precision:.4f}, recall {recall:.4f}')
+
+        # Naive comparison of every pair of keys, on a sample
+        keys = list(dict.fromkeys(company_key(name) for name in raw.iloc[first[:args.naive_sample * 2]]))[:args.naive_sample]
+        start = time.perf_counter()
+        for i in range(len(keys)):
+            for j in range(i + 1, len(keys)):
+                jaccard(keys[i], keys[j]) >= THRESHOLD
+        seconds = time.perf_counter() - start
+        pairs = len(keys) * (len(keys) - 1) / 2
+        print(f'  naive comparison of every pair: {seconds / pairs * 1e6:.2f} us per pair, '
+              f'{seconds / pairs * stats["keys"] * (stats["keys"] - 1) / 2 / 3600:,.1f} hours for the {stats["keys"]:,} keys')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+### BENCHMARK: RELOAD OF THE DATASET OF THE RUNNING DASHBOARD
+
+"""
+Benchmark of the reload of the dataset of the running dashboard (reload_dataset of
+4-Dashboard.py, see dataset_reload.py) on synthetic datasets, with two new versions of the
+dataset: one with new rows appended (a new scrape added to the store of the pipeline) and
+one with as many rows removed and added at random positions.
+
+For each version, the aggregates of the common filter states refreshed with the changed
+rows only are timed against their computation over every row (and checked against it), for
+every state and for the states large enough to be refreshed by the dashboard.
+Then, the dashboard is reloaded back and forth between the versions while several threads
+run callbacks (filter state and two figures per call, with a pause between two calls, through the same instrumentation as
+the callbacks of the dashboard): the time of the build and of the swap is reported along
+with the latency of the callbacks outside of the reloads, during the build of the new
+version and from the swap to the end of the warm-up of the caches, and every callback
+checks that it only saw the structures of a single version of the dataset.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_dataset_reload --rows 100000 1000000 --changed 0.01 --threads 8
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_suite import dashboard_frame
+from benchmarks.dashboard import load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+from aggregates import GroupAggregates
+from dataset_reload import row_delta, worth_refreshing
+
+CATEGORICAL_COLUMNS = ['Job', 'Company', 'Location']
+
+
+def new_versions(df, changed, rng):
+    """
+    This function returns a version of the dataset with rows appended and one with rows removed and added at random.
+    """
+    extra = dashboard_frame(make_dataset(max(int(len(df) * changed), 1), seed=1)).astype({'Salary': df['Salary'].dtype})
+    plain = df.astype({column: object for column in CATEGORICAL_COLUMNS})
+    appended = pd.concat([plain, extra.astype({column: object for column in CATEGORICAL_COLUMNS})], ignore_index=True)
+
+    kept = np.sort(rng.choice(len(df), size=len(df) - len(extra), replace=False))
+    replaced = pd.concat([plain.iloc[kept], extra.astype({column: object for column in CATEGORICAL_COLUMNS})],
+                         ignore_index=True)
+    replaced = replaced.iloc[rng.permutation(len(replaced))].reset_index(drop=True)
+    return {'appended': dashboard_frame(appended), 'replaced': dashboard_frame(replaced)}
+
+
+def aggregate_all(aggregates):
+    # Aggregates requested by the plots of the dashboard
+    for by in ('Job', 'Location', 'Company'):
+        aggregates.vacancy_counts(by)
+    for by in ('Location', 'Company'):
+        aggregates.salary_cells(by)
+    return aggregates
+
+
+def benchmark_refresh(dashboard, base, version):
+    """
+    This function times the aggregates of the common filter states refreshed with the changed rows against their
+    computation over every row, and checks them.
+    """
+    from filter_index import FilterIndex
+
+    old_index, new_index = FilterIndex(base), FilterIndex(version)
+    start = time.perf_counter()
+    added, removed = row_delta(base, version)
+    delta_ms = (time.perf_counter() - start) * 1000
+
+    keys = dashboard.common_filter_keys(base)
+    times = []
+    for key in keys:
+        job, location, company, salary_range = key
+        old = aggregate_all(GroupAggregates(base, old_index.query(job, location, company, salary_range)))
+        rows = new_index.query(job, location, company, salary_range)
+
+        start = time.perf_counter()
+        refreshed = aggregate_all(old.refreshed(version, rows, added, removed))
+        refresh_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        full = aggregate_all(GroupAggregates(version, rows))
+        full_seconds = time.perf_counter() - start
+        refreshable = worth_refreshing(len(version) if rows is None else len(rows), len(added) + len(removed))
+        times.append((refreshable, refresh_seconds * 1000, full_seconds * 1000))
+
+        for by in ('Job', 'Location', 'Company'):
+            assert refreshed.vacancy_counts(by).equals(full.vacancy_counts(by))
+        for by in ('Location', 'Company'):
+            assert np.array_equal(refreshed.salary_cells(by)[0], full.salary_cells(by)[0])
+            assert np.allclose(refreshed.salary_cells(by)[1], full.salary_cells(by)[1])
+    times = np.array(times)
+    large = times[times[:, 0] > 0]
+    return len(added), len(removed), delta_ms, times[:, 1:].sum(axis=0), len(large), large[:, 1:].sum(axis=0)
+
+
+def percentiles(latencies):
+    if not latencies:
+        return '-'
+    values = np.percentile(np.array(latencies) * 1000, [50, 99])
+    return f'{values[0]:.1f} / {values[1]:.1f} / {max(latencies) * 1000:.1f}'
+
+
+def benchmark_swaps(dashboard, versions, args, rng):
+    """
+    This function reloads the dashboard back and forth between versions while threads run callbacks, and returns the
+    reloads, the latencies of the callbacks outside of the reloads and during them, and the inconsistent states seen.
+    """
+    keys = dashboard.common_filter_keys(dashboard.df)
+    keys += [dashboard.filter_key(None, None, None, (low, low + 20000)) for low in range(10000, 60000, 10000)]
+    plots = (dashboard.plot_barchart, dashboard.plot_heatmap)
+    inconsistent = []
+
+    def callback(key):
+        # Every structure of the dataset must belong to the same version during a call
+        df, index, store = dashboard.df, dashboard.filter_index, dashboard.filter_store
+        filter_state = dashboard.filter_state_of(key)
+        for plot_function in plots:
+            dashboard.build_figure(plot_function, filter_state)
+        if store.index is not index or index.n_rows != len(df) or dashboard.df is not df or dashboard.filter_store is not store:
+            inconsistent.append(key)
+
+    instrumented = dashboard.instrumented('bench_reload')(callback)
+    stop = threading.Event()
+    calls = []
+
+    def client(seed):
+        client_rng = np.random.default_rng(seed)
+        while not stop.is_set():
+            key = keys[client_rng.integers(len(keys))]
+            start = time.perf_counter()
+            instrumented(key)
+            calls.append((start, time.perf_counter() - start))
+            # Pause of a user between two changes of the filters
+            time.sleep(args.think)
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(args.threads)]
+    for thread in threads:
+        thread.start()
+
+    reloads, windows = [], []
+    time.sleep(args.pause)
+    for number in range(args.swaps):
+        name = list(versions)[(number + 1) % len(versions)]
+        start = time.perf_counter()
+        result = dashboard.reload_dataset(versions[name])
+        end = time.perf_counter()
+        reloads.append((name, result, end - start))
+        if result is not None:
+            windows.append((start, start + result['build_seconds'], end))
+        time.sleep(args.pause)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    # Calls overlapping the build of a new version, the swap and warm-up, or neither
+    latencies = {'outside': [], 'build': [], 'swap': []}
+    for start, latency in calls:
+        stage = 'outside'
+        for build_start, swap_start, end in windows:
+            if build_start <= start + latency and start < swap_start:
+                stage = 'build'
+            elif swap_start <= start + latency and start < end:
+                stage = 'swap'
+        latencies[stage].append(latency)
+    return reloads, latencies, inconsistent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the reload of the dataset of the running dashboard.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--changed', type=float, default=0.01, help='fraction of the rows added (and removed)')
+    parser.add_argument('--threads', type=int, default=8, help='threads running callbacks during the reloads')
+    parser.add_argument('--swaps', type=int, default=4)
+    parser.add_argument('--pause', type=float, default=2.0, help='seconds between two reloads')
+    parser.add_argument('--think', type=float, default=0.05, help='seconds between two callbacks of a thread')
+    args = parser.parse_args()
+
+    # The figures of the salary tests are left out of the warm-up after each reload
+    os.environ.setdefault('DASHBOARD_BUNDLE_DIR', '')
+    dashboard = load_dashboard()
+    dashboard.bundled_plots = list(dashboard.figures.values())
+    rng = np.random.default_rng(0)
+
+    for n_rows in args.rows:
+        base = dashboard_frame(make_dataset(n_rows))
+        versions = new_versions(base, args.changed, rng)
+        print(f'{n_rows:,} rows, {args.changed:.0%} changed')
+        print(f"{'version':>10} {'added':>8} {'removed':>8} {'delta ms':>9} {'all: refresh ms':>16} {'full ms':>8} "
+              f"{'large states':>13} {'refresh ms':>11} {'full ms':>8}")
+        for name, version in versions.items():
+            added, removed, delta_ms, every, large, large_ms = benchmark_refresh(dashboard, base, version)
+            print(f'{name:>10} {added:>8,} {removed:>8,} {delta_ms:>9.1f} {every[0]:>16.1f} {every[1]:>8.1f} '
+                  f'{large:>13} {large_ms[0]:>11.1f} {large_ms[1]:>8.1f}')
+
+        use_dataset(dashboard, base)
+        dashboard.warm_up()
+        reloads, latencies, inconsistent = benchmark_swaps(dashboard, {'base': base, **versions}, args, rng)
+        for name, result, seconds in reloads:
+            if result is None:
+                continue
+            print(f'  reload to {name}: build {result["build_seconds"]:.2f} s, swap {result["swap_seconds"] * 1000:.2f} ms, '
+                  f'with the warm-up {seconds:.2f} s')
+        print(f'  callbacks ({args.threads} threads), latency p50 / p99 / max ms:')
+        for stage, label in (('outside', 'outside of the reloads'), ('build', 'during the build'),
+                             ('swap', 'from the swap to the end of the warm-up')):
+            print(f'{label:>42}: {percentiles(latencies[stage])} ({len(latencies[stage])} calls)')
+        print(f'  callbacks held back by a swap: {dashboard.swap_lock.stats()["held_back"]}, '
+              f'inconsistent states seen: {len(inconsistent)}')
+
+
+if __name__ == '__main__':
+    main()
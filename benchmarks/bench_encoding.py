@@ -0,0 +1,95 @@
+### BENCHMARK: DICTIONARY-ENCODED COLUMNS OF THE DASHBOARD DATA
+
+"""
+Benchmark of the dashboard data held as Python strings (object columns) against the same
+data dictionary-encoded, as the dashboard loads it: Job, Company and Location as integer
+codes plus the dictionary of their values (categoricals, see data_loader.py).
+
+Reported per million rows: memory of the dataframe, build time of the filter index, and
+latency of the filters (isin masks and the filter index, with the gathering of the rows)
+and of the group-bys of the plots (vacancies per job and top companies).
+
+Run it from the root of the repository:
+python -m benchmarks.bench_encoding --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from aggregates import GroupAggregates
+from benchmarks.bench_filter_index import scenarios
+from benchmarks.bench_suite import dashboard_frame
+from benchmarks.synthetic import make_dataset
+from filter_index import FilterIndex
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def isin_filter(df, job, location, company):
+    # Mask of the rows matching the selections, as the filters of the former callback
+    mask = np.ones(len(df), dtype=bool)
+    for column, selection in (('Job', job), ('Location', location), ('Company', company)):
+        if 'All' not in selection:
+            mask &= df[column].isin(selection).to_numpy()
+    return df[mask]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the dictionary-encoded columns of the dashboard data.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        frames = {'object': make_dataset(n_rows)}
+        frames['encoded'] = dashboard_frame(frames['object'])
+        per_million = 1_000_000 / n_rows
+        print(f"{n_rows:,} rows, {frames['object']['Company'].nunique():,} distinct companies")
+
+        results = {}
+        for name, df in frames.items():
+            result = results[name] = {}
+            memory = df.memory_usage(index=False, deep=True)
+            result['memory'] = {column: memory[column] * per_million / 2**20 for column in df.columns}
+
+            start = time.perf_counter()
+            index = FilterIndex(df)
+            result['index build'] = (time.perf_counter() - start) * 1000
+
+            for scenario, (job, location, company) in scenarios(df).items():
+                if scenario == 'all':
+                    continue
+                result[f'isin {scenario}'] = median_ms(lambda: isin_filter(df, job, location, company), args.repeat)
+                result[f'index {scenario}'] = median_ms(lambda: index.select(df, job, location, company), args.repeat)
+
+            result['value_counts Job'] = median_ms(lambda: df['Job'].value_counts(), args.repeat)
+            result['groupby top 15 Company'] = median_ms(
+                lambda: df.groupby('Company', observed=True)['Job'].count().nlargest(15), args.repeat)
+            result['aggregates top 15 Company'] = median_ms(
+                lambda: GroupAggregates(df).top_groups('Company', 15), args.repeat)
+
+        print(f"{'Memory per million rows':<34} {'object (MB)':>12} {'encoded (MB)':>13} {'ratio':>8}")
+        for column in frames['object'].columns:
+            object_mb, encoded_mb = results['object']['memory'][column], results['encoded']['memory'][column]
+            print(f'{column:<34} {object_mb:>12.1f} {encoded_mb:>13.1f} {object_mb / encoded_mb:>7.1f}x')
+        object_mb, encoded_mb = (sum(results[name]['memory'].values()) for name in ('object', 'encoded'))
+        print(f"{'total':<34} {object_mb:>12.1f} {encoded_mb:>13.1f} {object_mb / encoded_mb:>7.1f}x")
+
+        print(f"{'Operation':<34} {'object (ms)':>12} {'encoded (ms)':>13} {'speedup':>8}")
+        for operation in results['object']:
+            if operation != 'memory':
+                object_ms, encoded_ms = results['object'][operation], results['encoded'][operation]
+                print(f'{operation:<34} {object_ms:>12.1f} {encoded_ms:>13.1f} {object_ms / encoded_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
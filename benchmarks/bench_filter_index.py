@@ -0,0 +1,104 @@
+### BENCHMARK: FILTERING OF THE DASHBOARD DATA
+
+"""
+Benchmark of the filter path of the dashboard callback: the former copy-and-scan
+implementation with seven hand-written branches against the inverted index.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_filter_index --rows 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_dataset
+from filter_index import FilterIndex
+
+
+def legacy_filter(df, job, location, company, salary, salary_filter):
+    """
+    Former filter logic of update_output (copy of the whole dataframe and one branch per combination).
+    """
+    dff = df.copy()
+    low, high = salary
+
+    if salary_filter == ['Enable Salary Range Selection']:
+        mask = (dff['Salary'] >= low) & (dff['Salary'] <= high)
+        dff = dff[mask]
+
+    if 'All' in job and 'All' in location and 'All' in company:
+        return dff
+    if ('All' in (company and location)) and ('All' not in job):
+        return dff[dff.Job.isin(job)]
+    if ('All' in (job and location)) and ('All' not in company):
+        return dff[dff.Company.isin(company)]
+    if ('All' in (company and job)) and ('All' not in location):
+        return dff[dff.Location.isin(location)]
+    if ('All' in job) and ('All' not in (company and location)):
+        return dff[(dff.Company.isin(company)) & (dff.Location.isin(location))]
+    if ('All' in location) and ('All' not in (company and job)):
+        return dff[(dff.Company.isin(company)) & (dff.Job.isin(job))]
+    if ('All' in company) and ('All' not in (location and job)):
+        return dff[(dff.Location.isin(location)) & (dff.Job.isin(job))]
+    return dff[(dff.Job.isin(job)) & (dff.Location.isin(location)) & (dff.Company.isin(company))]
+
+
+def scenarios(df):
+    """
+    This function returns one filter state per branch of the former callback.
+    """
+    top_companies = df['Company'].value_counts().index[:3].tolist()
+    job = ['Data Scientist', 'Data Engineer']
+    location = ['Nuevo León', 'Jalisco']
+
+    return {'all': (['All'], ['All'], ['All']),
+            'job': (job, ['All'], ['All']),
+            'company': (['All'], ['All'], top_companies),
+            'location': (['All'], location, ['All']),
+            'company+location': (['All'], location, top_companies),
+            'company+job': (job, ['All'], top_companies),
+            'location+job': (job, location, ['All']),
+            'job+location+company': (job, location, top_companies)}
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the dashboard filter path.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'scenario':>22} {'salary':>7} {'legacy ms':>10} {'index ms':>9} {'speedup':>8} {'rows out':>9}")
+
+    for n_rows in args.rows:
+        df = make_dataset(n_rows)
+
+        start = time.perf_counter()
+        index = FilterIndex(df)
+        print(f'Index build for {n_rows:,} rows: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+        for name, (job, location, company) in scenarios(df).items():
+            for salary_filter in (None, ['Enable Salary Range Selection']):
+                salary = [20000, 60000]
+                salary_range = tuple(salary) if salary_filter else None
+
+                legacy_ms = best_of(lambda: legacy_filter(df, job, location, company, salary, salary_filter), args.repeat)
+                index_ms = best_of(lambda: index.select(df, job, location, company, salary_range), args.repeat)
+                n_out = len(index.select(df, job, location, company, salary_range))
+
+                print(f'{n_rows:>10,} {name:>22} {"on" if salary_filter else "off":>7} {legacy_ms:>10.2f} '
+                      f'{index_ms:>9.2f} {legacy_ms / index_ms:>7.1f}x {n_out:>9,}')
+
+
+if __name__ == '__main__':
+    main()
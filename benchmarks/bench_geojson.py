@@ -0,0 +1,78 @@
+### BENCHMARK: LEVELS OF DETAIL OF THE MEXICAN STATES GEOMETRY
+
+"""
+Benchmark of the choropleth map of the dashboard for each level of detail of the bundled
+geometry: number of vertices, size of the figure sent to the browser, time to build and
+serialize the figure on the server and, if the Kaleido package (v0.2) is installed, time
+for plotly.js to render it in a headless browser.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_geojson
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import plotly
+import plotly.io as pio
+
+from benchmarks.dashboard import ROOT, load_dashboard
+from geo import SIMPLIFICATION_LEVELS, count_points, load_states_geojson
+
+
+def render_scope():
+    """
+    This function returns a Kaleido scope rendering with the plotly.js of the Plotly package
+    and the local topojson of the dashboard, or None if Kaleido is not available.
+    """
+    try:
+        from kaleido.scopes.plotly import PlotlyScope
+    except ImportError:
+        return None
+
+    plotlyjs = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+    topojson = 'file://' + os.path.join(ROOT, 'assets', 'topojson') + '/'
+    return PlotlyScope(plotlyjs=plotlyjs, topojson=topojson)
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the levels of detail of the map.')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    scope = render_scope()
+    if scope is not None:
+        # Warm-up of the headless browser
+        scope.transform(dashboard.plot_pie_chart(dashboard.df).to_dict(), format='svg')
+
+    print(f"{'level':>8} {'vertices':>9} {'figure KB':>10} {'build ms':>9} {'render ms':>10}")
+
+    for level in SIMPLIFICATION_LEVELS:
+        dashboard.states_geojson = load_states_geojson(level)
+        figure = dashboard.plot_cloropleth(dashboard.df)
+
+        size = len(pio.to_json(figure, validate=False).encode('utf-8')) / 1024
+        build = median_ms(lambda: pio.to_json(dashboard.plot_cloropleth(dashboard.df), validate=False), args.repeat)
+
+        render = float('nan')
+        if scope is not None:
+            figure_dict = figure.to_dict()
+            render = median_ms(lambda: scope.transform(figure_dict, format='svg', width=700, height=380), args.repeat)
+
+        print(f'{level:>8} {count_points(dashboard.states_geojson):>9,} {size:>10.1f} {build:>9.1f} {render:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
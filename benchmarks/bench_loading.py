@@ -0,0 +1,100 @@
+### BENCHMARK: LOADING OF THE DASHBOARD DATASET
+
+"""
+Benchmark of the startup of the dashboard data: parsing the CSV file into object columns
+(the former pd.read_csv of the published CSV file), the first load through data_loader
+(parsing plus conversion into the columnar snapshot) and the following loads, which
+memory-map the snapshot.
+
+Each measurement runs in a fresh interpreter, so the timings and the memory (peak and
+current resident set size, read from /proc, hence Linux only) are not affected by
+previous runs.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_loading --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.dashboard import ROOT
+from benchmarks.synthetic import make_dataset
+
+# Code run in the child interpreter for each mode; it prints the load time and the peak memory
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+mode, csv_path, snapshot_dir = sys.argv[1:4]
+import numpy, pandas
+from data_loader import load_dataset
+def memory_mb():
+    status = dict(line.split(':', 1) for line in open('/proc/self/status'))
+    return int(status['VmHWM'].split()[0]) / 1024, int(status['VmRSS'].split()[0]) / 1024
+_, baseline = memory_mb()
+start = time.perf_counter()
+if mode == 'csv':
+    df = pandas.read_csv(csv_path)
+else:
+    df = load_dataset(csv_path, snapshot_dir)
+elapsed = time.perf_counter() - start
+# Touch every column, as the first callbacks of the dashboard do
+checksum = float(df['Average Salary'].sum()) + sum(int(df[column].nunique()) for column in ('Job', 'Company', 'Location'))
+peak, current = memory_mb()
+print(json.dumps({{'seconds': elapsed, 'peak_mb': peak - baseline, 'rss_mb': current - baseline}}))
+"""
+
+
+def run_child(mode, csv_path, snapshot_dir):
+    code = CHILD.format(root=ROOT)
+    output = subprocess.run([sys.executable, '-c', code, mode, csv_path, snapshot_dir],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def write_csv(n_rows, path):
+    """
+    This function writes a synthetic dataset with the columns of Dataset_Clean.csv.
+    """
+    make_dataset(n_rows).rename(columns={'Salary': 'Average Salary'}).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the loading of the dashboard dataset.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Memory above the interpreter with Pandas imported: peak while loading, and resident once loaded
+    print(f"{'rows':>10} {'mode':>12} {'load s':>8} {'peak MB':>8} {'RSS MB':>8}")
+    for n_rows in args.rows:
+        work_dir = tempfile.mkdtemp(prefix='bench-loading-')
+        try:
+            csv_path = os.path.join(work_dir, 'dataset.csv')
+            snapshot_dir = os.path.join(work_dir, 'snapshot')
+            write_csv(n_rows, csv_path)
+
+            results = {'read_csv': [], 'first load': [], 'snapshot': []}
+            for _ in range(args.repeat):
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+                results['read_csv'].append(run_child('csv', csv_path, snapshot_dir))
+                results['first load'].append(run_child('snapshot', csv_path, snapshot_dir))
+                results['snapshot'].append(run_child('snapshot', csv_path, snapshot_dir))
+
+            for mode, runs in results.items():
+                seconds = np.median([run['seconds'] for run in runs])
+                peak = np.median([run['peak_mb'] for run in runs])
+                rss = np.median([run['rss_mb'] for run in runs])
+                print(f'{n_rows:>10,} {mode:>12} {seconds:>8.3f} {peak:>8.1f} {rss:>8.1f}')
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
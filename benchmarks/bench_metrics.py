@@ -0,0 +1,125 @@
+### BENCHMARK: OVERHEAD OF THE METRICS AND OF THE PROFILER
+
+"""
+Benchmark of the cost of the instrumentation of the dashboard callbacks (metrics.py): the
+same filter states are replayed through the Flask server (in process, with its test client)
+with the metrics off, with the metrics on, and with the metrics and the sampling profiler on.
+
+Each session starts with empty caches: the first pass over the states builds every figure,
+the second one is served by the caches, where the callbacks are the fastest and the relative
+cost of the instrumentation the largest. The size of the /metrics page and the time to render
+it are reported after the sessions.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_metrics --rows 0 100000
+(0 rows stands for the actual dataset of the repository)
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_callback_latency import random_states
+from benchmarks.bench_throughput import FIGURE_IDS
+from benchmarks.dashboard import load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+
+MODES = ['metrics off', 'metrics on', 'metrics and profiler on']
+
+
+def post_callback(client, output, outputs, inputs, state=()):
+    # Call of a callback as the browser does, through the Flask test client
+    body = {'output': output, 'outputs': outputs, 'inputs': list(inputs), 'state': list(state),
+            'changedPropIds': [f"{item['id']}.{item['property']}" for item in inputs]}
+    response = client.post('/_dash-update-component', data=json.dumps(body), content_type='application/json')
+    return json.loads(response.data)['response']
+
+
+def run_pass(client, states, rendered):
+    """
+    This function replays filter states (filter state, then every figure) and returns the number of requests.
+    """
+    requests = 0
+    for job, location, company, salary, salary_filter in states:
+        inputs = [{'id': 'job_dropdown', 'property': 'value', 'value': job},
+                  {'id': 'location_dropdown', 'property': 'value', 'value': location},
+                  {'id': 'company_dropdown', 'property': 'value', 'value': company},
+                  {'id': 'salary_slider', 'property': 'value', 'value': salary},
+                  {'id': 'salary_filter', 'property': 'value', 'value': salary_filter}]
+        filter_state = post_callback(client, 'filter_state.data', {'id': 'filter_state', 'property': 'data'},
+                                     inputs)['filter_state']['data']
+        requests += 1
+        for figure_id in FIGURE_IDS:
+            response = post_callback(client, f'..{figure_id}.figure...{figure_id}_rendered.data..',
+                                     [{'id': figure_id, 'property': 'figure'},
+                                      {'id': figure_id + '_rendered', 'property': 'data'}],
+                                     [{'id': 'filter_state', 'property': 'data', 'value': filter_state}],
+                                     [{'id': figure_id + '_rendered', 'property': 'data', 'value': rendered[figure_id]}])
+            rendered[figure_id] = response[figure_id + '_rendered']['data']
+            requests += 1
+    return requests
+
+
+def run_session(dashboard, df, states, mode, profile_dir):
+    """
+    This function replays the states twice with empty caches and returns the time per request of each pass (seconds).
+    """
+    use_dataset(dashboard, df)
+    dashboard.metrics_enabled = mode != 'metrics off'
+    if mode == 'metrics and profiler on':
+        dashboard.profiler.enable(profile_dir)
+    else:
+        dashboard.profiler.disable()
+
+    client = dashboard.app.server.test_client()
+    rendered = {figure_id: None for figure_id in FIGURE_IDS}
+    seconds = []
+    for _ in range(2):
+        start = time.perf_counter()
+        requests = run_pass(client, states, rendered)
+        seconds.append((time.perf_counter() - start) / requests)
+    dashboard.profiler.disable()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the overhead of the metrics and of the profiler.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[0, 100_000])
+    parser.add_argument('--states', type=int, default=30)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    base_df = dashboard.df
+
+    for n_rows in args.rows:
+        df = base_df if n_rows == 0 else make_dataset(n_rows)
+        states = random_states(df, args.states)
+        results = {mode: [] for mode in MODES}
+
+        with tempfile.TemporaryDirectory() as profile_dir:
+            run_session(dashboard, df, states[:3], 'metrics off', profile_dir)  # warm-up
+            for _ in range(args.repeats):
+                for mode in MODES:
+                    results[mode].append(run_session(dashboard, df, states, mode, profile_dir))
+            n_profiles = len(os.listdir(profile_dir))
+
+        print(f'{len(df):,} rows, {args.states} filter states ({args.states * (len(FIGURE_IDS) + 1)} requests per pass), '
+              f'best of {args.repeats}')
+        baseline = [min(session[i] for session in results['metrics off']) for i in range(2)]
+        for mode in MODES:
+            best = [min(session[i] for session in results[mode]) for i in range(2)]
+            print(f'{mode:>24}: uncached {best[0] * 1000:7.2f} ms/request ({best[0] / baseline[0] - 1:+6.1%})   '
+                  f'cached {best[1] * 1000:6.2f} ms/request ({best[1] / baseline[1] - 1:+6.1%})')
+        print(f'{"":>24}  {n_profiles} profiles written')
+
+        start = time.perf_counter()
+        page = dashboard.metrics.render()
+        print(f'/metrics: {len(page.encode("utf-8")) / 1024:.1f} KB, {page.count(chr(10))} lines, '
+              f'rendered in {(time.perf_counter() - start) * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+### BENCHMARK: SEARCH OF THE COMPANY DROPDOWN
+
+"""
+Benchmark of the options of the Company dropdown with many distinct companies: size of the
+options embedded in the layout (every company before, the companies with the most vacancies
+now), and latency of the server-side search (option_search.py) against a scan of every
+company, as the browser filtered the options.
+
+The company names are drawn from the words of the names of the actual dataset, so the
+trigrams are as frequent as in real names. Every query of three characters or more returns
+the same companies as the scan (the first ones in decreasing order of vacancies), and every
+shorter one returns companies containing it, in the same order.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_option_search --companies 10000 100000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.dashboard import load_dashboard
+from benchmarks.synthetic import zipf_weights
+from data_loader import DATASET_CSV
+from option_search import MAX_OPTIONS, OptionIndex, normalize_text
+
+
+def company_names(n_companies, seed=0):
+    """
+    This function returns distinct company names made of the words of the actual company names.
+    """
+    rng = np.random.default_rng(seed)
+    words = sorted({word for name in pd.read_csv(DATASET_CSV)['Company'].dropna() for word in name.split()})
+    suffixes = ['', '', 'S.A. De C.V.', 'S De Rl De Cv', 'México', 'Group']
+
+    names = set()
+    while len(names) < n_companies:
+        n_words = rng.integers(1, 4)
+        name = ' '.join(rng.choice(words, size=n_words).tolist() + [suffixes[rng.integers(len(suffixes))]]).strip()
+        names.add(name)
+    return sorted(names)
+
+
+def scan_search(values, texts, query, limit):
+    # Case- and accent-insensitive substring search over every value, in decreasing order of vacancies
+    query = normalize_text(query)
+    return [value for value, text in zip(values, texts) if query in text][:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the search of the Company dropdown.')
+    parser.add_argument('--companies', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=300)
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    rng = np.random.default_rng(1)
+
+    for n_companies in args.companies:
+        names = np.array(company_names(n_companies), dtype=object)
+        counts = np.round(zipf_weights(n_companies, 1.1) * 10 * n_companies).astype(np.int64) + 1
+        rng.shuffle(counts)
+
+        start = time.perf_counter()
+        index = OptionIndex(names, counts)
+        build_seconds = time.perf_counter() - start
+
+        full_bytes = len(json.dumps(dashboard.create_dropdown_options(pd.Series(names))).encode('utf-8'))
+        layout_bytes = len(json.dumps(dashboard.search_dropdown_options(index, None, None)).encode('utf-8'))
+
+        # Queries typed by a user: the first 1 to 8 characters of a name, or a word of it
+        queries = []
+        for name in rng.choice(names, size=args.queries):
+            if rng.random() < 0.5:
+                queries.append(name[:rng.integers(1, 9)])
+            else:
+                queries.append(rng.choice(name.split()))
+
+        texts = [normalize_text(value) for value in index.values]
+        search_ms, scan_ms = [], []
+        for query in queries:
+            start = time.perf_counter()
+            result = index.search(query)
+            search_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            expected = scan_search(index.values, texts, query, MAX_OPTIONS)
+            scan_ms.append((time.perf_counter() - start) * 1000)
+            if len(normalize_text(query)) >= 3:
+                assert result == expected, query
+            else:
+                # Short queries match the values containing them, the whole scan only if it fits in the time budget
+                assert all(normalize_text(query) in normalize_text(value) for value in result), query
+                assert result == sorted(result, key=list(index.values).index), query
+
+        print(f'{n_companies:,} companies: index built in {build_seconds:.2f} s; options in the layout '
+              f'{full_bytes / 1024:,.1f} KB -> {layout_bytes / 1024:,.1f} KB')
+        print(f'  search p50 {np.percentile(search_ms, 50):6.3f} ms   p99 {np.percentile(search_ms, 99):6.3f} ms   '
+              f'max {max(search_ms):6.3f} ms   |   scan p50 {np.percentile(scan_ms, 50):6.2f} ms   '
+              f'p99 {np.percentile(scan_ms, 99):6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
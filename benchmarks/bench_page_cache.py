@@ -0,0 +1,105 @@
+### BENCHMARK: PAGE CACHE AND PARALLEL PARSING OF THE SCRAPED PAGES
+
+"""
+Benchmark of a crawl of the local stand-in of the OCC website with the on-disk page cache
+(page_cache.py): the first crawl, which fetches every page and fills the cache, a second
+crawl of the same day, served by the cache, and the extraction of the vacancies of the
+cached pages again without any request (scraper.extract_cached), as after a change of the
+class identifiers of the website: with BeautifulSoup and its 'html.parser' (the former
+parser), with lxml and XPath queries, and with lxml in a pool of processes.
+
+The result pages of the stand-in only hold the markup of the vacancies; the pages served
+here are padded with markup around and inside each vacancy (navigation, scripts, nested
+elements of other classes), up to about the size of a result page of the website. Every
+extraction is checked against the vacancies of the first crawl.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_page_cache --pages 10 --latency 0.1 --processes 1 4
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_scraper import JOBS_LIST
+from benchmarks.occ_standin import RAW_CSV, PAGE_SIZE, StandinServer, render_page
+from page_cache import PageCache
+from scraper import Scraper, extract_cached
+
+# Markup of the website around the vacancies, and inside each one of them
+HEADER = ('<header class="c0110 c0111"><nav>' + ''.join(f'<a class="c0120" href="/empleos/{i}">Categoría {i}</a>'
+                                                      for i in range(60)) + '</nav></header>')
+SCRIPT = '<script type="application/json">' + '{"key": "value", "list": [1, 2, 3]}' * 400 + '</script>'
+CARD_PADDING = ''.join(f'<div class="c01{i:03d}"><span class="c02{i:03d}">Detalle {i}</span></div>' for i in range(40))
+
+
+def padded_page(records):
+    """
+    This function renders a result page padded with the markup of the website around and inside each vacancy.
+    """
+    html = render_page(records)
+    html = re.sub(r'(<div class="[^"]+">)', lambda match: match.group(1) + CARD_PADDING, html)
+    return html.replace('<body>', '<body>' + HEADER).replace('</main>', '</main>' + SCRIPT * 4)
+
+
+def write_pages(directory, jobs_list, number_pages):
+    """
+    This function writes the padded result pages of the stand-in ('<job>-<n>.html') and returns their mean size (bytes).
+    """
+    raw = pd.read_csv(RAW_CSV)[['Job', 'Salary', 'Company', 'Location']].values.tolist()
+    sizes = []
+    for job in jobs_list:
+        slug = job.strip().lower().replace(' ', '-')
+        for number in range(1, number_pages + 1):
+            start = (sum(map(ord, slug)) * 7919 + (number - 1) * PAGE_SIZE) % len(raw)
+            html = padded_page([raw[(start + i) % len(raw)] for i in range(PAGE_SIZE)])
+            with open(os.path.join(directory, f'{slug}-{number}.html'), 'w', encoding='utf-8') as file:
+                file.write(html)
+            sizes.append(len(html.encode('utf-8')))
+    return sum(sizes) / len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the page cache and of the parallel parsing.')
+    parser.add_argument('--pages', type=int, default=10, help='pages per job term')
+    parser.add_argument('--latency', type=float, default=0.1, help='latency of the stand-in, in seconds')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pages_dir, tempfile.TemporaryDirectory() as cache_dir:
+        page_bytes = write_pages(pages_dir, JOBS_LIST, args.pages)
+        with StandinServer(pages_dir=pages_dir, latency=args.latency) as standin:
+
+            # First crawl: every page requested and stored in the cache
+            scraper = Scraper(concurrency=args.concurrency, cache=PageCache(cache_dir), parser='html.parser')
+            reference = scraper.scrape(JOBS_LIST, args.pages, base_url=standin.base_url, verbose=False)
+            print(f'{scraper.stats.pages} pages of {page_bytes / 1024:.0f} KB, {len(reference)} vacancies; '
+                  f'cache of {scraper.cache.stats()["stored_bytes"] / 1024:.0f} KB')
+            print(f'{"first crawl (html.parser)":>34}: {scraper.stats.elapsed:6.2f} s   {standin.requests} requests')
+
+            # Second crawl of the same day: every page served by the cache
+            requests = standin.requests
+            scraper = Scraper(concurrency=args.concurrency, cache=PageCache(cache_dir))
+            df = scraper.scrape(JOBS_LIST, args.pages, base_url=standin.base_url, verbose=False)
+            assert df.equals(reference)
+            print(f'{"second crawl (cache, lxml)":>34}: {scraper.stats.elapsed:6.2f} s   {standin.requests - requests} requests')
+
+            # Extraction again from the cached pages, without the website
+            runs = [('html.parser', 1)] + [('lxml', processes) for processes in args.processes]
+            for parser_name, processes in runs:
+                start = time.perf_counter()
+                df = extract_cached(PageCache(cache_dir), JOBS_LIST, args.pages, base_url=standin.base_url,
+                                    processes=processes, parser=parser_name)
+                seconds = time.perf_counter() - start
+                assert df.equals(reference), f'{parser_name} with {processes} processes differs from the crawl'
+                print(f'{"extraction (" + parser_name + ", " + str(processes) + " process" + "es" * (processes > 1) + ")":>34}: '
+                      f'{seconds:6.2f} s   {len(df) / seconds:8.0f} vacancies/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+### BENCHMARK: BYTES SENT BY THE FIGURE CALLBACKS
+
+"""
+Benchmark of the bytes sent to the browser by the figure callbacks of the dashboard over a
+session of filter changes, with full figures (as before) and with partial updates (dash.Patch
+with only the changed properties, see figure_patch.py).
+
+The browser is emulated: the partial updates are applied to the figures it holds, and every
+resulting figure is checked against the full figure of the filter state.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_patch --rows 0 100000
+(0 rows stands for the actual dataset of the repository)
+"""
+
+import argparse
+import json
+
+import plotly.io as pio
+from dash import Patch, no_update
+
+from benchmarks.bench_callback_latency import random_states
+from benchmarks.dashboard import load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+
+
+def apply_patch(figure, patch):
+    """
+    This function applies the operations of a Patch to the JSON of a figure, as the browser does.
+    """
+    for operation in patch.to_plotly_json()['operations']:
+        *path, last = operation['location']
+        target = figure
+        for key in path:
+            target = target[key]
+        if operation['operation'] == 'Assign':
+            target[last] = json.loads(pio.json.to_json_plotly(operation['params']['value']))
+        elif operation['operation'] == 'Delete':
+            del target[last]
+        else:
+            raise ValueError(f"Unexpected operation {operation['operation']}")
+    return figure
+
+
+def run_session(dashboard, states):
+    """
+    This function runs the figure callbacks over a sequence of filter states, emulating the browser.
+    """
+    dashboard.transfer_stats.clear()
+    held, rendered = {}, {}
+
+    for state in states:
+        filter_state = dashboard.update_filter_state(*state)
+        for figure_id, plot_function in dashboard.figures.items():
+            sent, rendered[figure_id] = dashboard.send_figure(figure_id, plot_function, filter_state,
+                                                              rendered.get(figure_id))
+            if isinstance(sent, Patch):
+                held[figure_id] = apply_patch(held[figure_id], sent)
+            elif sent is not no_update:
+                held[figure_id] = json.loads(pio.to_json(sent, validate=False))
+
+            expected = json.loads(pio.to_json(dashboard.build_figure(plot_function, filter_state), validate=False))
+            assert held[figure_id] == expected, f'{figure_id} differs from the full figure'
+
+    return dashboard.transfer_stats.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the bytes sent by the figure callbacks of the dashboard.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[0, 100_000])
+    parser.add_argument('--states', type=int, default=40)
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    base_df = dashboard.df
+
+    for n_rows in args.rows:
+        use_dataset(dashboard, base_df if n_rows == 0 else make_dataset(n_rows))
+        stats = run_session(dashboard, random_states(dashboard.df, args.states))
+
+        print(f'{len(dashboard.df):,} rows, {args.states} filter states')
+        for figure_id, counters in stats.items():
+            print(f"{figure_id:>22}: full figures {counters['full_bytes'] / 1024:9.1f} KB   "
+                  f"sent {counters['sent_bytes'] / 1024:9.1f} KB ({counters['saved']:6.1%} saved; "
+                  f"{counters['patch']} patches, {counters['full']} full, {counters['unchanged']} unchanged)")
+        full = sum(counters['full_bytes'] for counters in stats.values())
+        sent = sum(counters['sent_bytes'] for counters in stats.values())
+        print(f"{'total':>22}: full figures {full / 1024:9.1f} KB   sent {sent / 1024:9.1f} KB ({1 - sent / full:6.1%} saved)")
+
+
+if __name__ == '__main__':
+    main()
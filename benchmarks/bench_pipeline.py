@@ -0,0 +1,110 @@
+### BENCHMARK: STREAMING SCRAPE-TO-CLEAN PIPELINE
+
+"""
+Benchmark of the memory used to turn scraped vacancies into the cleaned dataset: the
+former flow of 1-DataCollection.ipynb and 2-DataWrangling.ipynb (list of every vacancy,
+dataframe, Dataset_Raw.csv, cleaning of the whole dataframe) against the streaming
+pipeline (vacancies cleaned one by one and stored in batches).
+
+The scraped vacancies are emulated by repeating the vacancies of Dataset_Raw.csv, each
+repetition with different company names, so the share of duplicates and of non
+data-related jobs is the one of the actual crawl. The peak of the memory allocated by
+Python is measured with tracemalloc.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_pipeline --rows 100000 400000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.occ_standin import RAW_CSV
+from cleaning import CHAR_REMOVE, DATA_JOBS, JOB_DICT, LOCATION_DICT
+from pipeline import run_pipeline
+from vacancy_store import IncrementalStore
+
+
+def raw_records(n_rows):
+    """
+    This function yields n_rows scraped vacancies, repeating the vacancies of Dataset_Raw.csv.
+    """
+    raw = pd.read_csv(RAW_CSV).values.tolist()
+    for i in range(n_rows):
+        job, salary, company, location = raw[i % len(raw)]
+        repetition = i // len(raw)
+        if repetition and isinstance(company, str):
+            company = f'{company} {repetition}'
+        yield [job, salary, company, location]
+
+
+def notebook_clean(df):
+    """
+    Cleaning of 2-DataWrangling.ipynb, applied to the whole dataframe.
+    """
+    job_dict = JOB_DICT
+    df = df.drop_duplicates()
+    df['Job'] = df['Job'].str.casefold()
+    for i in range(len(job_dict)):
+        df['Job'] = df['Job'].map(lambda x: list(job_dict.values())[i] if (list(job_dict.keys())[i][0] in x and list(job_dict.keys())[i][1] in x) else x)
+    df = df.loc[df['Job'].isin(DATA_JOBS)]
+    df = df.dropna(subset='Company')
+    df['Company'] = df['Company'].map(lambda x: str.title(str(x)))
+    for i in range(len(LOCATION_DICT)):
+        df['Location'] = df['Location'].map(lambda x: list(LOCATION_DICT.values())[i] if x == list(LOCATION_DICT.keys())[i] else x)
+    for key, value in CHAR_REMOVE.items():
+        df['Salary'] = df['Salary'].str.replace(key, value, regex=False).str.strip()
+    df[['Min Salary', 'Max Salary']] = df['Salary'].str.split('-', n=1, expand=True)
+    df['Min Salary'] = df['Min Salary'].str.strip().astype(np.float64)
+    df['Max Salary'] = df['Max Salary'].str.strip().astype(np.float64)
+    df['Average Salary'] = (df['Min Salary'] + df['Max Salary']) / 2
+    df = df.drop(axis=1, columns=['Salary', 'Min Salary', 'Max Salary'])
+    return df[~(df['Average Salary'] > 120000)]
+
+
+def batch_flow(n_rows, work_dir):
+    data = list(raw_records(n_rows))
+    df = pd.DataFrame(data, columns=['Job', 'Salary', 'Company', 'Location'])
+    raw_path = os.path.join(work_dir, 'Dataset_Raw.csv')
+    df.to_csv(raw_path, index=False, encoding='utf-8')
+    df = notebook_clean(pd.read_csv(raw_path))
+    df.to_csv(os.path.join(work_dir, 'Dataset_Clean.csv'), index=False, encoding='utf-8')
+    return len(df)
+
+
+def streaming_flow(n_rows, work_dir):
+    store = IncrementalStore(os.path.join(work_dir, 'store'))
+    stats = run_pipeline(raw_records(n_rows), store, verbose=False)
+    return stats['kept']
+
+
+def measure(function, n_rows):
+    work_dir = tempfile.mkdtemp(prefix='bench-pipeline-')
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = function(n_rows, work_dir)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return kept, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the streaming scrape-to-clean pipeline.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 400_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'flow':>10} {'kept':>8} {'seconds':>8} {'peak MB':>8}")
+    for n_rows in args.rows:
+        for name, function in (('batch', batch_flow), ('streaming', streaming_flow)):
+            kept, seconds, peak = measure(function, n_rows)
+            print(f'{n_rows:>9,} {name:>10} {kept:>8,} {seconds:>8.2f} {peak:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+### BENCHMARK: SORTED SALARY INDEX
+
+"""
+Benchmark of the salary range filter of the dashboard: the former boolean mask over every
+salary (alone, or over the rows of the categorical filters) against the sorted salary index
+of filter_index.py (a slice found by two binary searches, intersected with the rows of the
+categorical filters when narrower), and of the vacancies per Job and per Location of a
+salary range: value_counts of the rows of the range against the cumulative counts per bin.
+
+Every result of the index is checked against the former one.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_salary_index --rows 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_filter_index import best_of
+from benchmarks.bench_suite import dashboard_frame
+from benchmarks.synthetic import make_dataset
+from filter_index import FilterIndex
+
+# Salary ranges of the slider (multiples of its step), from narrow to wide
+SALARY_RANGES = [(30000, 30000), (30000, 32000), (20000, 40000), (10000, 100000)]
+
+
+def legacy_query(index, salary, job, salary_range):
+    """
+    Former salary filter: mask over every salary, or over the salaries of the rows of the categorical filters.
+    """
+    low, high = salary_range
+    if job is None:
+        return np.flatnonzero((salary >= low) & (salary <= high))
+    rows = index.postings('Job', job)
+    return rows[(salary[rows] >= low) & (salary[rows] <= high)]
+
+
+def legacy_counts(df, column, salary, salary_range):
+    low, high = salary_range
+    return df[column][(salary >= low) & (salary <= high)].value_counts(sort=False).to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the sorted salary index.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        df = dashboard_frame(make_dataset(n_rows))
+        salary = df['Salary'].to_numpy(dtype=np.float64)
+
+        start = time.perf_counter()
+        index = FilterIndex(df)
+        salary_index = index.salary_index
+        print(f'{n_rows:,} rows: index build {(time.perf_counter() - start) * 1000:.1f} ms, '
+              f'{len(salary_index.edges)} bins, slider {salary_index.bounds()}')
+        print(f"{'filter':>22} {'range':>16} {'mask ms':>8} {'index ms':>9} {'speedup':>8} {'rows out':>9}")
+
+        for salary_range in SALARY_RANGES:
+            for name, job in (('salary', None), ('salary+job', ('Data Scientist',)), ('salary+rare job', ('Data Architect',))):
+                expected = legacy_query(index, salary, job, salary_range)
+                assert np.array_equal(index.query(job=job, salary_range=salary_range), expected)
+                mask_ms = best_of(lambda: legacy_query(index, salary, job, salary_range), args.repeat)
+                index_ms = best_of(lambda: index.query(job=job, salary_range=salary_range), args.repeat)
+                print(f'{name:>22} {str(salary_range):>16} {mask_ms:>8.2f} {index_ms:>9.2f} '
+                      f'{mask_ms / index_ms:>7.1f}x {len(expected):>9,}')
+
+            for column in ('Job', 'Location'):
+                assert np.array_equal(salary_index.range_counts(column, *salary_range),
+                                      legacy_counts(df, column, salary, salary_range))
+                mask_ms = best_of(lambda: legacy_counts(df, column, salary, salary_range), args.repeat)
+                index_ms = best_of(lambda: salary_index.range_counts(column, *salary_range), args.repeat)
+                print(f'{"counts per " + column:>22} {str(salary_range):>16} {mask_ms:>8.2f} {index_ms:>9.2f} '
+                      f'{mask_ms / index_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
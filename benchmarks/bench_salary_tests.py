@@ -0,0 +1,119 @@
+### BENCHMARK: STATISTICAL TESTS OF THE SALARIES
+
+"""
+Benchmark of the comparison of the salaries of every pair of data job categories
+(salary_tests.py) on a large synthetic dataset: omnibus tests, pairwise tests and 10,000
+bootstrap and permutation resamples, with 1 to N worker processes.
+
+The resamples are drawn as counts of the distinct salaries; a bootstrap of the salaries one
+by one (np.random.Generator.choice, as a naive implementation would) is timed on one pair
+for reference, and both distributions are compared. The results must not depend on the
+number of workers. Finally, a forked process (as a worker of gunicorn --preload) runs the
+salary tests callback of the dashboard and the pairwise tests on the process pool, after
+its parent has started its own pool and drawn the figure; it must finish in time.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_salary_tests --rows 1000000 --workers 1 2 4
+"""
+
+import argparse
+import os
+import signal
+import time
+
+import numpy as np
+
+from benchmarks.dashboard import load_dashboard
+from benchmarks.synthetic import make_dataset
+from salary_tests import omnibus_tests, pairwise_tests, resample, salary_groups, shutdown
+
+
+def naive_bootstrap(x, y, n_resamples, seed=0):
+    # Bootstrap of the difference of the means drawing every salary of every resample
+    rng = np.random.default_rng(seed)
+    return np.array([rng.choice(x, len(x)).mean() - rng.choice(y, len(y)).mean() for _ in range(n_resamples)])
+
+
+def check_after_fork(groups, workers, timeout):
+    """
+    This function runs the salary tests callback of the dashboard and the pairwise tests on the process pool in a forked
+    process, once the parent has drawn the figure and started its pool, and returns whether the child finished in time.
+    """
+    dashboard = load_dashboard()
+    filter_state = dashboard.filter_state_of(dashboard.filter_key(None, None, None, None))
+    dashboard.update_salary_tests(filter_state)
+    pairwise_tests(groups, n_resamples=100, workers=workers)
+
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            signal.alarm(timeout)
+            dashboard.figure_cache.clear()
+            dashboard.update_salary_tests(filter_state)
+            pairwise_tests(groups, n_resamples=100, workers=workers)
+            status = 0
+        finally:
+            # The pool of the child is stopped, since os._exit skips the exit handlers that would join it
+            shutdown()
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status) == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the statistical tests of the salaries.')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--resamples', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--naive-resamples', type=int, default=200)
+    parser.add_argument('--fork-timeout', type=int, default=60, help='seconds given to the forked process')
+    args = parser.parse_args()
+
+    df = make_dataset(args.rows)
+
+    start = time.perf_counter()
+    groups = salary_groups(df)
+    groups_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    omnibus_tests(groups)
+    omnibus_seconds = time.perf_counter() - start
+
+    sizes = ', '.join(f'{label} {len(values):,} ({len(np.unique(values))} distinct)' for label, values in groups.items())
+    print(f'{args.rows:,} rows; disclosed salaries: {sizes}')
+    print(f'Salaries per category {groups_seconds * 1000:.0f} ms, ANOVA and Kruskal-Wallis {omnibus_seconds * 1000:.0f} ms')
+
+    expected = None
+    for workers in args.workers:
+        pairwise_tests(groups, n_resamples=10, workers=workers)  # start of the process pool
+        start = time.perf_counter()
+        result = pairwise_tests(groups, n_resamples=args.resamples, workers=workers)
+        seconds = time.perf_counter() - start
+        if expected is None:
+            expected = result
+        assert result.equals(expected), 'The results depend on the number of workers'
+        print(f'{workers} workers: {len(result)} pairs, {args.resamples:,} bootstrap resamples per category and '
+              f'permutations per pair, {seconds:.2f} s')
+
+    # Reference: bootstrap of the salaries one by one, on the pair with the most salaries
+    a, b = sorted(groups, key=lambda label: -len(groups[label]))[:2]
+    start = time.perf_counter()
+    naive = naive_bootstrap(groups[a], groups[b], args.naive_resamples)
+    naive_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    bootstrap, _ = resample({a: groups[a], b: groups[b]}, [], args.resamples, workers=1)
+    counts_seconds = time.perf_counter() - start
+    counted = bootstrap[a][0] - bootstrap[b][0]
+
+    print(f'Bootstrap of {a} - {b}: salaries one by one {naive_seconds / args.naive_resamples * 1000:.1f} ms '
+          f'per resample, counts of the distinct salaries {counts_seconds / args.resamples * 1000:.3f} ms per resample')
+    print(f'  standard error of the difference of the means: {naive.std():.1f} (one by one, '
+          f'{args.naive_resamples} resamples), {counted.std():.1f} (counts, {args.resamples:,} resamples)')
+
+    workers = max(max(args.workers), 2)
+    assert check_after_fork(groups, workers, args.fork_timeout), 'The forked process did not finish in time'
+    print(f'Forked process: salary tests callback and pairwise tests on {workers} workers done')
+
+
+if __name__ == '__main__':
+    main()
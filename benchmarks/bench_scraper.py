@@ -0,0 +1,54 @@
+### BENCHMARK: CONCURRENT SCRAPING OF THE OCC WEBSITE
+
+"""
+Benchmark of the scraper against the local stand-in of the OCC website: pages per second
+of a crawl of the job terms of 1-DataCollection.ipynb for several numbers of concurrent
+requests. A concurrency of 1 fetches the pages one after another, as the former
+'occscraper' loop did (without the cost of driving a browser).
+
+Run it from the root of the repository:
+python -m benchmarks.bench_scraper --latency 0.1 --concurrency 1 8 32
+"""
+
+import argparse
+
+from benchmarks.occ_standin import StandinServer
+from scraper import Scraper
+
+# Job terms of 1-DataCollection.ipynb
+JOBS_LIST = ['analista datos', 'data analyst', 'cientifico datos', 'data scientist', 'ingeniero datos',
+             'data engineer', 'arquitecto datos', 'data arquitect', 'analista negocio', 'business analyst']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the concurrent scraper.')
+    parser.add_argument('--terms', type=int, default=len(JOBS_LIST), help='number of job terms (repeated if needed)')
+    parser.add_argument('--pages', type=int, default=10, help='pages per job term')
+    parser.add_argument('--latency', type=float, default=0.1, help='latency of the stand-in, in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of HTTP 503 answers')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    jobs_list = [JOBS_LIST[i % len(JOBS_LIST)] + ('' if i < len(JOBS_LIST) else f' {i // len(JOBS_LIST)}')
+                 for i in range(args.terms)]
+
+    print(f"{'concurrency':>11} {'pages':>6} {'retries':>8} {'failed':>7} {'rows':>6} {'seconds':>8} {'pages/s':>8}")
+    reference = None
+    with StandinServer(latency=args.latency, failure_rate=args.failure_rate) as standin:
+        for concurrency in args.concurrency:
+            scraper = Scraper(concurrency=concurrency, retries=5, backoff=0.05)
+            df = scraper.scrape(jobs_list, args.pages, base_url=standin.base_url, verbose=False)
+            stats = scraper.stats
+
+            # Every run must return the same data, in the same order
+            if reference is None:
+                reference = df
+            elif not df.equals(reference):
+                raise AssertionError(f'Different results with a concurrency of {concurrency}')
+
+            print(f'{concurrency:>11} {stats.pages:>6} {stats.retries:>8} {stats.failures:>7} {len(df):>6} '
+                  f'{stats.elapsed:>8.2f} {stats.pages_per_second:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
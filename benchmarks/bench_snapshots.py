@@ -0,0 +1,116 @@
+### BENCHMARK: STORAGE OF REPEATED SCRAPES
+
+"""
+Benchmark of the storage of repeated scrapes: a full copy of the cleaned dataset per scrape
+against the SnapshotStore, which stores each posting once, records the dates it was seen
+and partitions the postings by the date they were first seen.
+
+The scrapes are emulated by a pool of synthetic postings in which a share is replaced
+every day, so consecutive scrapes mostly contain the same postings.
+
+Run it from the root of the repository:
+python -m benchmarks.bench_snapshots --postings 100000 --days 30 --turnover 0.05
+"""
+
+import argparse
+import datetime
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_dataset
+from vacancy_store import SnapshotStore
+
+
+def daily_scrapes(n_postings, n_days, turnover, seed=0):
+    """
+    This function yields (date, cleaned postings) for consecutive daily scrapes.
+    """
+    rng = np.random.default_rng(seed)
+    pool = make_dataset(n_postings * 4, seed=seed).rename(columns={'Salary': 'Average Salary'})
+    # Distinct postings: one vacancy number per posting in the company name
+    pool['Company'] = pool['Company'] + ' #' + pd.Series(np.arange(len(pool))).astype(str)
+    active = np.arange(n_postings)
+    next_posting = n_postings
+    start = datetime.date(2022, 8, 3)
+
+    for day in range(n_days):
+        yield start + datetime.timedelta(days=day), pool.iloc[active].reset_index(drop=True)
+        replaced = rng.random(len(active)) < turnover
+        n_new = int(replaced.sum())
+        active = np.concatenate([active[~replaced], np.arange(next_posting, next_posting + n_new) % len(pool)])
+        next_posting += n_new
+
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the storage of repeated scrapes.')
+    parser.add_argument('--postings', type=int, default=100_000, help='postings per scrape')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--turnover', type=float, default=0.05, help='share of postings replaced every day')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench-snapshots-')
+    try:
+        copies_dir = os.path.join(work_dir, 'copies')
+        os.makedirs(copies_dir)
+        store = SnapshotStore(os.path.join(work_dir, 'history'))
+
+        copies_time = store_time = 0.0
+        dates = []
+        for date, df in daily_scrapes(args.postings, args.days, args.turnover):
+            dates.append(date)
+            _, seconds = timed(lambda: df.to_csv(os.path.join(copies_dir, f'{date.isoformat()}.csv'), index=False))
+            copies_time += seconds
+            for start in range(0, len(df), args.batch_size):
+                _, seconds = timed(lambda: store.append(df.iloc[start:start + args.batch_size], date))
+                store_time += seconds
+        _, seconds = timed(store.save_index)
+        store_time += seconds
+
+        def read_copies(first, last):
+            frames = [pd.read_csv(os.path.join(copies_dir, f'{date.isoformat()}.csv'))
+                      for date in dates if first <= date <= last]
+            return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+        def read_store(first, last, new_only=False):
+            return SnapshotStore(store.directory).read(first, last, new_only)
+
+        queries = {'all dates': (dates[0], dates[-1]), 'first 7 days': (dates[0], dates[6]),
+                   'last 7 days': (dates[-7], dates[-1]), 'last day': (dates[-1], dates[-1])}
+
+        print(f'{args.days} scrapes of {args.postings:,} postings, {args.turnover:.0%} replaced daily, '
+              f'{store.stats()["postings"]:,} distinct postings')
+        print(f"{'':>12} {'disk MB':>8} {'write s':>8}")
+        print(f"{'copies':>12} {directory_size(copies_dir) / 2 ** 20:>8.1f} {copies_time:>8.2f}")
+        print(f"{'store':>12} {directory_size(store.directory) / 2 ** 20:>8.1f} {store_time:>8.2f}")
+
+        print(f"{'query':>12} {'postings':>9} {'copies s':>9} {'store s':>8}")
+        for name, (first, last) in queries.items():
+            copies, copies_seconds = timed(lambda: read_copies(first, last))
+            stored, store_seconds = timed(lambda: read_store(first, last))
+            print(f'{name:>12} {len(stored):>9,} {copies_seconds:>9.2f} {store_seconds:>8.2f}')
+
+        # Postings first seen within the last 7 days: only the last 7 partitions are read
+        stored, store_seconds = timed(lambda: read_store(dates[-7], dates[-1], new_only=True))
+        print(f"{'new, 7 days':>12} {len(stored):>9,} {'-':>9} {store_seconds:>8.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+### BENCHMARK SUITE OF THE DASHBOARD
+
+"""
+Baseline benchmark of the dashboard on synthetic datasets of growing size (1k, 100k, 1M and
+10M rows by default, with the skew of the demand across companies and states of the actual
+data, see synthetic.py):
+- every plot_* function of 4-Dashboard.py: time to build the figure, time to serialize it
+  to JSON, size of the JSON sent to the browser and peak memory allocated while building it,
+- every filter branch of the former update_output callback (one per combination of Job,
+  Location and Company filters): time and peak memory of the former copy-and-scan filter
+  and of the current inverted index path.
+
+The datasets are converted as the dashboard loads its data (Job, Company and Location as
+categoricals). The results are written to a JSON file, and can be compared with those of
+a previous run to spot regressions:
+python -m benchmarks.bench_suite --output before.json
+python -m benchmarks.bench_suite --output after.json --compare before.json
+
+Run it from the root of the repository; the 10M rows dataset needs about 3 GB of memory.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io as pio
+
+from benchmarks.bench_filter_index import legacy_filter, scenarios
+from benchmarks.dashboard import ROOT, load_dashboard, use_dataset
+from benchmarks.synthetic import make_dataset
+from data_loader import CATEGORICAL_COLUMNS
+from figure_cache import filter_key
+
+SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+
+
+def plot_functions(dashboard):
+    """
+    This function returns every plotting function of the dashboard, by name.
+    """
+    return {name: function for name, function in vars(dashboard).items()
+            if name.startswith('plot_') and callable(function) and function.__name__ == name}
+
+
+def dashboard_frame(df):
+    """
+    This function converts a synthetic dataset as the dashboard loads its data.
+    """
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].astype('category')
+    return df
+
+
+def median_seconds(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def peak_memory_mb(function):
+    """
+    This function returns the peak of the memory allocated by a call (MB), and its result.
+    """
+    tracemalloc.start()
+    try:
+        result = function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20, result
+
+
+def benchmark_plots(dashboard, n_rows, repeat, memory=True):
+    results = []
+    for name, function in plot_functions(dashboard).items():
+        figure = function(dashboard.df)
+        payload = pio.to_json(figure, validate=False)
+        results.append({'rows': n_rows, 'kind': 'plot', 'name': name, 'path': 'figure',
+                        'seconds': median_seconds(lambda: function(dashboard.df), repeat),
+                        'serialize_seconds': median_seconds(lambda: pio.to_json(figure, validate=False), repeat),
+                        'json_bytes': len(payload.encode('utf-8')),
+                        'peak_mb': peak_memory_mb(lambda: function(dashboard.df))[0] if memory else None})
+    return results
+
+
+def benchmark_filters(dashboard, n_rows, repeat, memory=True):
+    results = []
+    df = dashboard.df
+    for name, (job, location, company) in scenarios(df).items():
+        key = filter_key(job, location, company, None)
+        paths = {'legacy': lambda: legacy_filter(df, job, location, company, (0, 0), None),
+                 'index': lambda: dashboard.filter_index.select(df, *key)}
+        for path, function in paths.items():
+            matched = len(function())
+            results.append({'rows': n_rows, 'kind': 'filter', 'name': name, 'path': path,
+                            'seconds': median_seconds(function, repeat), 'matched_rows': matched,
+                            'peak_mb': peak_memory_mb(function)[0] if memory else None})
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    return {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'pandas': pd.__version__, 'numpy': np.__version__, 'plotly': plotly.__version__,
+            'sizes': args.rows, 'repeat': args.repeat}
+
+
+def result_key(result):
+    return (result['rows'], result['kind'], result['name'], result['path'])
+
+
+def compare(results, baseline, threshold, min_seconds=0.001):
+    """
+    This function prints the timings that changed by more than the threshold against a previous run.
+
+    Timings under min_seconds in both runs are ignored, since they are dominated by noise.
+
+    Output:
+    1. Number of regressions (Integer).
+    """
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = 0
+    for result in results:
+        before = previous.get(result_key(result))
+        if before is None or not before['seconds'] or max(before['seconds'], result['seconds']) < min_seconds:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        if abs(ratio - 1) > threshold:
+            status = 'REGRESSION' if ratio > 1 else 'improvement'
+            regressions += ratio > 1
+            rows, kind, name, path = result_key(result)
+            print(f'{status:>11}: {kind} {name} ({path}) at {rows:,} rows: '
+                  f"{before['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of the plotting functions and filters of the dashboard.')
+    parser.add_argument('--rows', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3, help='repetitions per timing (1 for 10M rows and more)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the memory profiling')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file receiving the results')
+    parser.add_argument('--compare', help='JSON file of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative change reported by --compare')
+    args = parser.parse_args()
+
+    dashboard = load_dashboard()
+    results = []
+
+    for n_rows in args.rows:
+        use_dataset(dashboard, dashboard_frame(make_dataset(n_rows)))
+        repeat = 1 if n_rows >= 10_000_000 else args.repeat
+
+        for result in benchmark_plots(dashboard, n_rows, repeat, not args.no_memory) + \
+                benchmark_filters(dashboard, n_rows, repeat, not args.no_memory):
+            results.append(result)
+            extra = f"{result['json_bytes'] / 1024:10.1f} KB" if result['kind'] == 'plot' else \
+                f"{result['matched_rows']:10,} rows"
+            peak = f"{result['peak_mb']:8.1f} MB" if result['peak_mb'] is not None else ''
+            print(f"{n_rows:>11,} {result['kind']:>6} {result['name']:>22} {result['path']:>7} "
+                  f"{result['seconds'] * 1000:10.1f} ms {extra} {peak}", flush=True)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'meta': metadata(args), 'results': results}, file, indent=1)
+    print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+### BENCHMARK: THROUGHPUT OF THE DASHBOARD WITH SEVERAL WORKER PROCESSES
+
+"""
+Throughput test of the production entry point of the dashboard (wsgi.py) served by Gunicorn
+with 1, 2, 4... worker processes: requests per second and latency of the callbacks, and
+memory of the workers.
+
+Concurrent clients (one process each) replay random filter states as the browser does: a
+request to the filter state callback, then one request per plot with the new filter state
+and the filter state of the figure held by the client. Each POST counts as one request.
+
+The memory of each worker is read from /proc (Linux): resident set size (RSS), proportional
+set size (PSS, shared pages divided among the processes mapping them) and RSS of the mapped
+snapshot files. The total PSS of the master and the workers is the actual memory used by
+the server.
+
+Gunicorn is required (pip install gunicorn). Run it from the root of the repository:
+python -m benchmarks.bench_throughput --rows 1000000 --workers 1 2 4
+(0 rows stands for the actual dataset of the repository; --no-preload creates the app in
+each worker instead of once in the master process)
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+from benchmarks.bench_callback_latency import random_states
+from benchmarks.dashboard import ROOT
+from benchmarks.synthetic import make_dataset
+from data_loader import DATASET_CSV, SNAPSHOT_DIR, load_dataset
+
+FIGURE_IDS = ['demand_job_plot', 'demand_company_plot', 'demand_location_plot',
+              'salary_job_plot', 'salary_company_plot', 'salary_location_plot']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def post_callback(url, output, outputs, inputs, state=()):
+    """
+    This function calls a callback of the dashboard as the browser does and returns its response.
+    """
+    body = json.dumps({'output': output, 'outputs': outputs, 'inputs': list(inputs), 'state': list(state),
+                       'changedPropIds': [f"{item['id']}.{item['property']}" for item in inputs]}).encode('utf-8')
+    request = urllib.request.Request(url + '/_dash-update-component', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())['response']
+
+
+def run_client(url, states, seconds, seed):
+    """
+    This function replays filter states against the server for a duration and returns the
+    latency of each request (seconds).
+    """
+    rng = np.random.default_rng(seed)
+    rendered = {figure_id: None for figure_id in FIGURE_IDS}
+    latencies = []
+    end = time.perf_counter() + seconds
+
+    while time.perf_counter() < end:
+        job, location, company, salary, salary_filter = states[rng.integers(len(states))]
+        inputs = [{'id': 'job_dropdown', 'property': 'value', 'value': job},
+                  {'id': 'location_dropdown', 'property': 'value', 'value': location},
+                  {'id': 'company_dropdown', 'property': 'value', 'value': company},
+                  {'id': 'salary_slider', 'property': 'value', 'value': salary},
+                  {'id': 'salary_filter', 'property': 'value', 'value': salary_filter}]
+        start = time.perf_counter()
+        filter_state = post_callback(url, 'filter_state.data', {'id': 'filter_state', 'property': 'data'},
+                                     inputs)['filter_state']['data']
+        latencies.append(time.perf_counter() - start)
+
+        for figure_id in FIGURE_IDS:
+            start = time.perf_counter()
+            response = post_callback(url, f'..{figure_id}.figure...{figure_id}_rendered.data..',
+                                     [{'id': figure_id, 'property': 'figure'},
+                                      {'id': figure_id + '_rendered', 'property': 'data'}],
+                                     [{'id': 'filter_state', 'property': 'data', 'value': filter_state}],
+                                     [{'id': figure_id + '_rendered', 'property': 'data', 'value': rendered[figure_id]}])
+            latencies.append(time.perf_counter() - start)
+            rendered[figure_id] = response[figure_id + '_rendered']['data']
+
+    return latencies
+
+
+def _client(args):
+    return run_client(*args)
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as file:
+        return [int(pid) for pid in file.read().split()]
+
+
+def process_memory(pid, snapshot_dir):
+    """
+    This function returns the RSS, the PSS and the RSS of the mapped snapshot files of a process (bytes).
+    """
+    memory = {'rss': 0, 'pss': 0, 'snapshot_rss': 0}
+    snapshot_dir = os.path.realpath(snapshot_dir)
+    in_snapshot = False
+    with open(f'/proc/{pid}/smaps') as file:
+        for line in file:
+            fields = line.split()
+            if not fields[0].endswith(':'):
+                # Header of a mapping: address range, permissions, offset, device, inode and path
+                in_snapshot = len(fields) >= 6 and fields[5].startswith(snapshot_dir + os.sep)
+            elif fields[0] == 'Rss:':
+                memory['rss'] += int(fields[1]) * 1024
+                if in_snapshot:
+                    memory['snapshot_rss'] += int(fields[1]) * 1024
+            elif fields[0] == 'Pss:':
+                memory['pss'] += int(fields[1]) * 1024
+    return memory
+
+
+def wait_until_ready(url, process, timeout):
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        if process.poll() is not None:
+            raise RuntimeError('The server exited before accepting requests')
+        try:
+            with urllib.request.urlopen(url + '/', timeout=5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('The server did not start in time')
+
+
+def measure(n_workers, env, states, args):
+    """
+    This function serves the dashboard with a number of workers and measures its throughput and memory.
+    """
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    command = [sys.executable, '-m', 'gunicorn', '--workers', str(n_workers), '--bind', f'127.0.0.1:{port}',
+               '--timeout', '300', '--log-level', 'warning']
+    if not args.no_preload:
+        command.append('--preload')
+
+    start = time.perf_counter()
+    server = subprocess.Popen(command + ['wsgi:create_app()'], cwd=ROOT, env=env)
+    try:
+        wait_until_ready(url, server, timeout=600)
+        startup = time.perf_counter() - start
+
+        # Warm-up: every worker serves a few requests before the measurement
+        run_client(url, states, 2.0, seed=args.clients)
+
+        with multiprocessing.Pool(args.clients) as pool:
+            results = pool.map(_client, [(url, states, args.seconds, seed) for seed in range(args.clients)])
+        latencies = np.concatenate([np.asarray(result) for result in results])
+
+        workers = [process_memory(pid, env['DASHBOARD_SNAPSHOT']) for pid in worker_pids(server.pid)]
+        master = process_memory(server.pid, env['DASHBOARD_SNAPSHOT'])
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {'workers': n_workers, 'startup': startup, 'requests': len(latencies),
+            'throughput': len(latencies) / args.seconds,
+            'p50': np.percentile(latencies, 50), 'p95': np.percentile(latencies, 95),
+            'worker_rss': np.mean([memory['rss'] for memory in workers]),
+            'worker_pss': np.mean([memory['pss'] for memory in workers]),
+            'snapshot_rss': np.mean([memory['snapshot_rss'] for memory in workers]),
+            'total_pss': master['pss'] + sum(memory['pss'] for memory in workers)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of the dashboard served by Gunicorn with several workers.')
+    parser.add_argument('--rows', type=int, default=0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8, help='concurrent client processes')
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--states', type=int, default=40)
+    parser.add_argument('--no-preload', action='store_true')
+    args = parser.parse_args()
+
+    if shutil.which('gunicorn') is None:
+        sys.exit('Gunicorn is required: pip install gunicorn')
+
+    # The caches are not warmed up, so the startup and the memory compare with the previous measurements
+    env = dict(os.environ, DASHBOARD_DEBUG='0', DASHBOARD_WARM_UP='0')
+    temp_dir = None
+    if args.rows:
+        # Synthetic CSV file and its snapshot in a temporary directory, built once before starting the servers
+        temp_dir = tempfile.mkdtemp(prefix='bench-throughput-')
+        env['DASHBOARD_DATASET'] = os.path.join(temp_dir, 'Dataset.csv')
+        env['DASHBOARD_SNAPSHOT'] = os.path.join(temp_dir, 'snapshot')
+        make_dataset(args.rows).rename(columns={'Salary': 'Average Salary'}).to_csv(env['DASHBOARD_DATASET'], index=False)
+    else:
+        env['DASHBOARD_DATASET'] = DATASET_CSV
+        env['DASHBOARD_SNAPSHOT'] = SNAPSHOT_DIR
+
+    try:
+        df = load_dataset(env['DASHBOARD_DATASET'], env['DASHBOARD_SNAPSHOT'])
+        states = random_states(df, args.states)
+        print(f"{len(df):,} rows, {args.clients} clients, {args.seconds:.0f} s per run, "
+              f"{'app created in each worker' if args.no_preload else 'app preloaded in the master'}, "
+              f'{os.cpu_count()} CPUs')
+
+        baseline = None
+        for n_workers in args.workers:
+            result = measure(n_workers, env, states, args)
+            baseline = baseline or result['throughput']
+            print(f"{n_workers:>2} workers: {result['throughput']:7.1f} req/s ({result['throughput'] / baseline:4.2f}x)   "
+                  f"p50 {result['p50'] * 1000:6.1f} ms   p95 {result['p95'] * 1000:7.1f} ms   "
+                  f"startup {result['startup']:5.1f} s   per worker: RSS {result['worker_rss'] / 2**20:6.1f} MB, "
+                  f"PSS {result['worker_pss'] / 2**20:6.1f} MB, snapshot mapped {result['snapshot_rss'] / 2**20:5.1f} MB   "
+                  f"total PSS {result['total_pss'] / 2**20:6.1f} MB")
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+### BENCHMARK: TOP COMPANIES OF THE DASHBOARD
+
+"""
+Benchmark of the ranking of the companies with the most vacancies (bar chart and treemap
+of the dashboard) on a dataset with 1M distinct companies:
+- the former group-by count of every company followed by a sort of every company, against
+- the count of the companies through np.bincount over their codes followed by a partial
+  selection of the top companies (aggregates.py and topk.py).
+
+Both paths must return the same companies, in the same order, with the same counts. The
+streaming TopKCounter is benchmarked as well, ingesting the postings in batches.
+
+Run it from the root of the repository (about 2 GB of memory):
+python -m benchmarks.bench_topk --rows 5000000 --companies 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from aggregates import GroupAggregates
+from benchmarks.bench_suite import dashboard_frame
+from benchmarks.synthetic import make_dataset
+from topk import TopKCounter
+
+
+def groupby_top(df, k):
+    """
+    Former ranking of plot_barchart and plot_treemap: count per company, full sort, head.
+    """
+    return df.groupby(by='Company', as_index=False, observed=True)['Job'].count().\
+        sort_values(by=['Job', 'Company'], ascending=[False, True]).rename(columns={'Job': 'Vacancies'})[:k]
+
+
+def best_seconds(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the top companies of the dashboard.')
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--companies', type=int, default=1_000_000)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=100_000, help='postings per batch of the streaming counter')
+    args = parser.parse_args()
+
+    # Flat demand across the companies, each of them with at least one vacancy
+    raw = make_dataset(args.rows, n_companies=args.companies, company_exponent=0.5)
+    companies = np.array([f'Company {i:07d}' for i in range(args.companies)], dtype=object)
+    raw.loc[:args.companies - 1, 'Company'] = companies[:args.rows]
+    df = dashboard_frame(raw)
+    print(f"{len(df):,} rows, {df['Company'].nunique():,} distinct companies, top {args.top}")
+
+    scenarios = {'All': None,
+                 'Job': np.flatnonzero((df['Job'] == 'Data Scientist').to_numpy()),
+                 'Location': np.flatnonzero(df['Location'].isin(['Jalisco', 'Puebla']).to_numpy())}
+
+    for name, rows in scenarios.items():
+        filtered = df if rows is None else df.take(rows)
+        groupby_seconds, expected = best_seconds(lambda: groupby_top(filtered, args.top), args.repeat)
+        topk_seconds, result = best_seconds(lambda: GroupAggregates(df, rows).top_groups('Company', args.top), args.repeat)
+
+        assert result['Company'].tolist() == expected['Company'].astype(object).tolist()
+        assert result['Vacancies'].tolist() == expected['Vacancies'].tolist()
+        print(f'{name:>9} ({len(filtered):>9,} rows): groupby + sort {groupby_seconds * 1000:8.1f} ms   '
+              f'bincount + selection {topk_seconds * 1000:7.1f} ms   ({groupby_seconds / topk_seconds:5.1f}x)')
+
+    # Streaming counts, updated batch by batch as the postings are ingested
+    counter = TopKCounter()
+    values = raw['Company'].to_numpy()
+    start = time.perf_counter()
+    for offset in range(0, len(values), args.batch_size):
+        counter.update(values[offset:offset + args.batch_size])
+    update_seconds = time.perf_counter() - start
+    query_seconds, top = best_seconds(lambda: counter.top(args.top), args.repeat)
+
+    expected = groupby_top(df, args.top)
+    assert [value for value, _ in top] == expected['Company'].astype(object).tolist()
+    assert [count for _, count in top] == expected['Vacancies'].tolist()
+    n_batches = -(-len(values) // args.batch_size)
+    print(f'Streaming counter: {n_batches} batches of {args.batch_size:,} postings in {update_seconds:.2f} s '
+          f'({update_seconds / n_batches * 1000:.1f} ms per batch), top {args.top} in {query_seconds * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
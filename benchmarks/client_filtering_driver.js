@@ -0,0 +1,40 @@
+/*
+ * Driver of the clientside callbacks of assets/client_filtering.js under Node.js, for
+ * benchmarks/bench_client_filtering.py: it replays the inputs of a session (values of the
+ * dropdowns, of the slider and of the checkbox) against the copy of the dataset, as the
+ * browser does, and writes the time of each interaction and the figures of the first ones.
+ *
+ * Usage: node client_filtering_driver.js input.json output.json
+ * input.json holds {"data": <copy of the dataset>, "states": [[job, location, company, salary, salary_filter], ...],
+ * "figures": <number of interactions whose figures are written>}
+ */
+
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+
+global.window = {dash_clientside: {no_update: {}}};
+require(path.join(__dirname, '..', 'assets', 'client_filtering.js'));
+const callbacks = window.dash_clientside.client_filtering;
+const FIGURE_IDS = ['demand_job_plot', 'demand_company_plot', 'demand_location_plot',
+                    'salary_job_plot', 'salary_company_plot', 'salary_location_plot'];
+
+const input = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
+const seconds = [];
+const figures = [];
+
+input.states.forEach(function (state, i) {
+  const start = process.hrtime.bigint();
+  const filterState = callbacks.filter_state(...state, input.data);
+  const outputs = {};
+  FIGURE_IDS.forEach(function (figureId) {
+    outputs[figureId] = callbacks[figureId](filterState, input.data);
+  });
+  seconds.push(Number(process.hrtime.bigint() - start) / 1e9);
+  if (i < input.figures) {
+    figures.push({key: filterState.key, figures: outputs});
+  }
+});
+
+fs.writeFileSync(process.argv[3], JSON.stringify({seconds: seconds, figures: figures}));
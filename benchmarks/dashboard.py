@@ -0,0 +1,26 @@
+### HELPERS FOR BENCHMARKING THE DASHBOARD
+
+"""
+Loading of the dashboard app (4-Dashboard.py is not an importable module name, see wsgi.py)
+and replacement of its dataset by a synthetic one.
+"""
+
+from wsgi import ROOT, load_dashboard
+
+
+def use_dataset(dashboard, df):
+    """
+    This function replaces the dataset of the dashboard and rebuilds its derived structures.
+    """
+    from figure_cache import dataset_fingerprint
+    from filter_index import FilterIndex
+    from filter_store import FilterStore
+    from option_search import build_option_index
+
+    dashboard.df = df
+    dashboard.filter_index = FilterIndex(df)
+    dashboard.filter_store = FilterStore(dashboard.filter_index, maxsize=dashboard.filter_store.stats()['maxsize'])
+    dashboard.dataset_token = dataset_fingerprint(df)
+    dashboard.figure_cache.clear()
+    dashboard.option_indexes = {'company_dropdown': build_option_index(df['Company']),
+                                'location_dropdown': build_option_index(df['Location'])}
@@ -0,0 +1,176 @@
+### LOCAL STAND-IN OF THE OCC WEBSITE
+
+"""
+Local HTTP server standing in for the result pages of the OCC website, so the scraper can
+be exercised and benchmarked offline.
+
+It serves the url scheme of the OCC searcher ('/empleos/de-<job>/?page=<n>'). A page is
+read from a directory of saved result pages when one is given ('<job>-<n>.html', e.g.,
+'data-analyst-2.html'); otherwise, it is rendered with the markup and class identifiers of
+the OCC website (August 2022) from the vacancies of Dataset_Raw.csv, picked
+deterministically from the job and the page number.
+
+A latency can be added to every response to emulate the network and the rendering time
+of the website, as well as a share of transient failures (HTTP 503) to exercise retries.
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from benchmarks.dashboard import ROOT
+from scraper import DEFAULT_CLASSES
+
+RAW_CSV = os.path.join(ROOT, 'DataSet_Raw.csv')
+
+# Vacancies per result page of the OCC website
+PAGE_SIZE = 20
+
+PATH_PATTERN = re.compile(r'^/empleos/de-(?P<job>[^/]+)/?$')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def render_page(records, classes=DEFAULT_CLASSES):
+    """
+    This function renders a result page with the markup of the OCC website.
+
+    It requires 1 input (plus 1 optional one):
+    1. records : Vacancies of the page, as [Job, Salary, Company, Location] lists (List).
+    2. classes : Class identifiers of the page elements (Dictionary).
+
+    Output:
+    1. Source of the page (String).
+    """
+    cards = []
+    for job, salary, company, location in records:
+        parts = [f'<h2 class="{classes["jobname"]}">{escape(job)}</h2>']
+        if isinstance(salary, str):
+            parts.append(f'<span class="{classes["salary"]}">{escape(salary)}</span>')
+        if isinstance(company, str):
+            parts.append(f'<a class="{classes["company"]}" href="#">{escape(company)}</a>')
+        if isinstance(location, str):
+            parts.append(f'<a class="{classes["location"]}" href="#">{escape(location)}</a>')
+        cards.append(f'<div class="{classes["vacancy"]}">' + ''.join(parts) + '</div>')
+
+    return ('<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>Empleos | OCC</title></head>'
+            '<body><main>' + '\n'.join(cards) + '</main></body></html>')
+
+
+class StandinServer:
+    """
+    Threaded HTTP server with the result pages of the OCC website, run in a background thread.
+
+    It can be used as a context manager; its base_url attribute replaces scraper.BASE_URL.
+
+    It requires 5 optional inputs:
+    1. pages_dir : Directory with saved result pages, or None to render them from Dataset_Raw.csv (String).
+    2. latency : Delay added to every response, in seconds (Float).
+    3. failure_rate : Share of the requests answered with HTTP 503 (Float).
+    4. page_size : Number of vacancies per rendered page (Integer).
+    5. seed : Seed of the random failures (Integer).
+    """
+
+    def __init__(self, pages_dir=None, latency=0.0, failure_rate=0.0, page_size=PAGE_SIZE, seed=0):
+        self.pages_dir = pages_dir
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.page_size = page_size
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._records = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/empleos/de-'
+
+    def page(self, job, number):
+        """
+        This function returns the source of a result page, or None if there is no such page.
+        """
+        if self.pages_dir is not None:
+            path = os.path.join(self.pages_dir, f'{job}-{number}.html')
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding='utf-8') as file:
+                return file.read()
+
+        if self._records is None:
+            raw = pd.read_csv(RAW_CSV)
+            self._records = raw[['Job', 'Salary', 'Company', 'Location']].values.tolist()
+
+        # Deterministic window of the raw vacancies for each job and page
+        start = (sum(map(ord, job)) * 7919 + (number - 1) * self.page_size) % len(self._records)
+        records = [self._records[(start + i) % len(self._records)] for i in range(self.page_size)]
+        return render_page(records)
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                with standin._lock:
+                    standin.requests += 1
+                    fail = standin._random.random() < standin.failure_rate
+                if standin.latency:
+                    time.sleep(standin.latency)
+
+                url = urlsplit(self.path)
+                match = PATH_PATTERN.match(url.path)
+                html = None
+                if match and not fail:
+                    number = int(parse_qs(url.query).get('page', ['1'])[0])
+                    html = standin.page(match.group('job'), number)
+
+                if fail:
+                    self.send_response(503)
+                    self.send_header('Retry-After', '0')
+                    body = b''
+                elif html is None:
+                    self.send_response(404)
+                    body = b''
+                else:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    body = html.encode('utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = _Server(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
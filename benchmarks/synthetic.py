@@ -0,0 +1,77 @@
+### SYNTHETIC DATA JOBS DATASETS
+
+"""
+Generation of synthetic datasets with the same schema as the cleaned data jobs dataset
+(Job, Company, Location, Salary), used for benchmarking the dashboard at scale.
+
+The proportions of the data job categories, the share of vacancies without a disclosed
+salary and the salary level of each category follow the August 2022 dataset, while the
+demand per state and per company follows a Zipf-like distribution to reproduce the
+strong concentration observed in the real data (e.g., Ciudad de México and Banamex).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Share of the vacancies per data job category and median monthly salary (MXN)
+JOBS = {'Data Analyst': (0.3604, 18400),
+        'Business Analyst': (0.2928, 32500),
+        'Data Engineer': (0.2140, 37500),
+        'Data Scientist': (0.1013, 46250),
+        'Data Architect': (0.0315, 63750)}
+
+# Mexican states, from the most to the least demanding of data jobs
+STATES = ['Ciudad de México', 'Nuevo León', 'Estado de México', 'Jalisco', 'Querétaro',
+          'Guanajuato', 'Sinaloa', 'Yucatán', 'Puebla', 'Aguascalientes', 'Chihuahua',
+          'Coahuila', 'Sonora', 'Baja California', 'San Luis Potosí', 'Quintana Roo',
+          'Michoacán', 'Morelos', 'Oaxaca', 'Tamaulipas', 'Zacatecas', 'Nayarit',
+          'Baja California Sur', 'Veracruz', 'Hidalgo', 'Tabasco', 'Campeche', 'Chiapas',
+          'Colima', 'Durango', 'Guerrero', 'Tlaxcala']
+
+# Share of the vacancies without a disclosed salary
+MISSING_SALARY = 0.646
+
+
+def zipf_weights(n, exponent):
+    """
+    This function returns normalized Zipf-like weights for n ranked items.
+    """
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def make_dataset(n_rows, n_companies=None, seed=0, company_exponent=1.1, state_exponent=1.6):
+    """
+    This function generates a synthetic data jobs dataset.
+
+    It requires 1 input (plus 4 optional ones):
+    1. n_rows : Number of vacancies to generate (Integer).
+    2. n_companies : Number of distinct companies; by default, it grows with the square root of n_rows (Integer).
+    3. seed : Seed of the random number generator (Integer).
+    4. company_exponent : Exponent of the Zipf-like demand per company (Float).
+    5. state_exponent : Exponent of the Zipf-like demand per state (Float).
+
+    Output:
+    1. Pandas dataframe with the columns Job, Company, Location and Salary.
+    """
+    rng = np.random.default_rng(seed)
+
+    if n_companies is None:
+        n_companies = max(50, int(np.sqrt(n_rows) * 10))
+
+    jobs = list(JOBS)
+    job_codes = rng.choice(len(jobs), size=n_rows, p=[share for share, _ in JOBS.values()])
+    state_codes = rng.choice(len(STATES), size=n_rows, p=zipf_weights(len(STATES), state_exponent))
+    company_codes = rng.choice(n_companies, size=n_rows, p=zipf_weights(n_companies, company_exponent))
+
+    # Log-normal salaries around the median of each category, rounded to 500 MXN as published vacancies
+    medians = np.array([median for _, median in JOBS.values()], dtype=np.float64)
+    salary = np.round(medians[job_codes] * rng.lognormal(0.0, 0.35, size=n_rows) / 500) * 500
+    salary[rng.random(n_rows) < MISSING_SALARY] = np.nan
+
+    companies = np.array([f'Company {i:07d}' for i in range(n_companies)], dtype=object)
+
+    return pd.DataFrame({'Job': np.array(jobs, dtype=object)[job_codes],
+                         'Company': companies[company_codes],
+                         'Location': np.array(STATES, dtype=object)[state_codes],
+                         'Salary': salary})
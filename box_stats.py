@@ -0,0 +1,144 @@
+### SUMMARY STATISTICS OF THE BOX PLOTS
+
+"""
+Server-side statistics of the box plot of the dashboard.
+
+Given every observation, Plotly serializes all of them into the figure and computes the
+quartiles in the browser, so the payload grows with the dataset. Here, the statistics of
+each box (quartiles, whiskers and outliers) are computed on the server, and the figure only
+carries them plus a bounded, reproducible sample of the observations, drawn as the jittered
+points next to each box.
+
+The statistics follow the definitions of Plotly (default 'linear' quartile method), so the
+boxes are drawn exactly as if every observation had been sent:
+- the quartiles interpolate linearly between the order statistics at positions p * n - 0.5,
+- the whiskers end at the most extreme observations within 1.5 times the interquartile
+  range from the box, and
+- the observations beyond the whiskers are the outliers.
+
+Only a few order statistics are needed, so they are selected with np.partition, in linear
+time, instead of sorting the observations of each box.
+"""
+
+import numpy as np
+import pandas as pd
+
+from filter_index import column_codes
+
+# Maximum number of observations drawn as points next to each box
+MAX_POINTS = 1000
+
+# Seed of the sample of observations drawn as points
+SEED = 0
+
+# Relative tolerance of the fences of the whiskers, as in Plotly
+FENCE_TOLERANCE = 1e-9
+
+
+def _quantile_positions(n, probabilities):
+    # Positions of the order statistics interpolated by Plotly for each probability
+    positions = np.clip(np.asarray(probabilities, dtype=np.float64) * n - 0.5, 0, n - 1)
+    return np.floor(positions).astype(np.int64), np.ceil(positions).astype(np.int64), positions % 1
+
+
+def box_statistics(values):
+    """
+    This function computes the statistics of a box of a box plot, as Plotly does.
+
+    Input:
+    1. values : Observations of the box, without missing values (NumPy array).
+
+    Output:
+    1. Dictionary with the number of observations (count), the quartiles (q1, median, q3)
+       and the ends of the whiskers (lowerfence, upperfence); None if there are no observations.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return None
+
+    floor, ceil, fraction = _quantile_positions(n, [0.25, 0.5, 0.75])
+    ordered = np.partition(values, np.unique(np.concatenate([floor, ceil, [0, n - 1]])))
+    q1, median, q3 = fraction * ordered[ceil] + (1 - fraction) * ordered[floor]
+
+    # Whiskers: most extreme observations within 1.5 IQR from the box (never inside the box)
+    step = (ordered[n - 1] - ordered[0]) / (n - 1) if n > 1 else 1
+    lower = 2.5 * q1 - 1.5 * q3 - step * FENCE_TOLERANCE
+    upper = 2.5 * q3 - 1.5 * q1 + step * FENCE_TOLERANCE
+    lowerfence = min(q1, values[values >= lower].min())
+    upperfence = max(q3, values[values <= upper].max())
+
+    return {'count': n, 'q1': q1, 'median': median, 'q3': q3,
+            'lowerfence': lowerfence, 'upperfence': upperfence}
+
+
+def sample_points(values, stats, max_points=MAX_POINTS, seed=SEED):
+    """
+    This function draws the observations shown as points next to a box.
+
+    Every observation is kept when there are at most max_points of them. Otherwise, the
+    outliers are kept (up to half of the points) and the rest of the points are a uniform
+    sample of the other observations. The sample only depends on the observations and the
+    seed, so the same filters always give the same figure.
+
+    It requires 2 inputs (plus 2 optional ones):
+    1. values : Observations of the box, without missing values (NumPy array).
+    2. stats : Statistics of the box, as returned by box_statistics (Dictionary).
+    3. max_points : Maximum number of points (Integer).
+    4. seed : Seed of the sample (Integer).
+
+    Output:
+    1. NumPy array with the sampled observations, in their original order.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= max_points:
+        return values
+
+    rng = np.random.default_rng(seed)
+    outlier = (values < stats['lowerfence']) | (values > stats['upperfence'])
+    outliers = np.flatnonzero(outlier)
+    if len(outliers) > max_points // 2:
+        outliers = rng.choice(outliers, max_points // 2, replace=False)
+    inliers = np.flatnonzero(~outlier)
+    inliers = rng.choice(inliers, min(len(inliers), max_points - len(outliers)), replace=False)
+
+    return values[np.sort(np.concatenate([outliers, inliers]))]
+
+
+def group_box_statistics(df, by, value, max_points=MAX_POINTS, seed=SEED):
+    """
+    This function computes the statistics of the boxes of a box plot, one box per group.
+
+    It requires 3 inputs (plus 2 optional ones):
+    1. df : Data (Pandas dataframe).
+    2. by : Column with the groups, one box per group (String).
+    3. value : Column with the observations; missing values are ignored (String).
+    4. max_points : Maximum number of points drawn next to each box (Integer).
+    5. seed : Seed of the sample of points (Integer).
+
+    Output:
+    1. Pandas dataframe indexed by group (groups without observations are left out), with the columns
+       count, q1, median, q3, lowerfence, upperfence and points (sampled observations).
+    """
+    values = df[value].to_numpy(dtype=np.float64)
+    codes, groups = column_codes(df[by])
+    valid = ~np.isnan(values) & (codes >= 0)
+    codes, values = codes[valid], values[valid]
+
+    # Observations grouped by a stable sort of their group codes (radix sort for few groups)
+    order = np.argsort(codes.astype(np.min_scalar_type(len(groups)), copy=False), kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(groups) + 1))
+    values = values[order]
+
+    rows, index = [], []
+    for position in range(len(groups)):
+        box = values[bounds[position]:bounds[position + 1]]
+        stats = box_statistics(box)
+        if stats is None:
+            continue
+        stats['points'] = sample_points(box, stats, max_points, seed)
+        rows.append(stats)
+        index.append(groups[position])
+
+    return pd.DataFrame(rows, index=pd.Index(index, name=by),
+                        columns=['count', 'q1', 'median', 'q3', 'lowerfence', 'upperfence', 'points'])
@@ -0,0 +1,359 @@
+### CLEANING OF THE SCRAPED JOB DATA
+
+"""
+Cleaning of the job data scraped from the OCC website, following the procedure of
+2-DataWrangling.ipynb:
+1. Drop of duplicated vacancies.
+2. Harmonization of the job titles and drop of the non data-related jobs.
+3. Drop of the vacancies without company and harmonization of the letter case of the
+   company names.
+4. Harmonization of the names of the Mexican states.
+5. Conversion of the published salaries into an average monthly salary.
+6. Drop of the outliers with an average salary above 120,000 MXN.
+
+The record functions clean one vacancy at a time, so the vacancies can be cleaned as they
+are scraped (see pipeline.py). The clean_dataframe function cleans a whole dataset at once
+with vectorized operations, and gives the same result as the notebook, i.e.,
+Dataset_Clean.csv from Dataset_Raw.csv:
+- every rule is applied once per distinct value instead of once per row,
+- the keywords of all the job rules are compiled into a single regular expression,
+  scanned once per distinct title,
+- the locations are mapped through a single lookup of their distinct values, and
+- the salary ranges are parsed through a single vectorized extraction.
+
+The variants of the company names left by the letter case harmonization can be resolved
+into canonical companies with a 'Company ID' column (see company_resolution.py).
+
+Usage from the root of the repository:
+python cleaning.py DataSet_Raw.csv Dataset_Clean.csv
+python cleaning.py DataSet_Raw.csv Dataset_Clean.csv --companies companies
+"""
+
+import argparse
+import math
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from company_resolution import CompanyResolver, resolve_companies
+
+# Keywords identifying each data job category, in both English and Spanish
+JOB_DICT = {
+    ('data', 'analyst'): "Data Analyst",
+    ('analista', 'datos'): "Data Analyst",
+
+    ('data', 'scientist'): "Data Scientist",
+    ('científico', 'datos'): "Data Scientist",
+    ('cientifico', 'datos'): "Data Scientist",
+
+    ('data', 'engineer'): "Data Engineer",
+    ('ingeniero', 'datos'): "Data Engineer",
+
+    ('business', 'analyst'): "Business Analyst",
+    ('analista', 'negocio'): "Business Analyst",
+
+    ('data', 'architect'): "Data Architect",
+    ('arquitecto', 'datos'): "Data Architect"
+}
+
+# Data job categories kept in the dataset
+DATA_JOBS = ('Data Analyst', 'Business Analyst', 'Data Engineer', 'Data Scientist', 'Data Architect')
+
+# Abbreviations and spellings of the Mexican states found on the OCC website
+LOCATION_DICT = {
+    'CDMX': 'Ciudad de México',
+    'Chih.': 'Chihuahua',
+    'Edo. Méx.​': 'Estado de México',
+    'Gto.': 'Guanajuato',
+    'Jal.': 'Jalisco',
+    'Q. Roo': 'Quintana Roo',
+    'N. L.': 'Nuevo León',
+    'N.L.': 'Nuevo León',
+    'Pue.': 'Puebla',
+    'México': 'Estado de México',
+    'Zac.': 'Zacatecas',
+    'Tamps.': 'Tamaulipas',
+    'Mor.': 'Morelos',
+    'Sin.': 'Sinaloa',
+    'Oax.': 'Oaxaca',
+    'Qro.': 'Querétaro',
+    'Mich.': 'Michoacán',
+    'Son.': 'Sonora',
+    'BC.': 'Baja California',
+    'SLP.': 'San Luis Potosí',
+    'Yuc.': 'Yucatán',
+    'Coah.': 'Coahuila',
+    'BCS.': 'Baja California Sur',
+    'Nay.': 'Nayarit',
+    'Ags.': 'Aguascalientes'
+    }
+
+# Useless characters of the salary values
+CHAR_REMOVE = {
+    'Anual': '',
+    'Mensual': '',
+    '$': '',
+    ',': ''}
+
+# Average salaries above this value are considered outliers (MXN per month)
+MAX_AVERAGE_SALARY = 120000
+
+# Columns of the raw and the cleaned datasets
+RAW_COLUMNS = ['Job', 'Salary', 'Company', 'Location']
+CLEAN_COLUMNS = ['Job', 'Company', 'Location', 'Average Salary']
+
+
+def is_missing(value):
+    """
+    This function returns True for a missing value (None or NaN).
+    """
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def normalize_job(title):
+    """
+    This function harmonizes a job title into its data job category.
+
+    Input:
+    1. title : Job title as published on the OCC website (String).
+
+    Output:
+    1. Data job category, for instance, 'Data Analyst', or None if it is not a data job (String).
+    """
+    if is_missing(title):
+        return None
+    title = str(title).casefold()
+    for (first, second), job in JOB_DICT.items():
+        if first in title and second in title:
+            return job
+    return None
+
+
+def normalize_company(company):
+    """
+    This function harmonizes the letter case of a company name (None if the company is missing).
+    """
+    if is_missing(company):
+        return None
+    return str.title(str(company))
+
+
+def map_location(location):
+    """
+    This function harmonizes the name of a Mexican state, for instance, 'CDMX' into 'Ciudad de México'.
+    """
+    return LOCATION_DICT.get(location, location)
+
+
+def parse_salary(salary):
+    """
+    This function converts a published salary into an average monthly salary.
+
+    As in 2-DataWrangling.ipynb, a salary range such as '$47,000 - $53,000  Mensual' gives the
+    mean of its bounds, while a single value such as '$35,000  Mensual' gives NaN (the average
+    is only defined for ranges in the published dataset).
+
+    Input:
+    1. salary : Salary as published on the OCC website (String or NaN).
+
+    Output:
+    1. Average salary, or NaN if it is missing or cannot be parsed (Float).
+    """
+    if is_missing(salary):
+        return np.nan
+    salary = str(salary)
+    for key, value in CHAR_REMOVE.items():
+        salary = salary.replace(key, value).strip()
+
+    bounds = salary.split('-', 1)
+    if len(bounds) < 2:
+        return np.nan
+    try:
+        return (float(bounds[0].strip()) + float(bounds[1].strip())) / 2
+    except ValueError:
+        return np.nan
+
+
+def clean_record(record):
+    """
+    This function cleans a scraped vacancy.
+
+    Input:
+    1. record : Vacancy as [Job, Salary, Company, Location], as returned by the scraper (List or tuple).
+
+    Output:
+    1. Cleaned vacancy as (Job, Company, Location, Average Salary), or None if it is dropped (Tuple).
+    """
+    title, salary, company, location = record
+
+    job = normalize_job(title)
+    if job is None:
+        return None
+    company = normalize_company(company)
+    if company is None:
+        return None
+    average_salary = parse_salary(salary)
+    if average_salary > MAX_AVERAGE_SALARY:
+        return None
+
+    return (job, company, map_location(location), average_salary)
+
+
+def compile_job_rules(job_dict=JOB_DICT):
+    """
+    This function compiles the keyword rules of the job titles into a single regular expression.
+
+    The expression finds, at every position of a title, the longest keyword starting there
+    (a lookahead, so overlapping keywords are found too); every keyword contained in the
+    matched one is then present as well. Each title gets a bit mask of the keywords it
+    contains, and a rule applies when all the bits of its keywords are set.
+
+    Input:
+    1. job_dict : Keywords of each data job category, in order of priority (Dictionary).
+
+    Output:
+    1. Compiled expression, the bit mask implied by each keyword, the bit mask of each rule
+       (NumPy array) and the category of each rule (NumPy array).
+    """
+    keywords = sorted({keyword for rule in job_dict for keyword in rule}, key=lambda keyword: (-len(keyword), keyword))
+    bits = {keyword: 1 << position for position, keyword in enumerate(keywords)}
+
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+    implied = {keyword: sum(bits[other] for other in keywords if other in keyword) for keyword in keywords}
+    rule_masks = np.array([sum(bits[keyword] for keyword in rule) for rule in job_dict], dtype=np.int64)
+    rule_jobs = np.array(list(job_dict.values()), dtype=object)
+
+    return pattern, implied, rule_masks, rule_jobs
+
+
+JOB_RULES = compile_job_rules()
+
+# Characters removed from the salaries, in a single expression
+SALARY_REMOVE = re.compile('|'.join(map(re.escape, CHAR_REMOVE)))
+
+
+def _map_distinct(values, function):
+    # Applies a function to the distinct values only and broadcasts the results to the rows
+    codes, uniques = pd.factorize(values)
+    mapped = function(pd.Series(uniques, dtype=object))
+    result = np.asarray(mapped, dtype=object).take(codes)
+    result[codes < 0] = np.nan
+    return pd.Series(result, index=values.index)
+
+
+def normalize_jobs(titles, rules=JOB_RULES):
+    """
+    This function harmonizes job titles into their data job categories (vectorized normalize_job).
+
+    It requires 1 input (plus 1 optional one):
+    1. titles : Job titles as published on the OCC website (Pandas series).
+    2. rules : Compiled job rules, as returned by compile_job_rules (Tuple).
+
+    Output:
+    1. Pandas series with the data job category of each title, NaN for non data-related jobs.
+    """
+    pattern, implied, rule_masks, rule_jobs = rules
+
+    def categories(uniques):
+        masks = np.zeros(len(uniques), dtype=np.int64)
+        for position, title in enumerate(uniques):
+            for keyword in pattern.findall(title.casefold()):
+                masks[position] |= implied[keyword]
+        # First rule whose keywords are all in the title
+        matches = (masks[:, None] & rule_masks[None, :]) == rule_masks[None, :]
+        jobs = rule_jobs[np.argmax(matches, axis=1)] if len(rule_masks) else np.empty(len(uniques), dtype=object)
+        return np.where(matches.any(axis=1), jobs, np.nan)
+
+    return _map_distinct(titles, categories)
+
+
+def normalize_companies(companies):
+    """
+    This function harmonizes the letter case of company names (vectorized normalize_company).
+    """
+    return _map_distinct(companies, lambda uniques: [str.title(str(company)) for company in uniques])
+
+
+def map_locations(locations, location_dict=LOCATION_DICT):
+    """
+    This function harmonizes the names of the Mexican states (vectorized map_location).
+    """
+    keys = pd.Index(list(location_dict))
+    names = np.array(list(location_dict.values()), dtype=object)
+
+    def lookup(uniques):
+        positions = keys.get_indexer(uniques)
+        return np.where(positions >= 0, names.take(positions), uniques.to_numpy())
+
+    return _map_distinct(locations, lookup)
+
+
+def parse_salaries(salaries):
+    """
+    This function converts published salaries into average monthly salaries (vectorized parse_salary).
+
+    Input:
+    1. salaries : Salaries as published on the OCC website (Pandas series).
+
+    Output:
+    1. Pandas series with the average salary of each range; NaN for missing values and single values.
+    """
+    def averages(uniques):
+        bounds = uniques.str.replace(SALARY_REMOVE, '', regex=True).str.extract(r'^([^-]*)-(.*)$')
+        low = pd.to_numeric(bounds[0].str.strip(), errors='coerce')
+        high = pd.to_numeric(bounds[1].str.strip(), errors='coerce')
+        return ((low + high) / 2).to_numpy(dtype=np.float64)
+
+    codes, uniques = pd.factorize(salaries)
+    result = averages(pd.Series(uniques, dtype=object)).take(codes) if len(uniques) else np.full(len(codes), np.nan)
+    result[codes < 0] = np.nan
+    return pd.Series(result, index=salaries.index, dtype=np.float64)
+
+
+def clean_dataframe(df):
+    """
+    This function cleans the raw job data scraped from the OCC website.
+
+    It requires 1 input:
+    1. df : Raw job data with the columns Job, Salary, Company and Location (Pandas dataframe).
+
+    Output:
+    1. Pandas dataframe with the columns Job, Company, Location and Average Salary, as Dataset_Clean.csv.
+    """
+    df = df[RAW_COLUMNS].drop_duplicates()
+
+    job = normalize_jobs(df['Job'])
+    keep = job.notna() & df['Company'].notna()
+    df = df[keep]
+
+    clean = pd.DataFrame({'Job': job[keep],
+                          'Company': normalize_companies(df['Company']),
+                          'Location': map_locations(df['Location']),
+                          'Average Salary': parse_salaries(df['Salary'])})
+
+    return clean[~(clean['Average Salary'] > MAX_AVERAGE_SALARY)].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cleaning of the job data scraped from the OCC website.')
+    parser.add_argument('raw', nargs='?', default='DataSet_Raw.csv', help='CSV file with the raw data')
+    parser.add_argument('clean', nargs='?', default='Dataset_Clean.csv', help='CSV file receiving the cleaned data')
+    parser.add_argument('--companies', help='directory of the state of the company resolver (see company_resolution.py); '
+                                            'the company names are resolved into canonical companies if given')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df_base = pd.read_csv(args.raw)
+    df = clean_dataframe(df_base)
+    if args.companies:
+        resolver = CompanyResolver.load(args.companies)
+        df = resolve_companies(df, resolver)
+        resolver.save(args.companies)
+    df.to_csv(args.clean, index=False, encoding='utf-8')
+    print(f'{len(df)} vacancies out of {len(df_base)} written to {args.clean} in {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+### CLIENT-SIDE FILTERING OF THE DASHBOARD
+
+"""
+Compact columnar copy of the dataset sent once to the browser, for the client-side filtering
+mode of the dashboard.
+
+In this mode, every change of a dropdown or of the salary slider is handled in the browser
+by the clientside callbacks of assets/client_filtering.js: they filter the rows and compute
+the aggregates of the six plots (counts per job, location and company, mean salaries per
+cell, statistics of the boxes) from the copy of the dataset, with no request to the server.
+The figures are rebuilt from templates rendered once by the server for the default filter
+state, whose layout and trace styles do not depend on the filters; only their data changes.
+
+The columns are dictionary-encoded: the labels of Job, Location and Company are sent once,
+and each row only carries their integer codes, in the smallest signed integer type (-1 for
+the missing values). The salaries are sent as 32-bit floats when they are all exactly
+representable, as 64-bit floats otherwise. The arrays are encoded in base64 inside the
+JSON of the layout, so the copy of 100,000 rows weighs under 1 MB before compression.
+
+The mode is meant for small and medium datasets: above a number of rows, the dashboard
+keeps filtering on the server.
+"""
+
+import base64
+
+import numpy as np
+
+from box_stats import MAX_POINTS
+from figure_cache import SALARY_STEP
+from filter_index import column_codes
+
+# Maximum number of rows of a dataset filtered in the browser
+CLIENT_MAX_ROWS = 200_000
+
+# Columns of the dataset sent to the browser
+CLIENT_COLUMNS = ('Job', 'Location', 'Company')
+
+
+def encode_array(values):
+    """
+    This function encodes a NumPy array as its type and its little-endian bytes in base64 (Dictionary).
+    """
+    values = np.ascontiguousarray(values)
+    values = values.astype(values.dtype.newbyteorder('<'), copy=False)
+    return {'dtype': values.dtype.name, 'data': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def encode_column(series):
+    """
+    This function encodes a column as its labels and the codes of its rows, in the smallest signed integer type.
+
+    Input:
+    1. series : Column of the dataframe, categorical or not (Pandas series).
+
+    Output:
+    1. Dictionary with the labels (List of strings), the type and the base64 bytes of the codes.
+    """
+    codes, uniques = column_codes(series)
+    dtype = np.min_scalar_type(-max(len(uniques), 1))
+    return dict(encode_array(codes.astype(dtype)), labels=[str(label) for label in uniques])
+
+
+def encode_salary(series):
+    """
+    This function encodes the salaries as 32-bit floats if they are all exactly representable, as 64-bit floats otherwise.
+    """
+    salary = series.to_numpy(dtype=np.float64)
+    single = salary.astype(np.float32)
+    exact = np.array_equal(single.astype(np.float64), salary, equal_nan=True)
+    return encode_array(single if exact else salary)
+
+
+def client_payload(df, dataset_token, templates, map_locations, contour_locations):
+    """
+    This function returns the copy of the dataset and the templates of the figures sent to the browser.
+
+    It requires 5 inputs:
+    1. df : Dataset of the dashboard, with Job, Location, Company and Salary columns (Pandas dataframe).
+    2. dataset_token : Fingerprint of the dataset (String).
+    3. templates : JSON of each figure for the default filter state, per plot id (Dictionary).
+    4. map_locations : Code of the location of each state of the map, in the order of the map, -1 if absent (List).
+    5. contour_locations : Name and code of each location of the contour plot, in the order of the plot (List).
+
+    Output:
+    1. Dictionary stored in the layout of the dashboard (dcc.Store) and read by assets/client_filtering.js.
+    """
+    return {'token': dataset_token,
+            'rows': len(df),
+            'columns': {column: encode_column(df[column]) for column in CLIENT_COLUMNS},
+            'salary': encode_salary(df['Salary']),
+            'salary_step': SALARY_STEP,
+            'max_points': MAX_POINTS,
+            'map_locations': [int(code) for code in map_locations],
+            'contour_locations': [[str(name), int(code)] for name, code in contour_locations],
+            'templates': templates}
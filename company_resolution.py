@@ -0,0 +1,464 @@
+### ENTITY RESOLUTION OF THE COMPANY NAMES
+
+"""
+Resolution of the variants of the company names of the scraped vacancies into canonical
+companies, for instance, 'P3 IMPULSORES ESTRATEGICOS', 'P3 Impulsores Estrategicos, S.A.
+de C.V.' and 'P3 Impulsores Estratégicos S...' (names are truncated by the OCC website).
+
+The letter case harmonization of 2-DataWrangling.ipynb keeps those variants apart, which
+splits the vacancies of a company across several bars of the dashboard. Comparing every
+pair of names is quadratic in the number of distinct names, so the names are resolved in
+three stages instead:
+1. Normalization: each name is reduced to a key without letter case, accents, punctuation,
+   truncation marks or trailing legal forms ('sa de cv', 's de rl', 'sapi'...), and the
+   names sharing a key are the same company.
+2. Blocking: the keys are described by MinHash signatures of their character 3-grams,
+   split into bands (locality-sensitive hashing); only the keys sharing the hash of a band
+   become candidate pairs, so the keys with a Jaccard similarity above the threshold are
+   found with high probability without comparing every pair.
+3. Matching: the candidate pairs whose keys have a Jaccard similarity of their 3-grams of
+   at least the threshold are merged (union-find).
+
+The resolver is incremental: the keys of new scrapes are only compared with the keys of
+their blocks, and the identifier of a company is the number of its oldest key, so the
+identifiers already written keep their meaning (a company only changes identifier when a
+new name bridges it with an older company). Its state can be saved into a directory and
+loaded back.
+
+Usage from the root of the repository:
+python company_resolution.py Dataset_Clean.csv --state companies
+"""
+
+import argparse
+import bisect
+import json
+import os
+import re
+import tempfile
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Minimum Jaccard similarity of the 3-grams of two keys of the same company
+THRESHOLD = 0.7
+
+# Bands and rows per band of the MinHash signatures: the keys above the threshold share a band with a probability
+# of 1 - (1 - J^rows)^bands (0.89 at J = 0.7, 0.99 at J = 0.85, 0.17 at J = 0.4)
+BANDS = 8
+ROWS = 4
+
+# Keys per chunk of the computation of the signatures
+CHUNK_SIZE = 50_000
+
+# Maximum number of keys of a block compared with a new key (the oldest ones)
+MAX_BLOCK = 100
+
+# Tokens of the legal forms of Mexican and foreign companies, removed from the end of the keys
+LEGAL_TOKENS = {'s', 'a', 'sa', 'de', 'c', 'v', 'cv', 'r', 'l', 'rl', 'srl', 'sapi', 'sab', 'sc', 'sas', 'sofom',
+                'er', 'enr', 'ac', 'iap', 'llc', 'inc', 'ltd', 'corp', 'co', 'gmbh', 'ag', 'bv', 'plc'}
+
+PUNCTUATION = re.compile(r'[^\w\s&]')
+SPACES = re.compile(r'\s+')
+
+# Modulus and coefficients of the hash functions of the signatures (universal hashing modulo a Mersenne prime)
+PRIME = (1 << 31) - 1
+
+
+def company_key(name):
+    """
+    This function returns the normalized key of a company name.
+
+    Input:
+    1. name : Company name, as published or as cleaned (String).
+
+    Output:
+    1. Key of the name, for instance, 'p3 impulsores estrategicos' for 'P3 Impulsores Estratégicos, S.A. de C.V.'
+       (String; empty for a name without letters or digits).
+    """
+    text = unicodedata.normalize('NFKD', str(name).casefold())
+    text = ''.join(character for character in text if not unicodedata.combining(character))
+    # Dots of the abbreviations are dropped ('s.a.' into 'sa'), the other punctuation splits the words
+    text = SPACES.sub(' ', PUNCTUATION.sub(lambda match: '' if match.group() == '.' else ' ', text)).strip()
+
+    tokens = text.split(' ')
+    while len(tokens) > 1 and tokens[-1] in LEGAL_TOKENS:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def is_truncated(name):
+    """
+    This function returns True for a name truncated by the website ('Acepte Soluciones Integrales, S. D...').
+
+    The key of a truncated name is a prefix of the key of the complete name (its last word may be cut anywhere).
+    """
+    return str(name).rstrip().endswith('...')
+
+
+def shingle_codes(keys):
+    """
+    This function returns the character 3-grams of the keys as integers, with the range of each key.
+
+    The keys are padded with two spaces on each side, so every key has 3-grams (even an empty
+    one), and their UTF-8 bytes are read as a single array: each 3-gram is the 24-bit number of
+    three consecutive bytes of a key.
+
+    Input:
+    1. keys : Normalized keys (List of strings).
+
+    Output:
+    1. NumPy array with the 3-grams of every key, one key after another (int64).
+    2. NumPy array with the offset of the 3-grams of each key, plus the total number at the end.
+    """
+    encoded = [('  ' + key + '  ').encode('utf-8') for key in keys]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.int64)
+
+    counts = lengths - 2
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    starts = np.concatenate(([0], np.cumsum(lengths)))[:-1]
+
+    # Position of the first byte of each 3-gram in the concatenated bytes
+    positions = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+    codes = (data[positions] << 16) | (data[positions + 1] << 8) | data[positions + 2]
+    return codes, offsets
+
+
+def minhash_signatures(keys, coefficients):
+    """
+    This function returns the MinHash signatures of the 3-grams of the keys.
+
+    It requires 2 inputs:
+    1. keys : Normalized keys (List of strings).
+    2. coefficients : Coefficients (a, b) of the hash functions, one row per function (NumPy array).
+
+    Output:
+    1. NumPy array of shape (keys, functions) with the minimum of each hash function over the 3-grams of each key (uint32).
+    """
+    signatures = np.empty((len(keys), len(coefficients)), dtype=np.uint32)
+    for start in range(0, len(keys), CHUNK_SIZE):
+        codes, offsets = shingle_codes(keys[start:start + CHUNK_SIZE])
+        for function, (a, b) in enumerate(coefficients):
+            hashes = (codes * a + b) % PRIME
+            signatures[start:start + len(offsets) - 1, function] = np.minimum.reduceat(hashes, offsets[:-1])
+    return signatures
+
+
+def band_hashes(signatures, bands=BANDS, rows=ROWS):
+    """
+    This function returns the hash of each band of the signatures (NumPy array of shape (keys, bands), uint64).
+    """
+    values = signatures.astype(np.uint64).reshape(len(signatures), bands, rows)
+    hashes = np.full((len(signatures), bands), np.uint64(1469598103934665603))
+    with np.errstate(over='ignore'):
+        for row in range(rows):
+            hashes = (hashes ^ values[:, :, row]) * np.uint64(1099511628211)
+        hashes ^= np.arange(bands, dtype=np.uint64)
+    return hashes
+
+
+def jaccard(first, second):
+    """
+    This function returns the Jaccard similarity of the character 3-grams of two keys (Float).
+    """
+    first, second = _shingle_set(first), _shingle_set(second)
+    union = len(first | second)
+    return len(first & second) / union if union else 1.0
+
+
+def _shingle_set(key):
+    padded = '  ' + key + '  '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CompanyResolver:
+    """
+    Incremental resolver of the company names into canonical companies.
+
+    Each distinct key gets a number in the order it is first seen; the identifier of a company
+    is the number of its oldest key, and its canonical name is the first name seen for that
+    key (replaced by the first complete name if it was truncated by the website).
+
+    Besides the candidate pairs of the blocks, the key of a truncated name is matched with the
+    keys of the complete names it is a prefix of, found by binary searches over the sorted
+    complete keys: it joins their company if they all belong to the same one, and waits for
+    the complete names of the next scrapes otherwise.
+
+    It requires 4 optional inputs:
+    1. threshold : Minimum Jaccard similarity of the 3-grams of two keys of the same company (Float).
+    2. bands : Number of bands of the MinHash signatures (Integer).
+    3. rows : Number of hash functions per band (Integer).
+    4. seed : Seed of the hash functions (Integer).
+    """
+
+    def __init__(self, threshold=THRESHOLD, bands=BANDS, rows=ROWS, seed=0):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._coefficients = np.stack([rng.integers(1, PRIME, size=bands * rows),
+                                       rng.integers(0, PRIME, size=bands * rows)], axis=1)
+
+        self.keys = []
+        self.names = []
+        self._numbers = {}
+        self._parent = np.empty(0, dtype=np.int64)
+        self._bands = np.empty((0, bands), dtype=np.uint64)
+        self._sorted = None
+        self._complete = []
+        self._pending = {}
+        self.comparisons = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _find(self, number):
+        parent = self._parent
+        root = number
+        while parent[root] != root:
+            root = parent[root]
+        while parent[number] != root:
+            parent[number], number = root, parent[number]
+        return root
+
+    def _union(self, first, second):
+        first, second = self._find(first), self._find(second)
+        if first == second:
+            return
+        # The oldest key stays the root, so the identifier of the older company is kept
+        root, child = min(first, second), max(first, second)
+        self._parent[child] = root
+        if is_truncated(self.names[root]) and not is_truncated(self.names[child]):
+            self.names[root] = self.names[child]
+
+    def _sorted_bands(self):
+        # Band hashes of the keys in increasing order, per band, with the number of the key of each hash
+        if self._sorted is None:
+            order = np.argsort(self._bands, axis=0, kind='stable')
+            self._sorted = (np.take_along_axis(self._bands, order, axis=0), order)
+        return self._sorted
+
+    def _candidates(self, first_new):
+        # Candidate pairs (older or new key, new key) sharing the hash of a band, each pair once
+        hashes, order = self._sorted_bands()
+        new_numbers = np.arange(first_new, len(self.keys))
+        pairs = []
+        for band in range(self.bands):
+            # Range of the keys sharing the hash of the band of each new key, found by binary searches
+            new_hashes = self._bands[first_new:, band]
+            low = np.searchsorted(hashes[:, band], new_hashes, side='left')
+            sizes = np.minimum(np.searchsorted(hashes[:, band], new_hashes, side='right') - low, MAX_BLOCK)
+            ends = np.cumsum(sizes)
+            positions = np.repeat(low - ends + sizes, sizes) + np.arange(ends[-1] if len(ends) else 0)
+            others, news = order[positions, band], np.repeat(new_numbers, sizes)
+            different = others != news
+            pairs.append(np.minimum(others, news)[different] * len(self.keys) + np.maximum(others, news)[different])
+        pairs = np.unique(np.concatenate(pairs))
+        return np.stack([pairs // len(self.keys), pairs % len(self.keys)], axis=1)
+
+    def add(self, names):
+        """
+        This function adds company names to the resolver, and resolves their new keys against every known key.
+
+        Input:
+        1. names : Company names (Iterable of strings).
+
+        Output:
+        1. NumPy array with the number of the key of each name.
+        """
+        first_new = len(self.keys)
+        old_pending = dict(self._pending)
+        numbers, completed = [], []
+        for name in names:
+            key = company_key(name)
+            number = self._numbers.get(key)
+            if number is None:
+                number = self._numbers[key] = len(self.keys)
+                self.keys.append(key)
+                self.names.append(str(name))
+            elif is_truncated(self.names[number]) and not is_truncated(name):
+                # First complete name of a key known from truncated names only
+                self.names[number] = str(name)
+                completed.append(number)
+            numbers.append(number)
+        numbers = np.array(numbers, dtype=np.int64)
+        if len(self.keys) > first_new:
+            self._match_blocks(first_new)
+        if len(self.keys) > first_new or completed:
+            self._match_prefixes(first_new, old_pending, completed)
+        return numbers
+
+    def _match_blocks(self, first_new):
+        signatures = minhash_signatures(self.keys[first_new:], self._coefficients)
+        self._bands = np.concatenate([self._bands, band_hashes(signatures, self.bands, self.rows)])
+        self._parent = np.concatenate([self._parent, np.arange(first_new, len(self.keys), dtype=np.int64)])
+        self._sorted = None
+
+        # Comparison of the candidate pairs only
+        candidates = self._candidates(first_new)
+        self.comparisons += len(candidates)
+        shingles = {}
+
+        def shingle_set(number):
+            if number not in shingles:
+                shingles[number] = _shingle_set(self.keys[number])
+            return shingles[number]
+
+        for first, second in candidates.tolist():
+            if self._find(first) == self._find(second):
+                continue
+            first_set, second_set = shingle_set(first), shingle_set(second)
+            if len(first_set & second_set) >= self.threshold * len(first_set | second_set):
+                self._union(first, second)
+
+    def _match_prefixes(self, first_new, old_pending, completed):
+        # Keys of the complete names in increasing order, with the new ones
+        new_complete = [number for number in range(first_new, len(self.keys)) if not is_truncated(self.names[number])]
+        new_complete += completed
+        for number in completed:
+            self._pending.pop(self.keys[number], None)
+            old_pending.pop(self.keys[number], None)
+        if len(new_complete) > len(self._complete) // 8:
+            self._complete = sorted(set(self._complete).union(self.keys[number] for number in new_complete))
+        else:
+            for number in new_complete:
+                bisect.insort(self._complete, self.keys[number])
+
+        # Truncated keys to match: the new ones, and the older ones that are a prefix of a new complete key
+        to_match = {self.keys[number]: number for number in range(first_new, len(self.keys)) if is_truncated(self.names[number])}
+        self._pending.update(to_match)
+        if old_pending:
+            for number in new_complete:
+                key = self.keys[number]
+                for end in range(1, len(key)):
+                    if key[:end] in old_pending:
+                        to_match[key[:end]] = old_pending[key[:end]]
+
+        for key, number in to_match.items():
+            low = bisect.bisect_left(self._complete, key)
+            high = bisect.bisect_left(self._complete, key + '\U0010ffff', low, min(low + MAX_BLOCK, len(self._complete)))
+            roots = {self._find(self._numbers[complete]) for complete in self._complete[low:high]}
+            if len(roots) == 1 and high < low + MAX_BLOCK:
+                self._union(number, roots.pop())
+                del self._pending[key]
+
+    def resolve(self, names):
+        """
+        This function returns the company identifier and canonical name of each name, adding the new names first.
+
+        Input:
+        1. names : Company names (Pandas series).
+
+        Output:
+        1. Pandas dataframe with the columns Company ID (Integer) and Company (String), indexed as names.
+        """
+        codes, uniques = pd.factorize(names)
+        roots = np.array([self._find(number) for number in self.add(uniques).tolist()], dtype=np.int64)
+
+        ids = np.full(len(codes), -1, dtype=np.int64)
+        ids[codes >= 0] = roots[codes[codes >= 0]]
+        canonical = np.asarray([self.names[root] for root in roots] or [''], dtype=object).take(np.maximum(codes, 0))
+        canonical[codes < 0] = np.nan
+        return pd.DataFrame({'Company ID': ids, 'Company': canonical}, index=names.index)
+
+    def companies(self):
+        """
+        This function returns the number of distinct companies of the known keys (Integer).
+        """
+        return len(np.unique([self._find(number) for number in range(len(self.keys))])) if self.keys else 0
+
+    def stats(self):
+        return {'keys': len(self.keys), 'companies': self.companies(), 'comparisons': self.comparisons}
+
+    def save(self, directory):
+        """
+        This function writes the state of the resolver into a directory (each file through a temporary file).
+        """
+        os.makedirs(directory, exist_ok=True)
+        parent = np.array([self._find(number) for number in range(len(self.keys))], dtype=np.int64)
+        settings = {'threshold': self.threshold, 'bands': self.bands, 'rows': self.rows, 'seed': self.seed,
+                    'comparisons': self.comparisons, 'keys': self.keys, 'names': self.names,
+                    'pending': sorted(self._pending.values())}
+
+        for name, write in (('resolver.npz', lambda file: np.savez(file, parent=parent, bands=self._bands)),
+                            ('resolver.json', lambda file: file.write(json.dumps(settings, ensure_ascii=False).encode('utf-8')))):
+            file_descriptor, temp_path = tempfile.mkstemp(prefix='.resolver-', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(file_descriptor, 'wb') as file:
+                    write(file)
+                os.replace(temp_path, os.path.join(directory, name))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+    @classmethod
+    def load(cls, directory):
+        """
+        This function returns the resolver saved into a directory, or a new resolver if there is none.
+        """
+        if not os.path.exists(os.path.join(directory, 'resolver.json')):
+            return cls()
+        with open(os.path.join(directory, 'resolver.json'), encoding='utf-8') as file:
+            settings = json.load(file)
+        resolver = cls(settings['threshold'], settings['bands'], settings['rows'], settings['seed'])
+        resolver.keys = settings['keys']
+        resolver.names = settings['names']
+        resolver.comparisons = settings['comparisons']
+        resolver._numbers = {key: number for number, key in enumerate(resolver.keys)}
+        resolver._complete = sorted(key for key, name in zip(resolver.keys, resolver.names) if not is_truncated(name))
+        resolver._pending = {resolver.keys[number]: number for number in settings['pending']}
+        with np.load(os.path.join(directory, 'resolver.npz')) as arrays:
+            resolver._parent = arrays['parent']
+            resolver._bands = arrays['bands']
+        return resolver
+
+
+def resolve_companies(df, resolver, column='Company'):
+    """
+    This function replaces the company names of a dataframe by their canonical names and adds their identifiers.
+
+    It requires 2 inputs (plus 1 optional one):
+    1. df : Job data with a column of company names (Pandas dataframe).
+    2. resolver : Resolver of the company names, updated with the new names (CompanyResolver).
+    3. column : Column of the company names (String).
+
+    Output:
+    1. Copy of the dataframe with the canonical names in the column and their identifiers in a 'Company ID' column.
+    """
+    resolved = resolver.resolve(df[column])
+    df = df.copy()
+    df[column] = resolved['Company']
+    df['Company ID'] = resolved['Company ID']
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Entity resolution of the company names of the job data.')
+    parser.add_argument('csv', nargs='?', default='Dataset_Clean.csv', help='CSV file with a Company column')
+    parser.add_argument('output', nargs='?', help='CSV file receiving the canonical names and identifiers (none by default)')
+    parser.add_argument('--state', default='companies', help='directory of the state of the resolver, updated')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    resolver = CompanyResolver.load(args.state)
+    df = pd.read_csv(args.csv)
+    before = len(resolver)
+    resolved = resolve_companies(df, resolver)
+    resolver.save(args.state)
+    print(f"{df['Company'].nunique()} company names, {len(resolver) - before} new keys: "
+          f"{resolved['Company ID'].nunique()} companies in {time.perf_counter() - start:.2f} s")
+
+    merged = resolved.assign(Name=df['Company']).groupby('Company ID')['Name'].unique()
+    for names in merged[merged.map(len) > 1]:
+        print('  ' + ' = '.join(names))
+
+    if args.output:
+        resolved.to_csv(args.output, index=False, encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+### DATA LOADING FOR THE DATA JOBS DASHBOARD
+
+"""
+Loading of the cleaned data jobs dataset from a local columnar snapshot.
+
+The first time the dataset is loaded (or whenever the CSV file changes), the CSV file is
+converted into a snapshot directory with one NumPy file per column: the Job, Company and
+Location columns are stored as categorical codes plus their categories, and the numeric
+columns as plain arrays. The next loads memory-map those files instead of parsing the
+CSV file, so the startup neither blocks on the network nor parses text, and the pages of
+the arrays are shared by every process mapping the same snapshot.
+
+A snapshot is only used if the SHA-256 checksum of the CSV file it was built from matches
+the current file (the checksum is only recomputed when the size or modification time of
+the file changed). Processes starting together, such as the workers of a WSGI server
+(see wsgi.py), take a lock on the snapshot while checking and building it, so the CSV file
+is parsed (or downloaded) by only one of them and the others map the resulting snapshot.
+
+The dataset can also be loaded from the directory of an IncrementalStore still being
+filled by the streaming pipeline (pipeline.py), in order to explore partial results, or
+from the directory of a SnapshotStore with the postings of several scrapes.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock between processes
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from cleaning import CLEAN_COLUMNS
+from vacancy_store import IncrementalStore, SnapshotStore
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Local dataset and its snapshot
+DATASET_CSV = os.path.join(ROOT, 'Dataset_Clean.csv')
+SNAPSHOT_DIR = os.path.join(ROOT, 'snapshot')
+
+# Published dataset, only used when there is neither a local CSV file nor a snapshot
+DATASET_URL = 'https://raw.githubusercontent.com/DanielEduardoLopez/DataJobsMX2022/main/Dataset_Clean.csv'
+
+# Columns stored as categoricals
+CATEGORICAL_COLUMNS = ('Job', 'Company', 'Location')
+
+# Version of the snapshot layout
+SNAPSHOT_VERSION = 1
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """
+    This function returns the SHA-256 checksum of a file (hexadecimal string).
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read_meta(snapshot_dir):
+    try:
+        with open(os.path.join(snapshot_dir, 'meta.json'), encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == SNAPSHOT_VERSION else None
+
+
+def _source_checksum(csv_path, meta):
+    # The checksum recorded in the snapshot is reused while the size and modification time
+    # of the file are unchanged, so a warm start does not read the whole CSV file
+    stamp = _file_stamp(csv_path)
+    if meta is not None and meta.get('source_stamp') == stamp:
+        return meta['checksum']
+    return file_checksum(csv_path)
+
+
+def _write_meta(snapshot_dir, meta):
+    # The metadata is written into a temporary file which then replaces meta.json, so readers never see a partial file
+    handle, temp_path = tempfile.mkstemp(prefix='.meta-', suffix='.json', dir=snapshot_dir)
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, os.path.join(snapshot_dir, 'meta.json'))
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextlib.contextmanager
+def _snapshot_lock(snapshot_dir):
+    # Exclusive lock between processes on a file next to the snapshot directory
+    if fcntl is None:
+        yield
+        return
+    parent = os.path.dirname(os.path.abspath(snapshot_dir))
+    os.makedirs(parent, exist_ok=True)
+    with open(os.path.abspath(snapshot_dir) + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_snapshot(df, snapshot_dir, checksum, source_stamp=None, categorical=CATEGORICAL_COLUMNS):
+    """
+    This function writes a dataframe as a columnar snapshot.
+
+    The snapshot is written into a temporary directory which then replaces the previous
+    snapshot, so readers never see a partially written snapshot.
+
+    It requires 3 inputs (plus 2 optional ones):
+    1. df : Dataframe to store (Pandas dataframe).
+    2. snapshot_dir : Directory of the snapshot (String).
+    3. checksum : Checksum of the source of the data (String).
+    4. source_stamp : Size and modification time of the source file (Dictionary).
+    5. categorical : Columns to store as categoricals (Tuple of strings).
+
+    Output:
+    1. Metadata of the snapshot (Dictionary).
+    """
+    parent = os.path.dirname(os.path.abspath(snapshot_dir))
+    os.makedirs(parent, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='.snapshot-', dir=parent)
+
+    columns = []
+    for position, column in enumerate(df.columns):
+        file_name = f'{position:02d}'
+        if column in categorical or df[column].dtype == object:
+            values = df[column] if isinstance(df[column].dtype, pd.CategoricalDtype) else df[column].astype('category')
+            # Codes keep the integer width chosen by Pandas, so they are mapped without conversion
+            np.save(os.path.join(temp_dir, file_name + '.codes.npy'), np.asarray(values.cat.codes))
+            with open(os.path.join(temp_dir, file_name + '.categories.json'), 'w', encoding='utf-8') as file:
+                json.dump(values.cat.categories.tolist(), file, ensure_ascii=False)
+            columns.append({'name': column, 'kind': 'category', 'file': file_name})
+        else:
+            np.save(os.path.join(temp_dir, file_name + '.npy'), df[column].to_numpy())
+            columns.append({'name': column, 'kind': 'array', 'file': file_name})
+
+    meta = {'version': SNAPSHOT_VERSION, 'checksum': checksum, 'source_stamp': source_stamp,
+            'n_rows': len(df), 'columns': columns}
+    _write_meta(temp_dir, meta)
+
+    # Swap of the directories (the old snapshot is removed only after the new one is in place)
+    old_dir = None
+    if os.path.exists(snapshot_dir):
+        old_dir = snapshot_dir + '.old'
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(snapshot_dir, old_dir)
+    os.replace(temp_dir, snapshot_dir)
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    return meta
+
+
+def read_snapshot(snapshot_dir, mmap=True):
+    """
+    This function reads a columnar snapshot into a dataframe.
+
+    It requires 1 input (plus 1 optional one):
+    1. snapshot_dir : Directory of the snapshot (String).
+    2. mmap : Whether to memory-map the arrays instead of reading them into memory (Boolean).
+
+    Output:
+    1. Pandas dataframe, with categorical columns for the columns stored as categoricals.
+    """
+    meta = _read_meta(snapshot_dir)
+    if meta is None:
+        raise FileNotFoundError(f'No valid snapshot in {snapshot_dir}')
+
+    mmap_mode = 'r' if mmap else None
+    data = {}
+    for column in meta['columns']:
+        path = os.path.join(snapshot_dir, column['file'])
+        if column['kind'] == 'category':
+            codes = np.load(path + '.codes.npy', mmap_mode=mmap_mode)
+            with open(path + '.categories.json', encoding='utf-8') as file:
+                categories = json.load(file)
+            data[column['name']] = pd.Categorical.from_codes(codes, categories=categories)
+        else:
+            data[column['name']] = np.load(path + '.npy', mmap_mode=mmap_mode)
+
+    return pd.DataFrame(data, copy=False)
+
+
+def source_stamp(csv_path=DATASET_CSV, snapshot_dir=SNAPSHOT_DIR):
+    """
+    This function returns a stamp of the source of the dataset, which changes whenever load_dataset would load other data.
+
+    It requires 2 optional inputs:
+    1. csv_path : Path of the CSV file with the dataset, or directory of an IncrementalStore or a SnapshotStore (String).
+    2. snapshot_dir : Directory of the snapshot of the CSV file (String).
+
+    Output:
+    1. Size and modification time of the CSV file, number, total size and latest modification time of the files
+       of a store, or checksum and number of rows of the snapshot when there is no CSV file (Dictionary, or None).
+    """
+    if os.path.isdir(csv_path):
+        stamp = {'files': 0, 'size': 0, 'mtime_ns': 0}
+        for directory, _, names in os.walk(csv_path):
+            for name in names:
+                try:
+                    stat = os.stat(os.path.join(directory, name))
+                except FileNotFoundError:  # Temporary file renamed in the meantime
+                    continue
+                stamp['files'] += 1
+                stamp['size'] += stat.st_size
+                stamp['mtime_ns'] = max(stamp['mtime_ns'], stat.st_mtime_ns)
+        return stamp
+    if os.path.exists(csv_path):
+        return _file_stamp(csv_path)
+    meta = _read_meta(snapshot_dir)
+    return None if meta is None else {'checksum': meta['checksum'], 'n_rows': meta['n_rows']}
+
+
+def load_dataset(csv_path=DATASET_CSV, snapshot_dir=SNAPSHOT_DIR, categorical=CATEGORICAL_COLUMNS):
+    """
+    This function loads the cleaned data jobs dataset, from its snapshot whenever it is up to date.
+
+    It requires 3 optional inputs:
+    1. csv_path : Path of the CSV file with the dataset, or directory of an IncrementalStore or a SnapshotStore (String).
+    2. snapshot_dir : Directory of the snapshot of the CSV file (String).
+    3. categorical : Columns to store as categoricals (Tuple of strings).
+
+    Output:
+    1. Pandas dataframe with the dataset.
+    """
+    if os.path.isdir(csv_path):
+        # The parts of a store change while the pipeline runs, so they are read directly
+        if os.path.isdir(os.path.join(csv_path, 'sightings')):
+            df = SnapshotStore(csv_path).read()[CLEAN_COLUMNS]
+        else:
+            df = IncrementalStore(csv_path).read()
+        for column in categorical:
+            df[column] = df[column].astype('category')
+        return df
+
+    with _snapshot_lock(snapshot_dir):
+        meta = _read_meta(snapshot_dir)
+
+        if not os.path.exists(csv_path):
+            # Without the CSV file, an existing snapshot is used as is
+            if meta is not None:
+                return read_snapshot(snapshot_dir)
+            df = pd.read_csv(DATASET_URL)
+            write_snapshot(df, snapshot_dir, checksum=None, categorical=categorical)
+            return read_snapshot(snapshot_dir)
+
+        checksum = _source_checksum(csv_path, meta)
+        if meta is None or meta['checksum'] != checksum:
+            df = pd.read_csv(csv_path)
+            write_snapshot(df, snapshot_dir, checksum=checksum, source_stamp=_file_stamp(csv_path), categorical=categorical)
+        elif meta.get('source_stamp') != _file_stamp(csv_path):
+            # Same content with a new modification time: the stamp is refreshed to skip the checksum next time
+            meta['source_stamp'] = _file_stamp(csv_path)
+            _write_meta(snapshot_dir, meta)
+
+        # Read under the lock, so another process cannot replace the snapshot in the middle of the read
+        return read_snapshot(snapshot_dir)
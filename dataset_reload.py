@@ -0,0 +1,226 @@
+### RELOADING OF THE DATASET OF THE RUNNING DASHBOARD
+
+"""
+Reloading of the dataset of the running dashboard, so a new scrape is picked up without
+restarting the server and without dropping every warm cache:
+1. Watching: a background thread polls the stamp of the source of the dataset (the CSV
+   file, its snapshot or the store of pipeline.py, see data_loader.source_stamp) and
+   reloads the dataset once a change has settled, i.e., the same new stamp was read by two
+   consecutive polls, so a file still being written is not read.
+2. Building: the new dataset and every structure derived from it (filter index, salary
+   bounds, option indexes, filter store...) are built in the background, while the
+   callbacks keep running on the current ones. Only the rows added and removed since the
+   current version (row_delta) are applied to the aggregates already computed for the
+   largest common filter states (see aggregates.py), which seed the filter store of the new
+   version; the smaller ones are aggregated again when first requested.
+3. Swapping: the new structures replace the current ones under the writer side of a
+   readers-writer lock (SwapLock), whose reader side is held by every callback, so a
+   callback runs from start to end on a single version of the dataset and never sees a
+   half-replaced state.
+"""
+
+import contextlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Minimum number of rows of a filter state whose aggregates are refreshed with the changed rows: a smaller state, or one
+# with about as many changed rows, is aggregated again as fast when first requested (see bench_dataset_reload.py)
+REFRESH_MIN_ROWS = 32_768
+
+
+def row_hashes(df):
+    """
+    This function returns a 64-bit hash of the values of each row of a dataframe (NumPy array, uint64).
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _occurrence_keys(hashes):
+    # Hash of each row combined with its number of earlier copies, so the copies of a duplicated row are matched one by one
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1]])
+    occurrence = np.arange(len(hashes)) - np.repeat(starts, np.diff(np.r_[starts, len(hashes)]))
+    keys = np.empty_like(hashes)
+    with np.errstate(over='ignore'):
+        keys[order] = sorted_hashes + occurrence.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    return keys
+
+
+def row_delta(old, new, columns=None):
+    """
+    This function returns the rows added to and removed from a dataframe between two versions.
+
+    The rows are compared by value over the given columns, as multisets (the order of the rows
+    does not matter, and the k-th copy of a duplicated row matches its k-th copy in the other
+    version). When the old rows are a prefix of the new ones, as for the store filled by the
+    pipeline or a CSV file extended by a new scrape, the added rows are the last ones, without
+    matching every row.
+
+    It requires 2 inputs (plus 1 optional one):
+    1. old : Current version of the job data (Pandas dataframe).
+    2. new : New version of the job data (Pandas dataframe).
+    3. columns : Columns compared, every column of the old version if None (List of strings).
+
+    Output:
+    1. Positions of the rows of the new version that are not in the old one (NumPy array).
+    2. Positions of the rows of the old version that are not in the new one (NumPy array).
+    """
+    columns = list(old.columns if columns is None else columns)
+    old_hashes, new_hashes = row_hashes(old[columns]), row_hashes(new[columns])
+    if len(new_hashes) >= len(old_hashes) and np.array_equal(new_hashes[:len(old_hashes)], old_hashes):
+        return np.arange(len(old_hashes), len(new_hashes)), np.empty(0, dtype=np.intp)
+
+    old_keys, new_keys = _occurrence_keys(old_hashes), _occurrence_keys(new_hashes)
+    return np.flatnonzero(~np.isin(new_keys, old_keys)), np.flatnonzero(~np.isin(old_keys, new_keys))
+
+
+def worth_refreshing(n_rows, n_changed):
+    """
+    This function returns whether the aggregates of a filter state of n_rows rows are refreshed with n_changed changed rows.
+    """
+    return n_rows >= max(REFRESH_MIN_ROWS, 4 * n_changed)
+
+
+class SwapLock:
+    """
+    Readers-writer lock between the callbacks of the dashboard (readers) and the swap of its dataset (writer).
+
+    Any number of callbacks run together. A swap waits for the callbacks in flight to finish
+    and holds the new ones back until the structures of the new dataset are rebound (writer
+    preference, so a steady flow of callbacks cannot delay a swap forever). The structures are
+    built before the swap, so the new callbacks are only held back for the end of the longest
+    callback in flight plus the rebinding itself. A thread already holding the reader side may
+    take it again (a callback calling another one).
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self.swaps = 0
+        self.held_back = 0
+
+    @contextlib.contextmanager
+    def read(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._condition:
+                if self._writing or self._waiting_writers:
+                    self.held_back += 1
+                while self._writing or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._condition:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self.swaps += 1
+                self._condition.notify_all()
+
+    def stats(self):
+        return {'swaps': self.swaps, 'held_back': self.held_back, 'readers': self._readers}
+
+
+class DatasetWatcher:
+    """
+    Background thread polling the stamp of the source of the dataset, and reloading the dataset once a change has settled.
+
+    A failed reload keeps the current dataset, and is only tried again after the next change of the source.
+
+    It requires 2 inputs (plus 2 optional ones):
+    1. stamp : Function without arguments returning the stamp of the source (Callable).
+    2. reload : Function without arguments reloading the dataset (Callable).
+    3. interval : Seconds between two polls (Float).
+    4. current : Stamp of the source of the current dataset, read at the start of the watcher if None.
+    """
+
+    def __init__(self, stamp, reload, interval=5.0, current=None):
+        self.stamp = stamp
+        self.reload = reload
+        self.interval = interval
+        self._current = stamp() if current is None else current
+        self._changed = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.reloads = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_reload = None
+
+    def check(self):
+        """
+        This function polls the source once and reloads the dataset if its change has settled. It returns True after a reload.
+        """
+        self.polls += 1
+        try:
+            stamp = self.stamp()
+        except OSError:
+            return False
+        if stamp == self._current:
+            self._changed = None
+            return False
+        if stamp != self._changed:
+            # The source may still be written: the same stamp must be read again at the next poll
+            self._changed = stamp
+            return False
+
+        self._current, self._changed = stamp, None
+        try:
+            self.reload()
+        except Exception as error:
+            self.errors += 1
+            self.last_error = repr(error)
+            return False
+        self.reloads += 1
+        self.last_reload = time.time()
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """
+        This function starts polling the source in a daemon thread, and returns the watcher.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='dataset-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        return {'polls': self.polls, 'reloads': self.reloads, 'errors': self.errors, 'last_error': self.last_error,
+                'last_reload': self.last_reload}
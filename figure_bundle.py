@@ -0,0 +1,259 @@
+### STATIC BUNDLES OF THE DASHBOARD FIGURES
+
+"""
+Precomputed figures of the most common filter states of the dashboard, exported once at
+deploy time and served by the callbacks instead of being computed on the first request.
+
+Most visits land on the default state (every filter on 'All') or on a single selection of
+one dropdown: a data job category, a state, or one of the companies with the most
+vacancies. The export renders every plot (and the panel of the salary tests) for each of
+these states and writes them as JSON files into a bundle directory, next to a manifest
+listing the states and the plots.
+
+A bundle is identified by the fingerprint of the dataset and by the settings the figures
+depend on (version of the bundle format, level of detail of the map, mode of the box plot
+and a digest of the source of the plotting code and of the geometry of the map), so the
+dashboard only opens a bundle matching what it would compute itself. Bundles are written
+into a temporary directory renamed at the end, so a server never opens a partial bundle,
+and older bundles are kept for a rollback to the previous dataset or code.
+
+Run it from the root of the repository (with the same environment variables as the server):
+python figure_bundle.py --top-companies 20
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+from filter_index import column_codes
+from filter_store import filter_hash, key_from_json, key_to_json
+from figure_cache import filter_key
+
+# Version of the format of the bundles (changing it invalidates every bundle)
+BUNDLE_VERSION = 1
+
+# Default directory of the bundles and number of companies with a bundled state
+BUNDLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bundles')
+TOP_COMPANIES = 20
+
+
+def source_digest(paths):
+    """
+    This function returns a digest of the content of source files (hexadecimal string).
+    """
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def bundle_id(dataset_token, settings):
+    """
+    This function returns the identifier of the bundle of a dataset and of the settings of the figures.
+
+    It requires 2 inputs:
+    1. dataset_token : Fingerprint of the dataset (String).
+    2. settings : Settings the figures depend on, such as the level of detail of the map (Dictionary).
+
+    Output:
+    1. Identifier of the bundle, also the name of its directory (String).
+    """
+    payload = json.dumps([BUNDLE_VERSION, dataset_token, settings], sort_keys=True, ensure_ascii=False)
+    return f'v{BUNDLE_VERSION}-{dataset_token[:12]}-{hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]}'
+
+
+def common_filter_keys(df, top_companies=TOP_COMPANIES):
+    """
+    This function returns the canonical filter states bundled for a dataset.
+
+    It requires 1 input (plus 1 optional one):
+    1. df : Dataset of the dashboard, with Job, Location and Company columns (Pandas dataframe).
+    2. top_companies : Number of companies with the most vacancies to bundle (Integer).
+
+    Output:
+    1. List with the default state, then one state per job category, per location and per top company.
+    """
+    keys = [filter_key(None, None, None, None)]
+    for column in ('Job', 'Location', 'Company'):
+        codes, uniques = column_codes(df[column])
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        present = np.flatnonzero(counts)
+        if column == 'Company':
+            present = present[np.argsort(-counts[present], kind='stable')][:top_companies]
+        for code in present:
+            value = uniques[code]
+            selection = {'Job': (value, None, None), 'Location': (None, value, None), 'Company': (None, None, value)}[column]
+            keys.append(filter_key(*selection, None))
+    return keys
+
+
+class BundledFigure:
+    """
+    Figure (or component tree) read from a bundle, sent as is to the browser.
+
+    Dash and the partial updates (see figure_patch.py) only need its JSON, returned by
+    to_plotly_json like a Plotly figure, so the figure is not validated again when it is read.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def to_plotly_json(self):
+        return self.data
+
+
+class FigureBundle:
+    """
+    Bundle of precomputed figures opened by the dashboard, read lazily from its directory.
+
+    It requires 2 inputs:
+    1. directory : Directory of the bundle (String).
+    2. manifest : Manifest of the bundle (Dictionary).
+    """
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.dataset = manifest['dataset']
+        self.plots = set(manifest['plots'])
+        self.states = {state: key_from_json(key) for state, key in manifest['states'].items()}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.states) * len(self.plots)
+
+    def get(self, name, key, dataset_token):
+        """
+        This function returns the bundled figure of a plot for a filter state, or None if it is not bundled.
+
+        It requires 3 inputs:
+        1. name : Name of the plotting function (String).
+        2. key : Canonical filter state (Tuple).
+        3. dataset_token : Fingerprint of the dataset currently served (String).
+
+        Output:
+        1. BundledFigure, or None.
+        """
+        state = filter_hash(key)
+        if dataset_token != self.dataset or name not in self.plots or state not in self.states:
+            with self._lock:
+                self.misses += 1
+            return None
+        with open(os.path.join(self.directory, name, state + '.json'), encoding='utf-8') as file:
+            figure = BundledFigure(json.load(file))
+        with self._lock:
+            self.hits += 1
+        return figure
+
+    def keys(self):
+        """
+        This function returns the canonical filter states of the bundle (List of tuples).
+        """
+        return list(self.states.values())
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+
+def open_bundle(root, dataset_token, settings):
+    """
+    This function opens the bundle matching a dataset and the settings of the figures, if it was exported.
+
+    It requires 3 inputs:
+    1. root : Directory of the bundles (String).
+    2. dataset_token : Fingerprint of the dataset (String).
+    3. settings : Settings the figures depend on (Dictionary).
+
+    Output:
+    1. FigureBundle, or None if there is no such bundle.
+    """
+    directory = os.path.join(root, bundle_id(dataset_token, settings))
+    try:
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != BUNDLE_VERSION or manifest.get('dataset') != dataset_token:
+        return None
+    return FigureBundle(directory, manifest)
+
+
+def export_bundle(root, dataset_token, settings, plots, keys):
+    """
+    This function renders the figures of the given filter states and writes them as a bundle.
+
+    It requires 5 inputs:
+    1. root : Directory of the bundles (String).
+    2. dataset_token : Fingerprint of the dataset (String).
+    3. settings : Settings the figures depend on (Dictionary).
+    4. plots : Function returning the figure of a filter state, per plotting function name (Dictionary).
+    5. keys : Canonical filter states to render (List of tuples).
+
+    Output:
+    1. Directory of the bundle written (String).
+    """
+    name = bundle_id(dataset_token, settings)
+    directory = os.path.join(root, name)
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f'.{name}-', dir=root)
+
+    try:
+        states = {filter_hash(key): key_to_json(key) for key in keys}
+        for plot_name, plot in plots.items():
+            os.makedirs(os.path.join(staging, plot_name))
+            for state, key in states.items():
+                with open(os.path.join(staging, plot_name, state + '.json'), 'w', encoding='utf-8') as file:
+                    json.dump(plot(key_from_json(key)), file, cls=PlotlyJSONEncoder)
+
+        manifest = {'version': BUNDLE_VERSION, 'dataset': dataset_token, 'settings': settings,
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    'plots': sorted(plots), 'states': states}
+        with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=1)
+
+        # Replacement of a previous export of the same bundle, then publication of the new one
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.rename(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export of the figures of the common filter states of the dashboard.')
+    parser.add_argument('--dataset', help='CSV file or store of pipeline.py (DASHBOARD_DATASET by default)')
+    parser.add_argument('--snapshot', help='Directory of the snapshot of the CSV file (DASHBOARD_SNAPSHOT by default)')
+    parser.add_argument('--output', default=os.environ.get('DASHBOARD_BUNDLE_DIR', BUNDLE_DIR))
+    parser.add_argument('--top-companies', type=int, default=TOP_COMPANIES)
+    args = parser.parse_args()
+
+    # The bundles of another directory are not opened while exporting
+    os.environ['DASHBOARD_BUNDLE_DIR'] = ''
+    from wsgi import create_app, load_dashboard
+    create_app(args.dataset, args.snapshot, warm_up=False)
+    dashboard = load_dashboard()
+
+    start = time.perf_counter()
+    keys = common_filter_keys(dashboard.df, args.top_companies)
+    directory = export_bundle(args.output, dashboard.dataset_token, dashboard.figure_settings,
+                              dashboard.bundle_builders(), keys)
+    print(f'{len(keys)} filter states x {len(dashboard.bundled_plots)} plots exported to {directory} '
+          f'in {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
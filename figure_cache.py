@@ -0,0 +1,192 @@
+### FIGURE CACHE FOR THE DATA JOBS DASHBOARD
+
+"""
+Memoization of the dashboard figures keyed on a canonical form of the filter state.
+
+Each figure has its own bounded LRU cache with hit and miss counters. The caches are
+bound to a fingerprint of the dataset, so they are emptied automatically as soon as
+the figures are requested for a different dataset.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from filter_index import normalize_selection, SALARY_STEP
+
+
+def snap_salary_range(salary_range, step=SALARY_STEP):
+    """
+    This function snaps a salary range outwards to the step of the salary slider.
+
+    It requires 1 input (plus 1 optional one):
+    1. salary_range : Inclusive (low, high) salary range, or None (Tuple).
+    2. step : Step of the salary slider (Integer).
+
+    Output:
+    1. Snapped (low, high) range as integers, or None.
+    """
+    if salary_range is None:
+        return None
+    low, high = salary_range
+    return (int(math.floor(low / step) * step), int(math.ceil(high / step) * step))
+
+
+def filter_key(job, location, company, salary_range, step=SALARY_STEP):
+    """
+    This function returns the canonical form of a filter state of the dashboard.
+
+    Selections are sorted and deduplicated, any selection including 'All' collapses to None
+    and the salary range is snapped to the slider step, so equivalent states share a key.
+    """
+    return (normalize_selection(job), normalize_selection(location), normalize_selection(company),
+            snap_salary_range(salary_range, step))
+
+
+def dataset_fingerprint(df):
+    """
+    This function returns a content fingerprint of a dataframe (hexadecimal string).
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe dictionary with a bounded number of entries, evicting the least recently used one.
+
+    It requires 1 optional input:
+    1. maxsize : Maximum number of entries (Integer).
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+        """
+        This function returns the cached value for the key, without counting a lookup nor refreshing its recency.
+        """
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, function):
+        """
+        This function returns the cached value for the key, computing and storing it on a miss.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            # Computed outside of the lock, so a slow entry does not block the other ones
+            value = function()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._data), 'maxsize': self.maxsize}
+
+
+class FigureCache:
+    """
+    One LRU cache per dashboard figure, invalidated whenever the dataset fingerprint changes.
+
+    It requires 1 optional input:
+    1. maxsize : Maximum number of filter states cached per figure (Integer).
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.dataset_token = None
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def bind(self, dataset_token):
+        """
+        This function binds the caches to a dataset, emptying them if it is a different one.
+        """
+        with self._lock:
+            if dataset_token != self.dataset_token:
+                for cache in self._caches.values():
+                    cache.clear()
+                self.dataset_token = dataset_token
+
+    def cache(self, name):
+        with self._lock:
+            if name not in self._caches:
+                self._caches[name] = LRUCache(self.maxsize)
+            return self._caches[name]
+
+    def get_or_build(self, name, key, builder, dataset_token):
+        """
+        This function returns a figure from the cache, building it on a miss.
+
+        It requires 4 inputs:
+        1. name : Name of the figure, for instance, 'plot_pie_chart' (String).
+        2. key : Canonical filter state, as returned by filter_key (Tuple).
+        3. builder : Function without arguments building the figure (Callable).
+        4. dataset_token : Fingerprint of the dataset the figure is built from (String).
+
+        Output:
+        1. Plotly figure.
+        """
+        self.bind(dataset_token)
+
+        # The token is part of the key, so a figure built from a replaced dataset is never served
+        return self.cache(name).get_or_compute((dataset_token, key), builder)
+
+    def peek(self, name, key, dataset_token):
+        """
+        This function returns a figure if it is cached for the dataset, without building it (Plotly figure, or None).
+        """
+        with self._lock:
+            cache = self._caches.get(name) if dataset_token == self.dataset_token else None
+        return None if cache is None else cache.peek((dataset_token, key))
+
+    def clear(self):
+        with self._lock:
+            for cache in self._caches.values():
+                cache.clear()
+
+    def stats(self):
+        """
+        This function returns the hit, miss and eviction counters and the size of each figure cache.
+        """
+        with self._lock:
+            return {name: cache.stats() for name, cache in self._caches.items()}
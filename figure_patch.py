@@ -0,0 +1,127 @@
+### PARTIAL UPDATES OF THE DASHBOARD FIGURES
+
+"""
+Partial updates of the dashboard figures through the dash.Patch mechanism.
+
+After the first render of a plot, the browser already holds its layout (titles, axes,
+colorscales, transitions) and the structure of its traces, most of which are identical
+from one filter state to the next. Instead of sending the new figure, the callback
+compares it with the figure the browser holds and sends a Patch with only the properties
+that changed: the data arrays of each trace and the few layout properties that depend on
+the data. When the traces themselves change (for instance, a box plot with fewer jobs),
+the list of traces is sent whole, still without the layout.
+
+The bytes of the full figures and of the updates actually sent are counted per callback.
+"""
+
+import json
+import threading
+
+from dash import Patch, no_update
+from plotly.utils import PlotlyJSONEncoder
+
+
+def _json(value):
+    return json.dumps(value, cls=PlotlyJSONEncoder)
+
+
+def _dict_changes(old, new):
+    # Keys of a dictionary whose value changed (or was added), and keys that were removed
+    changed = [key for key in new if key not in old or _json(old[key]) != _json(new[key])]
+    removed = [key for key in old if key not in new]
+    return changed, removed
+
+
+def figure_patch(old_figure, new_figure):
+    """
+    This function returns the partial update turning a figure into another one.
+
+    The properties of each trace and of the layout are compared one by one (first level):
+    only the changed ones are assigned, and the removed ones deleted. If the number or the
+    types of the traces changed, the whole list of traces is assigned instead.
+
+    It requires 2 inputs:
+    1. old_figure : Figure held by the browser (Plotly figure).
+    2. new_figure : Figure to show (Plotly figure).
+
+    Output:
+    1. Patch with the changes, or None if both figures are identical (dash.Patch).
+    """
+    old, new = old_figure.to_plotly_json(), new_figure.to_plotly_json()
+    patch = Patch()
+    changes = 0
+
+    old_types = [trace.get('type') for trace in old['data']]
+    new_types = [trace.get('type') for trace in new['data']]
+    if old_types != new_types:
+        patch['data'] = new['data']
+        changes += 1
+    else:
+        for i, (old_trace, new_trace) in enumerate(zip(old['data'], new['data'])):
+            changed, removed = _dict_changes(old_trace, new_trace)
+            for key in changed:
+                patch['data'][i][key] = new_trace[key]
+            for key in removed:
+                del patch['data'][i][key]
+            changes += len(changed) + len(removed)
+
+    changed, removed = _dict_changes(old['layout'], new['layout'])
+    for key in changed:
+        patch['layout'][key] = new['layout'][key]
+    for key in removed:
+        del patch['layout'][key]
+    changes += len(changed) + len(removed)
+
+    return patch if changes else None
+
+
+def payload_bytes(value):
+    """
+    This function returns the size of the JSON sent to the browser for a figure or a Patch (Integer).
+    """
+    if value is no_update:
+        return 0
+    if isinstance(value, Patch):
+        value = value.to_plotly_json()
+    return len(_json(value).encode('utf-8'))
+
+
+class TransferStats:
+    """
+    Thread-safe counters of the figures sent by each callback: number of full figures, partial
+    updates and unchanged figures, and bytes of the full figures against the bytes actually sent.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, kind, full_bytes, sent_bytes):
+        """
+        This function records an update of a figure.
+
+        It requires 4 inputs:
+        1. name : Name of the callback or of the figure (String).
+        2. kind : 'full', 'patch' or 'unchanged' (String).
+        3. full_bytes : Size of the full figure (Integer).
+        4. sent_bytes : Size of what was actually sent (Integer).
+        """
+        with self._lock:
+            counters = self._counters.setdefault(name, {'full': 0, 'patch': 0, 'unchanged': 0,
+                                                        'full_bytes': 0, 'sent_bytes': 0})
+            counters[kind] += 1
+            counters['full_bytes'] += full_bytes
+            counters['sent_bytes'] += sent_bytes
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def stats(self):
+        """
+        This function returns the counters of each callback, with the share of the bytes saved.
+        """
+        with self._lock:
+            return {name: dict(counters, saved=1 - counters['sent_bytes'] / counters['full_bytes']
+                               if counters['full_bytes'] else 0.0)
+                    for name, counters in self._counters.items()}
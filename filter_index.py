@@ -0,0 +1,385 @@
+### FILTER INDEX FOR THE DATA JOBS DASHBOARD
+
+"""
+Inverted index over the categorical columns (Job, Location and Company) of the
+data jobs dataset, so the dashboard callbacks can filter the data without
+copying or scanning the whole dataframe on every interaction.
+
+Each distinct value of an indexed column is mapped to a sorted array of row
+positions (a posting list). A filter is then the union of the posting lists of
+the selected values, intersected across columns and with the salary range.
+
+The salary range is answered by a sorted index of the disclosed salaries: the row
+positions are kept in increasing order of salary, so the rows of a range are a
+slice found by two binary searches. Cumulative counts of the salaries per bin of
+the slider step, per Job and per Location, give the number of vacancies of each
+group in a range (and their histogram) without visiting the rows.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Value used by the dashboard dropdowns to select every observation
+ALL = 'All'
+
+# Columns indexed by default
+INDEX_COLUMNS = ('Job', 'Location', 'Company')
+
+# Columns with cumulative salary counts per bin in the salary index
+SALARY_COUNT_COLUMNS = ('Job', 'Location')
+
+# Step of the salary range slider of the dashboard, and width of the bins of the salary index
+SALARY_STEP = 1000
+
+
+def normalize_selection(selection):
+    """
+    This function normalizes the value of a dashboard dropdown.
+
+    Input:
+    1. selection : Value of the dropdown: None, a single value or a list of values.
+
+    Output:
+    1. None if the selection means 'All' (no filter on the column), or a sorted tuple
+       with the unique selected values otherwise.
+    """
+    if selection is None:
+        return None
+    if isinstance(selection, str):
+        selection = [selection]
+    if ALL in selection:
+        return None
+    return tuple(sorted(set(selection)))
+
+
+def column_codes(series):
+    """
+    This function returns the integer codes of a column and the dictionary of its values.
+
+    The codes of a categorical column are used as they are (with their narrow integer type),
+    so no value is hashed; any other column is factorized.
+
+    Input:
+    1. series : Column of the dataframe (Pandas series).
+
+    Output:
+    1. NumPy array with the code of each row (-1 for missing values).
+    2. Values of the codes, in increasing order of code (Pandas index).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, pd.Index(uniques)
+
+
+def _row_dtype(n_rows):
+    # 32-bit row ids halve the size of the posting lists for any realistic dataset
+    return np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+
+
+def intersect_sorted(rows, other):
+    """
+    This function returns the row positions present in two sorted arrays, with binary searches
+    of the positions of the first array (the shortest one) over the second.
+    """
+    if len(rows) == 0 or len(other) == 0:
+        return rows[:0]
+    position = np.searchsorted(other, rows)
+    position[position == len(other)] = 0
+    return rows[other[position] == rows]
+
+
+class SalaryIndex:
+    """
+    Sorted index of the disclosed salaries of the job data, with cumulative counts of the
+    salaries per bin of the slider step for the groups of the Job and Location columns.
+
+    The bins are [edge, edge + step) between the salaries rounded to the step, so the number
+    of vacancies of each group in a range whose bounds are multiples of the step (the snapped
+    ranges of the slider) is the difference of two cumulative counts. Missing salaries are
+    left out of the index, as they are out of any salary range.
+
+    It requires 1 input (plus 3 optional ones):
+    1. df : Dataframe with the job data (Pandas dataframe).
+    2. salary_column : Name of the salary column (String).
+    3. columns : Columns with cumulative counts per bin (Tuple of strings).
+    4. step : Width of the bins, the step of the salary slider (Integer).
+    """
+
+    def __init__(self, df, salary_column='Salary', columns=SALARY_COUNT_COLUMNS, step=SALARY_STEP):
+
+        self.step = step
+        self.columns = tuple(columns)
+        salary = df[salary_column].to_numpy(dtype=np.float64)
+
+        # Row positions of the disclosed salaries in increasing order of salary
+        disclosed = np.flatnonzero(~np.isnan(salary))
+        self.order = disclosed[np.argsort(salary[disclosed], kind='stable')].astype(_row_dtype(len(df)))
+        self.sorted_salary = salary[self.order]
+
+        # Edges of the bins, from the lowest salary rounded down to one step past the highest one rounded up
+        if len(self.order):
+            first = int(np.floor(self.sorted_salary[0] / step) * step)
+            last = int(np.ceil(self.sorted_salary[-1] / step) * step) + step
+        else:
+            first, last = 0, step
+        self.edges = np.arange(first, last + step, step, dtype=np.float64)
+
+        # Index of the first edge at or above each salary (salary <= edge from there on),
+        # and of the first edge above it (salary < edge from there on)
+        at_or_above = np.searchsorted(self.edges, self.sorted_salary, side='left')
+        above = np.searchsorted(self.edges, self.sorted_salary, side='right')
+
+        self._codes = {}
+        self._cumulative = {}
+        n_edges = len(self.edges)
+        for column in self.columns:
+            codes, labels = column_codes(df[column])
+            self._codes[column] = codes
+
+            # Salaries per (group, edge) with the codes shifted by one, so the missing groups fall into the first row
+            cells = (codes[self.order].astype(np.intp) + 1) * (n_edges + 1)
+            shape = (len(labels) + 1, n_edges + 1)
+            at_most = np.bincount(cells + at_or_above, minlength=shape[0] * shape[1]).reshape(shape)[1:, :n_edges]
+            below = np.bincount(cells + above, minlength=shape[0] * shape[1]).reshape(shape)[1:, :n_edges]
+            self._cumulative[column] = (np.cumsum(at_most, axis=1, dtype=np.int32),
+                                        np.cumsum(below, axis=1, dtype=np.int32), labels)
+
+    def bounds(self):
+        """
+        This function returns the lowest and the highest salaries rounded to the step, as the bounds of the slider (Tuple).
+        """
+        return int(self.edges[0]), int(self.edges[-2])
+
+    def marks(self, count=5):
+        """
+        This function returns the marks of the salary slider: both bounds and at most count round values between them.
+
+        Output:
+        1. Dictionary with the label of each marked salary ('$20,000').
+        """
+        low, high = self.bounds()
+
+        # Round interval between the marks: the step times 1, 2, 5, 10, 20, 50...
+        interval, factors = self.step, itertools.cycle((2, 2.5, 2))
+        while (high - low) / interval > count:
+            interval = int(interval * next(factors))
+
+        values = [value for value in range(-(-low // interval) * interval, high, interval)
+                  if value - low >= interval / 2 and high - value >= interval / 2]
+        return {value: f'${value:,}' for value in dict.fromkeys([low] + values + [high])}
+
+    def span(self, low, high):
+        """
+        This function returns the slice of the sorted index holding the salaries between low and high (inclusive).
+        """
+        return (int(np.searchsorted(self.sorted_salary, low, side='left')),
+                int(np.searchsorted(self.sorted_salary, high, side='right')))
+
+    def count(self, low, high):
+        """
+        This function returns the number of salaries between low and high (inclusive), with two binary searches.
+        """
+        start, stop = self.span(low, high)
+        return max(stop - start, 0)
+
+    def rows(self, low, high):
+        """
+        This function returns the sorted positions of the rows whose salary is between low and high (inclusive).
+        """
+        start, stop = self.span(low, high)
+        return np.sort(self.order[start:stop]) if stop > start else self.order[:0]
+
+    def _cumulative_count(self, cumulative, value, before, after):
+        # Cumulative count of each group at a salary: 'before' below the first edge, 'after' past the last one,
+        # and the column of the edge otherwise (None if the salary falls between two edges)
+        if value < self.edges[0]:
+            return before
+        if value > self.edges[-1]:
+            return after
+        position = (value - self.edges[0]) / self.step
+        return cumulative[:, int(position)] if position == int(position) else None
+
+    def range_counts(self, column, low, high):
+        """
+        This function returns the number of salaries of each group of a column between low and high (inclusive).
+
+        Bounds on the edges of the bins, or outside of them, are answered from the cumulative
+        counts; other bounds from the codes of the rows of the range.
+
+        It requires 3 inputs:
+        1. column : Column with cumulative counts, 'Job' or 'Location' (String).
+        2. low : Lowest salary of the range (Float).
+        3. high : Highest salary of the range (Float).
+
+        Output:
+        1. NumPy array with the count of each group, in the order of the codes of the column.
+        """
+        at_most, below, labels = self._cumulative[column]
+        none, total = np.zeros(len(labels), dtype=np.int32), at_most[:, -1]
+
+        if high < low:
+            return none.astype(np.int64)
+
+        # Salaries up to high (salary <= edge) minus salaries below low (salary < edge)
+        up_to_high = self._cumulative_count(at_most, high, none, total)
+        below_low = self._cumulative_count(below, low, none, total)
+        if up_to_high is None or below_low is None:
+            start, stop = self.span(low, high)
+            codes = self._codes[column][self.order[start:stop]].astype(np.intp)
+            return np.bincount(codes[codes >= 0], minlength=len(labels))
+        return (up_to_high - below_low).astype(np.int64)
+
+    def histogram(self, column, low=None, high=None):
+        """
+        This function returns the number of salaries of each group of a column per bin of the index.
+
+        It requires 1 input (plus 2 optional ones):
+        1. column : Column with cumulative counts, 'Job' or 'Location' (String).
+        2. low : Lowest edge of the returned bins (Float).
+        3. high : Highest edge of the returned bins (Float).
+
+        Output:
+        1. Pandas dataframe with one row per group and one column per bin [edge, edge + step),
+           labelled by its lower edge, for the bins starting between low and high.
+        """
+        _, below, labels = self._cumulative[column]
+        counts = np.diff(below, axis=1)
+        edges = self.edges[:-1]
+
+        selected = np.ones(len(edges), dtype=bool)
+        if low is not None:
+            selected &= edges >= low
+        if high is not None:
+            selected &= edges <= high
+        return pd.DataFrame(counts[:, selected], index=pd.Index(labels, name=column), columns=edges[selected].astype(int))
+
+
+class FilterIndex:
+    """
+    Inverted index mapping each value of the Job, Location and Company columns to the
+    sorted positions of the rows holding that value.
+
+    It requires 1 input (plus 2 optional ones):
+    1. df : Dataframe with the job data (Pandas dataframe).
+    2. columns : Columns to index (Tuple of strings).
+    3. salary_column : Name of the salary column used by the range filter (String).
+    """
+
+    def __init__(self, df, columns=INDEX_COLUMNS, salary_column='Salary'):
+
+        self.n_rows = len(df)
+        self.columns = tuple(columns)
+        self._dtype = _row_dtype(self.n_rows)
+        self._postings = {}
+
+        for column in self.columns:
+            codes, uniques = column_codes(df[column])
+
+            # Row positions grouped by value; a stable sort keeps them ascending inside each group
+            order = np.argsort(codes, kind='stable').astype(self._dtype)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            n_missing = self.n_rows - int(counts.sum())
+            offsets = np.concatenate(([0], np.cumsum(counts))) + n_missing
+
+            lookup = {value: i for i, value in enumerate(uniques)}
+            self._postings[column] = (lookup, offsets, order)
+
+        self.salary = df[salary_column].to_numpy(dtype=np.float64)
+        self.salary_index = SalaryIndex(df, salary_column=salary_column,
+                                        columns=[column for column in SALARY_COUNT_COLUMNS if column in self.columns])
+
+    def postings(self, column, values):
+        """
+        This function returns the sorted positions of the rows whose column holds any of the values.
+
+        It requires 2 inputs:
+        1. column : Name of the indexed column (String).
+        2. values : Values to look up (Iterable).
+
+        Output:
+        1. Sorted NumPy array with the row positions.
+        """
+        lookup, offsets, order = self._postings[column]
+        slices = [order[offsets[lookup[value]]:offsets[lookup[value] + 1]] for value in values if value in lookup]
+
+        if not slices:
+            return np.empty(0, dtype=self._dtype)
+        if len(slices) == 1:
+            return slices[0]
+
+        # Posting lists of different values are disjoint, so a sort is enough to merge them
+        return np.sort(np.concatenate(slices))
+
+    def count(self, column, value):
+        """
+        This function returns the number of rows holding a value in an indexed column.
+        """
+        lookup, offsets, _ = self._postings[column]
+        if value not in lookup:
+            return 0
+        return int(offsets[lookup[value] + 1] - offsets[lookup[value]])
+
+    def query(self, job=None, location=None, company=None, salary_range=None):
+        """
+        This function returns the positions of the rows matching the dashboard filters.
+
+        It requires 4 inputs:
+        1. job : Selected jobs, as received from the dropdown (None, String or list of strings).
+        2. location : Selected locations, as received from the dropdown (None, String or list of strings).
+        3. company : Selected companies, as received from the dropdown (None, String or list of strings).
+        4. salary_range : Inclusive (low, high) salary range, or None for no salary filter (Tuple).
+
+        Output:
+        1. Sorted NumPy array with the matching row positions, or None if no filter applies.
+        """
+        selections = {'Job': job, 'Location': location, 'Company': company}
+
+        postings = []
+        for column, selection in selections.items():
+            values = normalize_selection(selection)
+            if values is not None:
+                postings.append(self.postings(column, values))
+
+        if not postings and salary_range is None:
+            return None
+
+        rows = None
+        if postings:
+            # Intersection starting from the shortest posting list: binary searches
+            # of the surviving candidates over each longer list
+            postings.sort(key=len)
+            rows = postings[0]
+            for other in postings[1:]:
+                if len(rows) == 0:
+                    break
+                rows = intersect_sorted(rows, other)
+
+        if salary_range is not None:
+            low, high = salary_range
+            if rows is None:
+                # Salary range alone: a slice of the sorted salaries, found by two binary searches
+                rows = self.salary_index.rows(low, high)
+            elif self.salary_index.count(low, high) * 32 < len(rows):
+                # Salary range much narrower than the categorical filters: intersection of both sorted row sets
+                # (binary searches of the few rows of the range, cheaper than reading the salaries of every row)
+                rows = intersect_sorted(self.salary_index.rows(low, high), rows)
+            else:
+                salary = self.salary[rows]
+                rows = rows[(salary >= low) & (salary <= high)]
+
+        return rows
+
+    def select(self, df, job=None, location=None, company=None, salary_range=None):
+        """
+        This function returns the rows of the dataframe matching the dashboard filters.
+
+        When no filter applies, the dataframe itself is returned instead of a copy. Otherwise,
+        only the matching rows are gathered.
+        """
+        rows = self.query(job=job, location=location, company=company, salary_range=salary_range)
+        if rows is None:
+            return df
+        return df.take(rows)
@@ -0,0 +1,126 @@
+### SERVER-SIDE STORE OF THE FILTERED DATA
+
+"""
+Server-side store of the row sets matching the dashboard filters, keyed by a hash of the
+canonical filter state.
+
+The filter callback computes the row set once and publishes only the small hash (and
+the filter state itself) to the browser through a dcc.Store. Each figure callback then
+retrieves the shared row set from this store, rebuilding it from the filter state if it
+was evicted or computed by another server process. The group-by aggregates of a row set
+(see aggregates.py) are stored as well, so the plots drawn from them share a single pass
+over the rows; for a salary range alone, the vacancies per Job and per Location are read
+from the cumulative counts of the salary index instead. When the dataset is reloaded, the
+aggregates of the common filter states are refreshed from those of the previous version
+and seeded into the store of the new one (see dataset_reload.py).
+"""
+
+import hashlib
+import json
+
+from aggregates import GroupAggregates
+from figure_cache import LRUCache
+
+
+def filter_hash(key, dataset_token=''):
+    """
+    This function returns a short hash identifying a canonical filter state of a dataset.
+
+    It requires 1 input (plus 1 optional one):
+    1. key : Canonical filter state, as returned by figure_cache.filter_key (Tuple).
+    2. dataset_token : Fingerprint of the dataset (String).
+
+    Output:
+    1. Hexadecimal hash (String).
+    """
+    payload = json.dumps([dataset_token, key_to_json(key)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def key_to_json(key):
+    """
+    This function converts a canonical filter state into a JSON-serializable list.
+    """
+    return [list(part) if part is not None else None for part in key]
+
+
+def key_from_json(data):
+    """
+    This function converts a filter state received from the browser back into its canonical form.
+    """
+    return tuple(tuple(part) if part is not None else None for part in data)
+
+
+class FilterStore:
+    """
+    LRU store of the row positions matching each filter state, and of their aggregates.
+
+    It requires 1 input (plus 1 optional one):
+    1. index : Inverted index of the dataset (FilterIndex).
+    2. maxsize : Maximum number of row sets kept in memory (Integer).
+    """
+
+    def __init__(self, index, maxsize=64):
+        self.index = index
+        self._rows = LRUCache(maxsize)
+        self._aggregates = LRUCache(maxsize)
+
+    def put(self, key, dataset_token=''):
+        """
+        This function computes and stores the row set of a filter state, and returns its hash.
+        """
+        key_hash = filter_hash(key, dataset_token)
+        self._rows.get_or_compute(key_hash, lambda: self._query(key))
+        return key_hash
+
+    def rows(self, key_hash, key):
+        """
+        This function returns the row positions of a filter state (None means every row).
+        """
+        return self._rows.get_or_compute(key_hash, lambda: self._query(key))
+
+    def select(self, df, key_hash, key):
+        """
+        This function returns the rows of the dataframe matching a stored filter state.
+        """
+        rows = self.rows(key_hash, key)
+        if rows is None:
+            return df
+        return df.take(rows)
+
+    def aggregates(self, df, key_hash, key):
+        """
+        This function returns the group-by aggregates of the rows matching a stored filter state.
+        """
+        return self._aggregates.get_or_compute(key_hash, lambda: GroupAggregates(df, self.rows(key_hash, key),
+                                                                                vacancy_counts=self._range_counts(key)))
+
+    def stored_aggregates(self, key, dataset_token=''):
+        """
+        This function returns the aggregates already computed for a filter state of a dataset, or None.
+        """
+        return self._aggregates.get(filter_hash(key, dataset_token))
+
+    def seed_aggregates(self, key, dataset_token, aggregates):
+        """
+        This function stores the aggregates of a filter state computed elsewhere (for instance, refreshed from those
+        of the previous version of the dataset, see aggregates.py) and returns the hash of the filter state.
+        """
+        key_hash = filter_hash(key, dataset_token)
+        self._aggregates.put(key_hash, aggregates)
+        return key_hash
+
+    def stats(self):
+        return self._rows.stats()
+
+    def _range_counts(self, key):
+        # Vacancies per Job and per Location of a salary range without categorical filters, from the salary index
+        job, location, company, salary_range = key
+        if salary_range is None or (job, location, company) != (None, None, None):
+            return None
+        salary_index = self.index.salary_index
+        return {column: salary_index.range_counts(column, *salary_range) for column in salary_index.columns}
+
+    def _query(self, key):
+        job, location, company, salary_range = key
+        return self.index.query(job=job, location=location, company=company, salary_range=salary_range)
@@ -0,0 +1,217 @@
+### GEOMETRY OF THE MEXICAN STATES
+
+"""
+Local geometry of the 32 Mexican states for the choropleth map of the dashboard.
+
+The boundaries are bundled in 'Mexico_States.geojson' (features keyed by the state IDs
+used by the dashboard, e.g., 'DF' for Ciudad de México), so the map does not depend on
+any external resource. They come from the 'mexico' example dataset of the PySAL library
+(BSD 3-Clause license), used in Rey and Sastré-Gutiérrez (2010), "Interregional
+inequality dynamics in Mexico", Spatial Economic Analysis, 5: 277-298.
+
+The geometry can be simplified at several levels of detail. The simplification preserves
+the topology: the boundaries are split into arcs at the points where neighbouring states
+meet, and each arc is simplified once with the Douglas-Peucker algorithm, so shared
+borders remain identical for both states and no gaps or overlaps appear between them.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Path of the bundled geometry
+GEOJSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Mexico_States.geojson')
+
+# Simplification tolerance (in degrees) of each level of detail
+SIMPLIFICATION_LEVELS = {'full': 0.0,
+                         'high': 0.03,
+                         'medium': 0.06,
+                         'low': 0.15}
+
+DEFAULT_LEVEL = 'medium'
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    return geometry['coordinates']
+
+
+def _douglas_peucker(points, tolerance):
+    """
+    This function returns the indices of the points kept by the Douglas-Peucker algorithm.
+
+    It requires 2 inputs:
+    1. points : Coordinates of an open line, whose first and last points are always kept (NumPy array).
+    2. tolerance : Maximum distance between the line and its simplification (Float).
+
+    Output:
+    1. Sorted NumPy array with the indices of the kept points.
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        start, end = points[first], points[last]
+        segment = points[first + 1:last]
+        direction = end - start
+        length = np.hypot(direction[0], direction[1])
+
+        # Perpendicular distance to the chord (or distance to its start if the chord is a point)
+        if length == 0:
+            distances = np.hypot(segment[:, 0] - start[0], segment[:, 1] - start[1])
+        else:
+            distances = np.abs(direction[0] * (segment[:, 1] - start[1]) - direction[1] * (segment[:, 0] - start[0])) / length
+
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return np.flatnonzero(keep)
+
+
+def simplify_geojson(geojson, tolerance):
+    """
+    This function simplifies the polygons of a GeoJSON feature collection preserving their topology.
+
+    It requires 2 inputs:
+    1. geojson : Feature collection of Polygon and MultiPolygon features (Dictionary).
+    2. tolerance : Simplification tolerance in degrees; 0 keeps the original geometry (Float).
+
+    Output:
+    1. New feature collection with the simplified geometry (Dictionary).
+    """
+    if tolerance <= 0:
+        return json.loads(json.dumps(geojson))
+
+    # Open rings (without the closing point) of every polygon of every feature
+    rings = []
+    for feature in geojson['features']:
+        for polygon in _polygons(feature['geometry']):
+            for ring in polygon:
+                rings.append([tuple(point) for point in ring[:-1]])
+
+    # Rings passing through each point
+    point_rings = {}
+    for ring_id, ring in enumerate(rings):
+        for point in ring:
+            point_rings.setdefault(point, set()).add(ring_id)
+
+    simplified_arcs = {}
+
+    def simplify_arc(arc):
+        # Shared arcs are traversed in opposite directions by neighbouring states, so they are
+        # simplified in a canonical direction and only once
+        reverse = arc[::-1] < arc
+        key = tuple(arc[::-1]) if reverse else tuple(arc)
+        if key not in simplified_arcs:
+            points = np.array(key, dtype=np.float64)
+            simplified_arcs[key] = [key[i] for i in _douglas_peucker(points, tolerance)]
+        result = simplified_arcs[key]
+        return result[::-1] if reverse else result
+
+    simplified_rings = []
+    for ring in rings:
+        n = len(ring)
+        owners = [point_rings[point] for point in ring]
+
+        # Junctions: points where the set of rings sharing the boundary changes
+        junctions = [i for i in range(n)
+                     if len(owners[i]) > 1 and (owners[i] != owners[i - 1] or owners[i] != owners[(i + 1) % n])]
+
+        if not junctions:
+            # Isolated ring (e.g., an island): split it at its first point and the farthest one from it
+            points = np.array(ring, dtype=np.float64)
+            farthest = int(np.argmax(np.hypot(points[:, 0] - points[0, 0], points[:, 1] - points[0, 1])))
+            junctions = sorted({0, farthest})
+
+        simplified = []
+        for position, start in enumerate(junctions):
+            end = junctions[(position + 1) % len(junctions)]
+            arc = ring[start:end + 1] if end > start else ring[start:] + ring[:end + 1]
+            simplified.extend(simplify_arc(arc)[:-1])
+
+        simplified_rings.append(simplified)
+
+    # Reassembly of the features, dropping small islands collapsed by the simplification
+    result = {key: value for key, value in geojson.items() if key != 'features'}
+    result['features'] = []
+    ring_id = 0
+
+    for feature in geojson['features']:
+        polygons = []
+        for polygon in _polygons(feature['geometry']):
+            new_polygon = []
+            for position, ring in enumerate(polygon):
+                points = simplified_rings[ring_id]
+                ring_id += 1
+                if len(set(points)) >= 3:
+                    new_polygon.append([list(point) for point in points] + [list(points[0])])
+                elif position == 0:
+                    break
+            if new_polygon:
+                polygons.append(new_polygon)
+
+        if not polygons:
+            # A whole feature never vanishes: its original geometry is kept instead
+            polygons = _polygons(feature['geometry'])
+
+        geometry = {'type': 'Polygon', 'coordinates': polygons[0]} if len(polygons) == 1 \
+            else {'type': 'MultiPolygon', 'coordinates': polygons}
+        new_feature = {key: value for key, value in feature.items() if key != 'geometry'}
+        new_feature['geometry'] = geometry
+        result['features'].append(new_feature)
+
+    return result
+
+
+def count_points(geojson):
+    """
+    This function returns the number of vertices of a GeoJSON feature collection.
+    """
+    return sum(len(ring) for feature in geojson['features']
+               for polygon in _polygons(feature['geometry']) for ring in polygon)
+
+
+@lru_cache(maxsize=None)
+def _read_geojson(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+@lru_cache(maxsize=None)
+def load_states_geojson(level=DEFAULT_LEVEL, path=GEOJSON_PATH):
+    """
+    This function returns the geometry of the Mexican states at a level of detail.
+
+    The file is read and parsed once, and each level is simplified once and then reused.
+
+    It requires 2 optional inputs:
+    1. level : Level of detail, one of SIMPLIFICATION_LEVELS, or a tolerance in degrees (String or Float).
+    2. path : Path of the GeoJSON file (String).
+
+    Output:
+    1. GeoJSON feature collection with one feature per state, keyed by the state ID (Dictionary).
+    """
+    if isinstance(level, str):
+        if level not in SIMPLIFICATION_LEVELS:
+            raise ValueError(f"Unknown level of detail '{level}', expected one of: {', '.join(SIMPLIFICATION_LEVELS)}")
+        tolerance = SIMPLIFICATION_LEVELS[level]
+    else:
+        tolerance = float(level)
+
+    return simplify_geojson(_read_geojson(path), tolerance)
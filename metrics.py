@@ -0,0 +1,289 @@
+### METRICS AND PROFILING OF THE DASHBOARD
+
+"""
+Instrumentation of the hot path of the dashboard callbacks: timing spans around each stage
+(filtering, selection of the rows or aggregates, each plotting function, partial updates and
+serialization of the figures), histograms of the latency of the callbacks and of the size of
+their payloads, and counters collected from the caches when the metrics are scraped. The
+metrics are rendered in the Prometheus text format (version 0.0.4), without depending on a
+Prometheus client library.
+
+An opt-in sampling profiler records where the callbacks spend their time: while a callback
+runs, a background thread samples its stack every few milliseconds, and the samples of each
+call are written to a file in the collapsed-stack format read by flame graph tools
+(flamegraph.pl, speedscope, ...), one line per distinct stack with its number of samples.
+The sampling thread is started by the first profiled call of each process, since the threads
+of the master process of a pre-forking server do not survive the fork of its workers.
+
+When the metrics are disabled, the spans are shared no-op context managers; when the
+profiler is off, profiling a callback is a single attribute check.
+"""
+
+import bisect
+import contextlib
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+
+# Buckets of the histograms of durations (seconds) and of payload sizes (bytes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Interval between two samples of the profiler (seconds)
+SAMPLING_INTERVAL = 0.005
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with cumulative buckets, per combination of label values.
+
+    It requires 3 inputs (plus 1 optional one):
+    1. name : Name of the metric (String).
+    2. documentation : Description of the metric (String).
+    3. labelnames : Names of the labels (Tuple of strings).
+    4. buckets : Upper bounds of the buckets, in increasing order (Tuple of floats).
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        """
+        This function records an observation for the given label values (in the order of labelnames).
+        """
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        """
+        This function returns the count and the sum of the observations per combination of label values.
+        """
+        with self._lock:
+            return {labelvalues: {'count': series[2], 'sum': series[1]} for labelvalues, series in self._series.items()}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labelvalues, [list(counts), total, count])
+                            for labelvalues, (counts, total, count) in self._series.items())
+        for labelvalues, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, [('le', _number(bound))])} {cumulative}")
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labelvalues)} {count}')
+        return lines
+
+
+class Registry:
+    """
+    Histograms and collectors of the metrics exposed by the dashboard.
+
+    A collector is a function called when the metrics are rendered, returning a list of
+    (name, type, documentation, labelnames, samples) tuples, where samples is a list of
+    (label values, value) pairs; it exposes the counters kept by other objects, such as the
+    hits and misses of the caches, without updating them on the hot path.
+    """
+
+    def __init__(self):
+        self._histograms = []
+        self._collectors = []
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def collector(self, function):
+        self._collectors.append(function)
+        return function
+
+    def render(self):
+        """
+        This function returns every metric in the Prometheus text format (String).
+        """
+        lines = []
+        for histogram in self._histograms:
+            lines += histogram.render()
+        for collector in self._collectors:
+            for name, kind, documentation, labelnames, samples in collector():
+                lines += [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+                lines += [f'{name}{_labels(labelnames, labelvalues)} {_number(value)}' for labelvalues, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+class _Span:
+    __slots__ = ('histogram', 'labelvalues', 'start')
+
+    def __init__(self, histogram, labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+        return False
+
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def span(histogram, *labelvalues, enabled=True):
+    """
+    This function returns a context manager recording the duration of its block into a histogram.
+
+    It requires 1 input (plus the label values of the histogram and 1 optional input):
+    1. histogram : Histogram of the durations (Histogram).
+    2. labelvalues : Values of the labels of the histogram, for instance, the name of the stage (Strings).
+    3. enabled : Whether to record the duration; otherwise, a shared no-op context manager is returned (Boolean).
+    """
+    return _Span(histogram, labelvalues) if enabled else _NULL_SPAN
+
+
+# Profilers of the process, whose state is reset in a forked child
+_profilers = weakref.WeakSet()
+
+
+def _reset_profilers():
+    for profiler in _profilers:
+        profiler._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_profilers)
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler of the threads running the callbacks, writing one collapsed-stack file per call.
+
+    It requires 1 input (plus 1 optional one):
+    1. directory : Directory of the profiles; None leaves the profiler disabled (String).
+    2. interval : Interval between two samples (Float, seconds).
+    """
+
+    def __init__(self, directory=None, interval=SAMPLING_INTERVAL):
+        self.interval = interval
+        self.directory = None
+        self._sequence = 0
+        self._reset()
+        _profilers.add(self)
+        if directory:
+            self.enable(directory)
+
+    def _reset(self):
+        # Fresh state in a forked child: the sampling thread of the parent is gone, and it may have held the lock
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def enable(self, directory):
+        """
+        This function starts writing the profiles of the callbacks into a directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        with self._lock:
+            self._start_sampling()
+
+    def _start_sampling(self):
+        # Called with the lock held: starts the sampling thread of this process if it is not running
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def disable(self):
+        self.directory = None
+
+    def _sample(self):
+        # Background thread: one sample of the stack of every thread running a profiled callback
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if self.directory is None and not self._active:
+                    self._thread = None
+                    return
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, samples in active.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                if stack:
+                    samples[';'.join(reversed(stack))] += 1
+
+    @contextlib.contextmanager
+    def _profile(self, name):
+        thread_id = threading.get_ident()
+        samples = Counter()
+        with self._lock:
+            self._start_sampling()
+            self._active[thread_id] = samples
+            self._sequence += 1
+            sequence = self._sequence
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._active.pop(thread_id, None)
+            directory = self.directory
+            if directory is not None and samples:
+                path = os.path.join(directory, f'{name}-{os.getpid()}-{sequence:06d}-{elapsed * 1000:.0f}ms.folded')
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.writelines(f'{stack} {count}\n' for stack, count in samples.most_common())
+
+    def profile(self, name):
+        """
+        This function returns a context manager profiling its block, written as a collapsed-stack file named after the callback.
+        """
+        if self.directory is None:
+            return _NULL_SPAN
+        return self._profile(name)
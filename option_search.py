@@ -0,0 +1,171 @@
+### SEARCH OF THE OPTIONS OF THE DASHBOARD DROPDOWNS
+
+"""
+Server-side search of the options of the dashboard dropdowns with many values, such as the
+companies, so the layout no longer embeds every value and the browser no longer filters
+tens of thousands of options on each keystroke.
+
+The values of a column are ranked once, at load, by their number of vacancies (the length
+of their posting lists), and identified by their rank. The index maps the first one and two
+characters of every word to the ranks of the values holding such a word, and every trigram
+(three consecutive characters) to the ranks of the values containing it, all in increasing
+order of rank. A query of one or two characters matches the values containing it, scanned
+in decreasing order of vacancies, along with the values with a word starting with it found
+anywhere in the ranking through the prefixes; a longer query matches the values containing
+it, found by intersecting the posting lists of its trigrams. Since the candidates come in
+decreasing order of vacancies, the search stops as soon as enough of them are verified, or
+when its time budget runs out.
+
+The text is compared case-insensitively and without accents ('mexico' matches 'México').
+"""
+
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from filter_index import column_codes
+
+# Number of options returned by a search
+MAX_OPTIONS = 50
+
+# Time budget of a search (seconds)
+SEARCH_BUDGET = 0.01
+
+
+def normalize_text(text):
+    """
+    This function returns a text in lower case, without accents and with single spaces (String).
+    """
+    text = str(text).casefold()
+    if not text.isascii():
+        decomposed = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(text.split())
+
+
+def _intersect(postings):
+    # Intersection of sorted posting lists, starting from the shortest one
+    postings = sorted(postings, key=len)
+    ranks = postings[0]
+    for other in postings[1:]:
+        if len(ranks) == 0:
+            break
+        position = np.searchsorted(other, ranks)
+        position[position == len(other)] = 0
+        ranks = ranks[other[position] == ranks] if len(other) else other
+    return ranks
+
+
+def _posting_lists(keys, ranks, dtype):
+    # Ranks grouped by key; the pairs come in increasing order of rank, which a stable sort keeps
+    codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+    ranks = np.asarray(ranks, dtype=dtype)[np.argsort(codes, kind='stable')]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques)))))
+    return {key: ranks[offsets[i]:offsets[i + 1]] for i, key in enumerate(uniques)}
+
+
+class OptionIndex:
+    """
+    Prefix and trigram index over the values of a column, ranked by their number of vacancies.
+
+    It requires 2 inputs:
+    1. values : Distinct values of the column (Iterable of strings).
+    2. counts : Number of vacancies of each value (Iterable of integers).
+    """
+
+    def __init__(self, values, counts):
+        values = np.asarray(list(values), dtype=object)
+        counts = np.asarray(counts, dtype=np.int64)
+
+        # Rank of the values: decreasing number of vacancies, then alphabetical order
+        order = np.lexsort((values, -counts))
+        self.values = values[order]
+        self.counts = counts[order]
+        self._texts = [normalize_text(value) for value in self.values]
+
+        # (key, rank) pairs of the prefixes of the words and of the trigrams of each value
+        prefix_keys, prefix_ranks, trigram_keys, trigram_ranks = [], [], [], []
+        for rank, text in enumerate(self._texts):
+            prefixes = {word[:length] for word in text.split() for length in (1, 2) if len(word) >= length}
+            prefix_keys.extend(prefixes)
+            prefix_ranks.extend([rank] * len(prefixes))
+            trigrams = {text[start:start + 3] for start in range(len(text) - 2)}
+            trigram_keys.extend(trigrams)
+            trigram_ranks.extend([rank] * len(trigrams))
+
+        dtype = np.int32 if len(self.values) < np.iinfo(np.int32).max else np.int64
+        self._prefixes = _posting_lists(prefix_keys, prefix_ranks, dtype)
+        self._trigrams = _posting_lists(trigram_keys, trigram_ranks, dtype)
+
+    def __len__(self):
+        return len(self.values)
+
+    def top(self, limit=MAX_OPTIONS):
+        """
+        This function returns the values with the most vacancies (List of strings).
+        """
+        return self.values[:limit].tolist()
+
+    def search(self, query, limit=MAX_OPTIONS, budget=SEARCH_BUDGET):
+        """
+        This function returns the values matching a query, in decreasing order of vacancies.
+
+        It requires 1 input (plus 2 optional ones):
+        1. query : Text typed in the dropdown (String).
+        2. limit : Maximum number of values to return (Integer).
+        3. budget : Time after which the search returns the values verified so far (Float, seconds).
+
+        Output:
+        1. List with the matching values (every value if the query is empty, up to the limit).
+        """
+        deadline = time.perf_counter() + budget
+        query = normalize_text(query or '')
+        if not query:
+            return self.top(limit)
+
+        if len(query) < 3:
+            # Values containing the query, scanned within the time budget, completed by the values with a word starting
+            # with it beyond the scanned ones
+            matches = []
+            for rank, text in enumerate(self._texts):
+                if query in text:
+                    matches.append(rank)
+                    if len(matches) == limit:
+                        break
+                if rank % 256 == 255 and time.perf_counter() > deadline:
+                    break
+            ranks = np.union1d(np.asarray(matches, dtype=np.int64), self._prefixes.get(query, ())[:limit])[:limit]
+            return self.values[ranks.astype(np.intp)].tolist()
+
+        postings = [self._trigrams.get(query[start:start + 3]) for start in range(len(query) - 2)]
+        if any(posting is None for posting in postings):
+            return []
+
+        # Candidates hold every trigram of the query, but not necessarily the query itself
+        matches = []
+        for position, rank in enumerate(_intersect(postings)):
+            if query in self._texts[rank]:
+                matches.append(self.values[rank])
+                if len(matches) == limit:
+                    break
+            if position % 256 == 255 and time.perf_counter() > deadline:
+                break
+        return matches
+
+
+def build_option_index(series):
+    """
+    This function returns the option index of a column of the dataset, with the values present in it.
+
+    Input:
+    1. series : Column of the dataframe, such as df['Company'] (Pandas series).
+
+    Output:
+    1. OptionIndex of the column.
+    """
+    codes, uniques = column_codes(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    present = counts > 0
+    return OptionIndex(uniques[present], counts[present])
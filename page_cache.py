@@ -0,0 +1,176 @@
+### ON-DISK CACHE OF THE SCRAPED PAGES
+
+"""
+Content-addressed cache of the raw result pages of the OCC website, keyed by url and
+crawl date, so the vacancies can be extracted again (for instance, with new class
+identifiers, which the OCC website changes often) without crawling the website again.
+
+Layout of the directory:
+- objects/ab/<sha256>.html.gz: source of a page, compressed, named after the hash of its
+  content, so a page unchanged from one crawl to the next is stored only once, and
+- index/date=YYYY-MM-DD.jsonl: one line per fetched page of a crawl date, with its url,
+  the hash of its content and the time it was fetched (a later line of the same url
+  replaces an earlier one).
+
+The objects are written into a temporary file renamed once complete, and the lines of the
+index are appended only after their object, so a crash never leaves an entry without its
+page. A time to live bounds the age of the pages served by the cache: older pages are
+fetched again, and pages of another crawl date are never served for the current one.
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def _as_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+def _write_atomic(path, content):
+    # Writes a file through a temporary file renamed once complete
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(prefix='.object-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class PageCache:
+    """
+    Cache of the raw pages of the crawls, keyed by url and crawl date.
+
+    It requires 1 input (plus 2 optional ones):
+    1. directory : Directory of the cache, created if needed (String).
+    2. ttl : Maximum age of the pages served by the cache, in seconds; None for no limit (Float).
+    3. crawl_date : Crawl date of the pages read and written by default; today if None (String or date).
+    """
+
+    def __init__(self, directory, ttl=None, crawl_date=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.crawl_date = _as_date(crawl_date or datetime.date.today())
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'index'), exist_ok=True)
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored_bytes = 0
+
+    def _index_path(self, date):
+        return os.path.join(self.directory, 'index', f'date={date.isoformat()}.jsonl')
+
+    def object_path(self, digest):
+        """
+        This function returns the path of the compressed source of a page, from the hash of its content.
+        """
+        return os.path.join(self.directory, 'objects', digest[:2], digest + '.html.gz')
+
+    def entries(self, crawl_date=None):
+        """
+        This function returns the latest entry of each url fetched on a crawl date.
+
+        Output:
+        1. Dictionary with the hash of the content and the fetch time (seconds since the epoch) of each url.
+        """
+        date = _as_date(crawl_date or self.crawl_date)
+        with self._lock:
+            if date not in self._entries:
+                entries = {}
+                if os.path.exists(self._index_path(date)):
+                    with open(self._index_path(date), encoding='utf-8') as file:
+                        for line in file:
+                            # A line cut by a crash is ignored
+                            try:
+                                entry = json.loads(line)
+                            except ValueError:
+                                continue
+                            entries[entry['url']] = (entry['digest'], entry['fetched'])
+                self._entries[date] = entries
+            return self._entries[date]
+
+    def dates(self):
+        """
+        This function returns the crawl dates with pages in the cache, in increasing order.
+        """
+        names = os.listdir(os.path.join(self.directory, 'index'))
+        return sorted(_as_date(name[5:-6]) for name in names if name.startswith('date=') and name.endswith('.jsonl'))
+
+    def lookup(self, url, crawl_date=None):
+        """
+        This function returns the hash of the content of a cached page, or None if it is not cached or is too old.
+        """
+        entry = self.entries(crawl_date).get(url)
+        if entry is None or (self.ttl is not None and time.time() - entry[1] > self.ttl):
+            return None
+        return entry[0]
+
+    def read(self, digest):
+        """
+        This function returns the source of a page from the hash of its content (String).
+        """
+        with gzip.open(self.object_path(digest), 'rt', encoding='utf-8') as file:
+            return file.read()
+
+    def get(self, url, crawl_date=None):
+        """
+        This function returns the source of a cached page, or None if it is not cached or is too old.
+        """
+        digest = self.lookup(url, crawl_date)
+        with self._lock:
+            if digest is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return self.read(digest) if digest is not None else None
+
+    def put(self, url, html, crawl_date=None):
+        """
+        This function stores the source of a fetched page and returns the hash of its content.
+
+        It requires 2 inputs (plus 1 optional one):
+        1. url : Url of the page (String).
+        2. html : Source of the page (String).
+        3. crawl_date : Crawl date of the page; the default crawl date of the cache if None (String or date).
+
+        Output:
+        1. Hexadecimal SHA-256 hash of the source of the page (String).
+        """
+        date = _as_date(crawl_date or self.crawl_date)
+        content = html.encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            # mtime=0 keeps the compressed files identical for identical pages
+            compressed = gzip.compress(content, compresslevel=6, mtime=0)
+            _write_atomic(path, compressed)
+            with self._lock:
+                self.stored_bytes += len(compressed)
+
+        fetched = time.time()
+        entries = self.entries(date)
+        with self._lock:
+            with open(self._index_path(date), 'a', encoding='utf-8') as file:
+                file.write(json.dumps({'url': url, 'digest': digest, 'fetched': fetched}, ensure_ascii=False) + '\n')
+            entries[url] = (digest, fetched)
+        return digest
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stored_bytes': self.stored_bytes,
+                'dates': len(self.dates())}
@@ -0,0 +1,258 @@
+### STREAMING SCRAPE-TO-CLEAN PIPELINE
+
+"""
+Streaming pipeline from the OCC website (or a raw CSV file) to the cleaned dataset.
+
+Instead of collecting the whole crawl into a list, writing Dataset_Raw.csv and cleaning it
+in 2-DataWrangling.ipynb, the vacancies flow through a chain of generators:
+1. source: vacancies yielded as soon as their page is scraped (or read in chunks from a
+   raw CSV file),
+2. cleaning: duplicates dropped, job titles harmonized, locations mapped and salaries
+   parsed, vacancy by vacancy (see cleaning.py),
+3. batching: cleaned vacancies grouped into small batches, and
+4. sink: each batch appended to an IncrementalStore (or to a SnapshotStore keeping the
+   history of every scrape, with the dates each posting was first and last seen).
+The companies with the most kept vacancies are counted batch by batch along the way (see
+topk.py), and reported at the end of the run.
+
+The memory used is bounded by the size of a batch (plus the fingerprints of the vacancies
+already seen, needed to drop duplicates), the stored vacancies can be loaded by the
+dashboard while the crawl goes on, and a crash loses at most one batch.
+
+Usage from the root of the repository:
+python pipeline.py --store clean_store --pages 10
+python pipeline.py --raw DataSet_Raw.csv --store clean_store --export Dataset_Clean.csv
+python pipeline.py --history history --date 2022-08-03 --pages 10
+python pipeline.py --store clean_store --pages 10 --cache page_cache --from-cache
+"""
+
+import argparse
+import asyncio
+import hashlib
+import queue
+import threading
+import time
+from itertools import islice
+
+import pandas as pd
+
+from cleaning import CLEAN_COLUMNS, RAW_COLUMNS, clean_record, is_missing
+from page_cache import PageCache
+from scraper import BASE_URL, Scraper, extract_cached, page_urls
+from topk import TopKCounter
+from vacancy_store import IncrementalStore, SnapshotStore
+
+# Job terms of 1-DataCollection.ipynb
+JOBS_LIST = ['analista datos', 'data analyst', 'cientifico datos', 'data scientist', 'ingeniero datos',
+             'data engineer', 'arquitecto datos', 'data arquitect', 'analista negocio', 'business analyst']
+
+# Number of cleaned vacancies per stored batch
+BATCH_SIZE = 500
+
+# Number of companies with the most vacancies reported at the end of a run
+TOP_COMPANIES = 10
+
+
+def scrape_records(jobs_list, number_pages, scraper=None, base_url=BASE_URL, queue_size=64):
+    """
+    This function yields the vacancies of the OCC website as soon as their page is scraped.
+
+    The crawl runs in a background thread; a bounded queue between the crawl and the consumer
+    stops the crawl whenever the consumer falls behind.
+
+    It requires 2 inputs (plus 3 optional ones):
+    1. jobs_list : List with the name of the Data Jobs (Python list of strings).
+    2. number_pages : Number of pages to scrape per job (Integer).
+    3. scraper : Scraper to use; a default one if None (Scraper).
+    4. base_url : Base url of the searcher (String).
+    5. queue_size : Maximum number of scraped pages waiting for the consumer (Integer).
+
+    Output:
+    1. Generator of raw vacancies as [Job, Salary, Company, Location] lists.
+    """
+    scraper = scraper or Scraper()
+    pages = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def crawl():
+        async def consume():
+            async for page in scraper.iter_pages(page_urls(jobs_list, number_pages, base_url)):
+                if not put(page.records):
+                    break
+        try:
+            asyncio.run(consume())
+        except BaseException as error:
+            put(error)
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=crawl, name='crawl', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def read_raw_records(csv_path, chunksize=10000):
+    """
+    This function yields the vacancies of a raw CSV file, like Dataset_Raw.csv, reading it in chunks.
+    """
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        yield from chunk[RAW_COLUMNS].itertuples(index=False, name=None)
+
+
+def _fingerprint(record):
+    # Compact fingerprint of a raw vacancy (missing values are all equal, as in drop_duplicates)
+    key = '\x1f'.join('\x00' if is_missing(value) else str(value) for value in record)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+
+
+def clean_records(records, stats=None):
+    """
+    This function drops the duplicated vacancies and cleans the remaining ones.
+
+    It requires 1 input (plus 1 optional one):
+    1. records : Raw vacancies as [Job, Salary, Company, Location] (Iterable).
+    2. stats : Counters updated with the raw, duplicated and kept vacancies (Dictionary).
+
+    Output:
+    1. Generator of cleaned vacancies as (Job, Company, Location, Average Salary) tuples.
+    """
+    seen = set()
+    for record in records:
+        if stats is not None:
+            stats['raw'] += 1
+        fingerprint = _fingerprint(record)
+        if fingerprint in seen:
+            if stats is not None:
+                stats['duplicates'] += 1
+            continue
+        seen.add(fingerprint)
+
+        cleaned = clean_record(record)
+        if cleaned is not None:
+            if stats is not None:
+                stats['kept'] += 1
+            yield cleaned
+
+
+def batched(records, batch_size=BATCH_SIZE):
+    """
+    This function groups cleaned vacancies into dataframes of at most batch_size rows.
+    """
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield pd.DataFrame(batch, columns=CLEAN_COLUMNS)
+
+
+def run_pipeline(records, store, batch_size=BATCH_SIZE, verbose=True, top_companies=TOP_COMPANIES):
+    """
+    This function cleans a stream of raw vacancies and appends them to a store batch by batch.
+
+    It requires 2 inputs (plus 3 optional ones):
+    1. records : Raw vacancies as [Job, Salary, Company, Location] (Iterable).
+    2. store : Store receiving the cleaned vacancies (IncrementalStore or SnapshotStore).
+    3. batch_size : Number of cleaned vacancies per stored batch (Integer).
+    4. verbose : Whether to print the progress after each batch (Boolean).
+    5. top_companies : Number of companies with the most kept vacancies to report (Integer).
+
+    Output:
+    1. Counters of the run: raw, duplicated and kept vacancies, batches and seconds, and the
+       companies with the most kept vacancies as (company, vacancies) tuples (Dictionary).
+    """
+    stats = {'raw': 0, 'duplicates': 0, 'kept': 0, 'batches': 0}
+    companies = TopKCounter()
+    start = time.perf_counter()
+
+    for batch in batched(clean_records(records, stats), batch_size):
+        store.append(batch)
+        companies.update(batch['Company'])
+        stats['batches'] += 1
+        if verbose:
+            print(f"Stored batch {stats['batches']}: {stats['kept']} vacancies kept out of {stats['raw']} scraped")
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['top_companies'] = companies.top(top_companies)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming scrape-to-clean pipeline of the OCC job data.')
+    parser.add_argument('--store', default='clean_store', help='directory of the incremental store')
+    parser.add_argument('--raw', help='raw CSV file to clean instead of scraping the OCC website')
+    parser.add_argument('--jobs', nargs='+', default=JOBS_LIST, help='job terms to scrape')
+    parser.add_argument('--pages', type=int, default=10, help='pages to scrape per job term')
+    parser.add_argument('--base-url', default=BASE_URL, help='base url of the OCC searcher')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=4, help='maximum requests per second to the website')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--append', action='store_true', help='keep the vacancies already in the store')
+    parser.add_argument('--export', help='CSV file receiving the whole store at the end, like Dataset_Clean.csv')
+    parser.add_argument('--history', help='directory of a SnapshotStore keeping every scrape, used instead of --store')
+    parser.add_argument('--date', help='scrape date recorded in the history (YYYY-MM-DD), today by default')
+    parser.add_argument('--cache', help='directory of the cache of the scraped pages (see page_cache.py)')
+    parser.add_argument('--cache-ttl', type=float, help='maximum age of the cached pages, in seconds')
+    parser.add_argument('--from-cache', action='store_true',
+                        help='extract the vacancies of the pages cached on --date again, without the website')
+    parser.add_argument('--processes', type=int, help='processes parsing the cached pages with --from-cache')
+    parser.add_argument('--top-companies', type=int, default=TOP_COMPANIES,
+                        help='companies with the most vacancies reported at the end of the run')
+    args = parser.parse_args()
+
+    cache = PageCache(args.cache, args.cache_ttl, args.date) if args.cache else None
+    if args.from_cache and cache is None:
+        parser.error('--from-cache requires --cache')
+
+    if args.history:
+        store = SnapshotStore(args.history, args.date)
+    else:
+        store = IncrementalStore(args.store)
+        if not args.append:
+            store.clear()
+
+    if args.raw:
+        records = read_raw_records(args.raw)
+    elif args.from_cache:
+        records = extract_cached(cache, args.jobs, args.pages, base_url=args.base_url, processes=args.processes,
+                                 verbose=True).itertuples(index=False, name=None)
+    else:
+        scraper = Scraper(concurrency=args.concurrency, rate_per_host=args.rate, cache=cache)
+        records = scrape_records(args.jobs, args.pages, scraper, args.base_url)
+
+    stats = run_pipeline(records, store, args.batch_size, top_companies=args.top_companies)
+    print(f"Job done! {stats['kept']} vacancies stored in {stats['batches']} batches "
+          f"({stats['duplicates']} duplicates) in {stats['seconds']:.2f} s")
+    if stats['top_companies']:
+        print('Companies with the most vacancies of the run: ' +
+              ', '.join(f'{company} ({count})' for company, count in stats['top_companies']))
+
+    if args.history:
+        store.save_index()
+        print(f"{store.stats()['postings']} distinct postings over {len(store.dates())} scrape dates in {args.history}")
+    elif args.export:
+        print(f'{store.export(args.export)} vacancies exported to {args.export}')
+
+
+if __name__ == '__main__':
+    main()
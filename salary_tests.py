@@ -0,0 +1,298 @@
+### STATISTICAL TESTS OF THE SALARIES
+
+"""
+Comparison of the salaries of the data job categories, as in 3-DataAnalysisViz.ipynb, for
+every category at once: omnibus tests (one-way ANOVA and Kruskal-Wallis H), every pairwise
+test (Welch's t-test and Mann-Whitney U) with a correction for multiple comparisons, and
+bootstrap confidence intervals and permutation tests of the differences between categories.
+
+The resamples only depend on how many times each distinct salary is drawn. Since salaries
+are published rounded (to 500 MXN), even a million salaries hold a few hundred distinct
+values, so:
+- a bootstrap resample of a category is a multinomial draw of the counts of its distinct
+  salaries, and
+- a permutation of two categories is a multivariate hypergeometric draw of the counts of
+  the first one out of the pooled counts,
+which follow exactly the same distribution as resampling the salaries one by one, at a cost
+per resample proportional to the number of distinct salaries instead of the number of
+salaries. The resamples are drawn in chunks, each one from its own seed, spread across a
+process pool; the results only depend on the seed, not on the number of processes. The
+pool is created again in a forked process (such as a worker of a pre-forking server),
+whose copy of the pool of its parent has lost its processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from filter_index import column_codes
+
+# Methods of correction for multiple comparisons
+CORRECTIONS = ('holm', 'bonferroni', 'fdr_bh')
+
+# Default number of bootstrap and permutation resamples
+N_RESAMPLES = 10000
+
+# Maximum number of resamples per chunk, and of counts held in memory by a chunk
+CHUNK_SIZE = 1000
+CHUNK_CELLS = 1 << 22
+
+# Process pool shared by the calls (created on first use, and again in a forked process)
+_executor = None
+_executor_workers = None
+_executor_pid = None
+
+
+def adjust_pvalues(pvalues, method='holm'):
+    """
+    This function corrects p-values for multiple comparisons.
+
+    It requires 1 input (plus 1 optional one):
+    1. pvalues : p-values of the tests (Iterable of floats).
+    2. method : 'holm' (Holm-Bonferroni), 'bonferroni' or 'fdr_bh' (Benjamini-Hochberg) (String).
+
+    Output:
+    1. NumPy array with the adjusted p-values, in the order of the tests.
+    """
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    m = len(pvalues)
+    if m == 0:
+        return pvalues
+    if method == 'bonferroni':
+        return np.minimum(pvalues * m, 1.0)
+
+    order = np.argsort(pvalues, kind='stable')
+    ordered = pvalues[order]
+    if method == 'holm':
+        adjusted = np.maximum.accumulate(ordered * (m - np.arange(m)))
+    elif method == 'fdr_bh':
+        adjusted = np.minimum.accumulate((ordered * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f'Unknown correction {method!r}; expected one of {CORRECTIONS}')
+
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def salary_groups(df, by='Job', value='Salary', min_count=2):
+    """
+    This function returns the disclosed salaries of each category.
+
+    It requires 1 input (plus 3 optional ones):
+    1. df : Dataframe with the job data (Pandas dataframe).
+    2. by : Column of the categories (String).
+    3. value : Column of the salaries (String).
+    4. min_count : Minimum number of salaries of a category to be compared (Integer).
+
+    Output:
+    1. Dictionary with the salaries of each category (NumPy arrays), in the order of the categories.
+    """
+    codes, labels = column_codes(df[by])
+    salary = df[value].to_numpy(dtype=np.float64)
+    disclosed = (codes >= 0) & ~np.isnan(salary)
+    codes, salary = codes[disclosed], salary[disclosed]
+
+    # Salaries grouped by category with a single stable sort of the codes
+    order = np.argsort(codes, kind='stable')
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(labels)))))
+    salary = salary[order]
+
+    return {label: salary[offsets[i]:offsets[i + 1]] for i, label in enumerate(labels)
+            if offsets[i + 1] - offsets[i] >= min_count}
+
+
+def omnibus_tests(groups):
+    """
+    This function tests whether the salaries of every category come from the same distribution.
+
+    Input:
+    1. groups : Salaries of each category, as returned by salary_groups (Dictionary).
+
+    Output:
+    1. Pandas dataframe with the statistic and the p-value of the one-way ANOVA (F) and of the
+       Kruskal-Wallis H test, empty if there are less than two categories.
+    """
+    columns = ['Test', 'Statistic', 'p-value']
+    if len(groups) < 2:
+        return pd.DataFrame(columns=columns)
+    anova = stats.f_oneway(*groups.values())
+    kruskal = stats.kruskal(*groups.values())
+    return pd.DataFrame([['ANOVA (F)', anova.statistic, anova.pvalue],
+                         ['Kruskal-Wallis (H)', kruskal.statistic, kruskal.pvalue]], columns=columns)
+
+
+def _median_of_counts(values, counts, n):
+    # Median of resamples given as counts of the (sorted) distinct values, one resample per row
+    cumulative = np.cumsum(counts, axis=1)
+    low = (cumulative <= (n - 1) // 2).sum(axis=1)
+    high = (cumulative <= n // 2).sum(axis=1)
+    return (values[low] + values[high]) / 2
+
+
+def _resample_chunk(task):
+    # Bootstrap means and medians of a category, or differences of the means of permuted pairs
+    kind, distinct, size, seed = task
+    rng = np.random.default_rng(seed)
+
+    if kind == 'bootstrap':
+        values, counts = distinct
+        n = counts.sum()
+        draws = rng.multinomial(n, counts / n, size=size)
+        return draws @ values / n, _median_of_counts(values, draws, n)
+
+    (values, counts), n_a = distinct
+    n_b = counts.sum() - n_a
+    sum_a = rng.multivariate_hypergeometric(counts, n_a, size=size) @ values
+    return (sum_a / n_a - (values @ counts - sum_a) / n_b),
+
+
+def _map(tasks, workers):
+    global _executor, _executor_workers, _executor_pid
+    if workers <= 1 or len(tasks) == 1:
+        return [_resample_chunk(task) for task in tasks]
+    if _executor_pid != os.getpid():
+        # Pool inherited through a fork: its processes and its management thread stayed in the parent
+        _executor = None
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor, _executor_workers = ProcessPoolExecutor(max_workers=workers), workers
+        _executor_pid = os.getpid()
+    return list(_executor.map(_resample_chunk, tasks))
+
+
+def shutdown():
+    """
+    This function stops the process pool drawing the resamples, if this process started one.
+    """
+    global _executor, _executor_workers
+    if _executor is not None and _executor_pid == os.getpid():
+        _executor.shutdown()
+    _executor, _executor_workers = None, None
+
+
+def _chunks(kind, distinct, n_resamples, seed_sequence):
+    # Tasks drawing the resamples of a category or a pair in chunks small enough to keep their
+    # counts in memory, whatever the number of distinct salaries
+    n_values = len(distinct[0]) if kind == 'bootstrap' else len(distinct[0][0])
+    chunk = int(np.clip(CHUNK_CELLS // n_values, 1, CHUNK_SIZE))
+    starts = range(0, n_resamples, chunk)
+    return [(kind, distinct, min(chunk, n_resamples - start), chunk_seed)
+            for start, chunk_seed in zip(starts, seed_sequence.spawn(len(starts)))]
+
+
+def resample(groups, pairs, n_resamples=N_RESAMPLES, seed=0, workers=None):
+    """
+    This function draws the bootstrap resamples of categories and the permutations of pairs of categories.
+
+    It requires 2 inputs (plus 3 optional ones):
+    1. groups : Salaries of each category, as returned by salary_groups (Dictionary).
+    2. pairs : Pairs of categories to permute (List of tuples of strings).
+    3. n_resamples : Number of bootstrap resamples of each category and of permutations of each pair (Integer).
+    4. seed : Seed of the resamples (Integer).
+    5. workers : Number of processes; by default, the number of CPUs (Integer).
+
+    Output:
+    1. Dictionary with the means and the medians of the bootstrap resamples of each category (Tuple of NumPy arrays).
+    2. List with the differences of the means of the permutations of each pair (NumPy arrays).
+    """
+    workers = workers or os.cpu_count() or 1
+    group_seeds, pair_seeds = np.random.SeedSequence(seed).spawn(2)
+    distinct = {label: np.unique(values, return_counts=True) for label, values in groups.items()}
+
+    tasks, owners = [], []
+    for label, seed_sequence in zip(groups, group_seeds.spawn(len(groups))):
+        chunks = _chunks('bootstrap', distinct[label], n_resamples, seed_sequence)
+        tasks += chunks
+        owners += [('bootstrap', label)] * len(chunks)
+
+    for i, ((a, b), seed_sequence) in enumerate(zip(pairs, pair_seeds.spawn(len(pairs)))):
+        # Pooled distinct salaries of the pair and their counts
+        values = np.union1d(distinct[a][0], distinct[b][0])
+        counts = np.zeros(len(values), dtype=np.int64)
+        counts[np.searchsorted(values, distinct[a][0])] += distinct[a][1]
+        counts[np.searchsorted(values, distinct[b][0])] += distinct[b][1]
+        chunks = _chunks('permutation', ((values, counts), len(groups[a])), n_resamples, seed_sequence)
+        tasks += chunks
+        owners += [('permutation', i)] * len(chunks)
+
+    collected = {}
+    for owner, result in zip(owners, _map(tasks, workers)):
+        collected.setdefault(owner, []).append(result)
+
+    bootstrap = {label: tuple(np.concatenate(arrays) for arrays in zip(*collected[('bootstrap', label)]))
+                 for label in groups}
+    permutations = [np.concatenate([result[0] for result in collected[('permutation', i)]]) for i in range(len(pairs))]
+    return bootstrap, permutations
+
+
+def _permutation_pvalue(observed, permuted, alternative):
+    if alternative == 'greater':
+        extreme = permuted >= observed
+    elif alternative == 'less':
+        extreme = permuted <= observed
+    else:
+        extreme = np.abs(permuted) >= abs(observed)
+    return (1 + np.count_nonzero(extreme)) / (1 + len(permuted))
+
+
+def pairwise_tests(groups, alternative='greater', correction='holm', alpha=0.05, confidence=0.95,
+                   n_resamples=N_RESAMPLES, seed=0, workers=None):
+    """
+    This function compares the salaries of every pair of categories.
+
+    The categories are ordered by decreasing mean salary and each pair compares the first one
+    against the second one, so the default one-sided alternative ('greater') tests whether the
+    higher-paid category of the pair is paid significantly more, as in the notebook.
+
+    It requires 1 input (plus 7 optional ones):
+    1. groups : Salaries of each category, as returned by salary_groups (Dictionary).
+    2. alternative : 'greater', 'less' or 'two-sided' (String).
+    3. correction : Correction for multiple comparisons, one of CORRECTIONS (String).
+    4. alpha : Significance level (Float).
+    5. confidence : Level of the bootstrap confidence intervals (Float).
+    6. n_resamples : Number of bootstrap and of permutation resamples of each pair (Integer).
+    7. seed : Seed of the resamples (Integer).
+    8. workers : Number of processes drawing the resamples; by default, the number of CPUs (Integer).
+
+    Output:
+    1. Pandas dataframe with one row per pair: categories (A, B), number of salaries, difference
+       of the means and of the medians with their bootstrap confidence intervals, p-values of
+       Welch's t-test, of the Mann-Whitney U test and of the permutation test of the means
+       (raw and corrected), and whether the difference is significant by all three tests.
+    """
+    labels = sorted(groups, key=lambda label: -groups[label].mean())
+    pairs = [(a, b) for i, a in enumerate(labels) for b in labels[i + 1:]]
+    bootstrap, permutations = resample(groups, pairs, n_resamples, seed, workers)
+    tail = (1 - confidence) / 2 * 100
+
+    rows = []
+    for (a, b), permuted_diff in zip(pairs, permutations):
+        x, y = groups[a], groups[b]
+        observed = x.mean() - y.mean()
+        # The categories are resampled independently, so the i-th resamples of both give a resample of the difference
+        mean_diff = bootstrap[a][0] - bootstrap[b][0]
+        median_diff = bootstrap[a][1] - bootstrap[b][1]
+        rows.append({'A': a, 'B': b, 'n A': len(x), 'n B': len(y),
+                     'Mean difference': observed,
+                     'Mean CI low': np.percentile(mean_diff, tail),
+                     'Mean CI high': np.percentile(mean_diff, 100 - tail),
+                     'Median difference': np.median(x) - np.median(y),
+                     'Median CI low': np.percentile(median_diff, tail),
+                     'Median CI high': np.percentile(median_diff, 100 - tail),
+                     't-test p': stats.ttest_ind(x, y, equal_var=False, alternative=alternative).pvalue,
+                     'Mann-Whitney p': stats.mannwhitneyu(x, y, alternative=alternative).pvalue,
+                     'Permutation p': _permutation_pvalue(observed, permuted_diff, alternative)})
+
+    columns = ['A', 'B', 'n A', 'n B', 'Mean difference', 'Mean CI low', 'Mean CI high', 'Median difference',
+               'Median CI low', 'Median CI high', 't-test p', 'Mann-Whitney p', 'Permutation p']
+    result = pd.DataFrame(rows, columns=columns)
+    for test in ('t-test p', 'Mann-Whitney p', 'Permutation p'):
+        result[test + ' (adjusted)'] = adjust_pvalues(result[test], correction)
+    result['Significant'] = (result[['t-test p (adjusted)', 'Mann-Whitney p (adjusted)',
+                                     'Permutation p (adjusted)']] < alpha).all(axis=1)
+    return result
@@ -0,0 +1,622 @@
+### CONCURRENT SCRAPER OF THE OCC WEBSITE
+
+"""
+Concurrent scraping of the job vacancies published on the OCC website (occ.com.mx).
+
+The 'occscraper' function of 1-DataCollection.ipynb loads every page of every job term
+one after another in a single Firefox instance. This module fetches the result pages
+with a bounded number of concurrent requests instead, so a crawl of hundreds of search
+terms takes about the time of its slowest pages:
+- the number of requests in flight is bounded by a pool of workers,
+- the requests to each host are rate limited with a token bucket,
+- failed requests (network errors, timeouts, HTTP 429 and 5xx) are retried with an
+  exponential backoff with jitter, honouring the Retry-After header, and
+- pages without vacancies in their HTML (e.g., rendered with JavaScript) can be fetched
+  again through an optional pool of Selenium browsers, and
+- the fetched pages can be kept in an on-disk cache (see page_cache.py), served instead of
+  the website while they are fresh.
+
+The vacancies are extracted with lxml and XPath queries when lxml is installed, with
+BeautifulSoup otherwise. As a separate stage, extract_cached extracts them again from the
+cached pages of a crawl, in a pool of processes and without any request, for instance
+after a change of the class identifiers of the website.
+
+The pages are requested with aiohttp when it is installed, and with urllib in a pool of
+threads otherwise. The data extracted from each page follows the format of 'occscraper'
+(Job, Salary, Company and Location, with NaN for missing elements), in the same order.
+
+The base URL can point to any server, for instance the local stand-in of the OCC website
+in benchmarks/occ_standin.py, so the scraper can be exercised offline.
+"""
+
+import asyncio
+import functools
+import gzip
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Base url of the OCC searcher
+BASE_URL = 'https://www.occ.com.mx/empleos/de-'
+BASE_PAGE_URL = '?page='
+
+# Columns of the scraped data
+COLUMNS = ['Job', 'Salary', 'Company', 'Location']
+
+# Class identifiers of the OCC website when the dataset was collected (August 2022)
+DEFAULT_CLASSES = {'vacancy': 'c01594 c01596 c01599 c011063',  # div class
+                   'jobname': 'c01607 c01611 c01627 c011065 c011091',  # h2 class
+                   'salary': 'c01607 c01614 c01627 c011068',  # span class
+                   'company': 'c011075',  # a class
+                   'location': 'c011080 c011081'}  # a class
+
+# HTTP status codes worth retrying
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Parser of the result pages: 'lxml' (XPath queries over the tree built by lxml) or any parser of BeautifulSoup
+DEFAULT_PARSER = 'lxml' if etree is not None else 'html.parser'
+
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64; rv:103.0) Gecko/20100101 Firefox/103.0'
+
+# Result of the scraping of a page
+Page = namedtuple('Page', ['index', 'job', 'number', 'url', 'status', 'html', 'records', 'source', 'attempts', 'error'])
+
+
+def job_url(job, base_url=BASE_URL):
+    """
+    This function returns the url of the first result page of a job term, for instance,
+    'https://www.occ.com.mx/empleos/de-data-analyst/' for 'Data Analyst'.
+    """
+    return base_url + job.strip().lower().replace(' ', '-') + '/'
+
+
+def page_urls(jobs_list, number_pages, base_url=BASE_URL):
+    """
+    This function returns the result pages to scrape for a list of job terms.
+
+    It requires 2 inputs (plus 1 optional one):
+    1. jobs_list : List with the name of the Data Jobs (Python list of strings).
+    2. number_pages : Number of pages to scrape per job (Integer).
+    3. base_url : Base url of the searcher (String).
+
+    Output:
+    1. List of (job, page number, url) tuples, in the order used by occscraper.
+    """
+    urls = []
+    for job in jobs_list:
+        url = job_url(job, base_url)
+        for number in range(1, number_pages + 1):
+            urls.append((job, number, url if number == 1 else url + BASE_PAGE_URL + str(number)))
+    return urls
+
+
+def _text(vacancy, tag, class_id):
+    element = vacancy.find(tag, attrs={'class': class_id})
+    return element.text if element is not None else np.nan
+
+
+def _class_query(tag, class_id, first=True):
+    # XPath query of the elements of a tag with a class identifier, matched as BeautifulSoup does: the whole
+    # class attribute for an identifier with several classes, any of the classes of the element otherwise
+    if ' ' in class_id.strip():
+        test = 'normalize-space(@class) = $class_id'
+    else:
+        test = "contains(concat(' ', normalize-space(@class), ' '), concat(' ', $class_id, ' '))"
+    return etree.XPath(f'.//{tag}[{test}]' + ('[1]' if first else ''))
+
+
+@functools.lru_cache(maxsize=16)
+def _compiled_queries(classes):
+    classes = dict(classes)
+    return (_class_query('div', classes['vacancy'], first=False),
+            [(_class_query(tag, classes[name]), ' '.join(classes[name].split()))
+             for tag, name in (('h2', 'jobname'), ('span', 'salary'), ('a', 'company'), ('a', 'location'))])
+
+
+def _parse_lxml(html, classes):
+    if not html.strip():
+        return []
+    vacancy_query, field_queries = _compiled_queries(tuple(classes.items()))
+    # The source is decoded already, so the charset declared by the page is ignored
+    tree = lxml.html.document_fromstring(html.encode('utf-8'), parser=lxml.html.HTMLParser(encoding='utf-8'))
+    records = []
+    for vacancy in vacancy_query(tree, class_id=' '.join(classes['vacancy'].split())):
+        record = []
+        for query, class_id in field_queries:
+            element = query(vacancy, class_id=class_id)
+            record.append(element[0].text_content() if element else np.nan)
+        records.append(record)
+    return records
+
+
+def parse_vacancies(html, classes=DEFAULT_CLASSES, parser=DEFAULT_PARSER):
+    """
+    This function extracts the vacancies of a result page of the OCC website.
+
+    It requires 1 input (plus 2 optional ones):
+    1. html : Source of the page (String).
+    2. classes : Class identifiers of the vacancy, jobname, salary, company and location elements (Dictionary).
+    3. parser : 'lxml' for XPath queries over the tree of lxml, or the name of a parser of BeautifulSoup (String).
+
+    Output:
+    1. List of [Job, Salary, Company, Location] lists, with NaN for the missing elements.
+    """
+    if parser == 'lxml':
+        return _parse_lxml(html, classes)
+
+    soup = BeautifulSoup(html, parser)
+    records = []
+    for vacancy in soup.find_all('div', attrs={'class': classes['vacancy']}):
+        records.append([_text(vacancy, 'h2', classes['jobname']),
+                        _text(vacancy, 'span', classes['salary']),
+                        _text(vacancy, 'a', classes['company']),
+                        _text(vacancy, 'a', classes['location'])])
+    return records
+
+
+class FetchError(Exception):
+    """
+    Error of a request, with the HTTP status (None for network errors) and the Retry-After delay.
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _retry_after(headers):
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the rate of the requests sent to each host.
+
+    It requires 2 optional inputs:
+    1. rate : Maximum sustained number of requests per second per host; None disables the limit (Float).
+    2. burst : Number of requests that can be sent at once after an idle period (Integer).
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets = {}
+        self._locks = {}
+
+    async def wait(self, host):
+        """
+        This function waits until a request can be sent to the host.
+        """
+        if not self.rate:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            tokens, last = self._buckets.get(host, (float(self.burst), loop.time()))
+            now = loop.time()
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.rate)
+                now = loop.time()
+                tokens = 1.0
+            self._buckets[host] = (tokens - 1, now)
+
+
+class HttpFetcher:
+    """
+    Asynchronous HTTP client: aiohttp when it is installed, urllib in a pool of threads otherwise.
+
+    It requires 3 optional inputs:
+    1. concurrency : Maximum number of simultaneous connections (Integer).
+    2. timeout : Timeout of each request, in seconds (Float).
+    3. user_agent : User-Agent header of the requests (String).
+    """
+
+    def __init__(self, concurrency=8, timeout=15, user_agent=USER_AGENT):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = {'User-Agent': user_agent, 'Accept-Language': 'es-MX,es;q=0.9'}
+        self._session = None
+        self._executor = None
+
+    async def __aenter__(self):
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='fetch')
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def fetch(self, url):
+        """
+        This function returns the source of a page, raising FetchError if the request fails.
+        """
+        if self._session is not None:
+            try:
+                async with self._session.get(url) as response:
+                    if response.status >= 400:
+                        raise FetchError(f'HTTP {response.status}', response.status, _retry_after(response.headers))
+                    return await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                raise FetchError(f'{type(error).__name__}: {error}') from error
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._fetch_blocking, url)
+
+    def _fetch_blocking(self, url):
+        request = urllib.request.Request(url, headers=self.headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                charset = response.headers.get_content_charset() or 'utf-8'
+                return response.read().decode(charset, errors='replace')
+        except urllib.error.HTTPError as error:
+            raise FetchError(f'HTTP {error.code}', error.code, _retry_after(error.headers)) from error
+        except (urllib.error.URLError, OSError) as error:
+            raise FetchError(f'{type(error).__name__}: {error}') from error
+
+
+class BrowserPool:
+    """
+    Pool of headless Firefox browsers driven by Selenium, for pages that require JavaScript.
+
+    The browsers are started on first use and each one renders a single page at a time.
+
+    It requires 2 optional inputs:
+    1. size : Number of browsers (Integer).
+    2. wait : Implicit wait of the browsers, in seconds (Float).
+    """
+
+    def __init__(self, size=2, wait=1):
+        self.size = size
+        self.wait = wait
+        self._drivers = None
+        self._executor = None
+        self._starting = asyncio.Lock()
+
+    def _start(self):
+        from selenium import webdriver
+        from selenium.webdriver.firefox.service import Service
+        from webdriver_manager.firefox import GeckoDriverManager
+
+        service = Service(executable_path=GeckoDriverManager().install())
+        options = webdriver.FirefoxOptions()
+        options.add_argument('-headless')
+
+        self._drivers = asyncio.Queue()
+        for _ in range(self.size):
+            driver = webdriver.Firefox(service=service, options=options)
+            driver.implicitly_wait(self.wait)
+            self._drivers.put_nowait(driver)
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='browser')
+
+    async def fetch(self, url):
+        """
+        This function returns the source of a page once rendered by a browser of the pool.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._starting:
+            if self._drivers is None:
+                await loop.run_in_executor(None, self._start)
+
+        driver = await self._drivers.get()
+        try:
+            return await loop.run_in_executor(self._executor, self._render, driver, url)
+        finally:
+            self._drivers.put_nowait(driver)
+
+    @staticmethod
+    def _render(driver, url):
+        driver.get(url)
+        return driver.page_source
+
+    def close(self):
+        if self._drivers is not None:
+            while not self._drivers.empty():
+                self._drivers.get_nowait().quit()
+            self._drivers = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class ScrapeStats:
+    """
+    Counters of a crawl: pages, failures, retries and pages rendered by the browsers.
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.failures = 0
+        self.retries = 0
+        self.browser_pages = 0
+        self.cached_pages = 0
+        self.vacancies = 0
+        self.start = None
+        self.end = None
+
+    @property
+    def elapsed(self):
+        if self.start is None:
+            return 0.0
+        return (self.end or time.perf_counter()) - self.start
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {'pages': self.pages, 'failures': self.failures, 'retries': self.retries,
+                'browser_pages': self.browser_pages, 'cached_pages': self.cached_pages, 'vacancies': self.vacancies,
+                'seconds': round(self.elapsed, 3), 'pages_per_second': round(self.pages_per_second, 2)}
+
+    def __str__(self):
+        return (f'{self.pages} pages ({self.failures} failed, {self.retries} retries, '
+                f'{self.browser_pages} rendered by a browser, {self.cached_pages} from the cache), {self.vacancies} vacancies '
+                f'in {self.elapsed:.2f} s: {self.pages_per_second:.1f} pages/s')
+
+
+class Scraper:
+    """
+    Concurrent scraper of the result pages of the OCC website.
+
+    It requires 11 optional inputs:
+    1. classes : Class identifiers of the page elements, see DEFAULT_CLASSES (Dictionary).
+    2. concurrency : Maximum number of pages fetched at the same time (Integer).
+    3. rate_per_host : Maximum number of requests per second sent to each host; None for no limit (Float).
+    4. burst : Number of requests sent at once to a host after an idle period (Integer).
+    5. retries : Number of retries of a failed request (Integer).
+    6. backoff : Delay before the first retry, doubled at each retry, in seconds (Float).
+    7. max_backoff : Maximum delay between retries, in seconds (Float).
+    8. timeout : Timeout of each request, in seconds (Float).
+    9. browser_pool : Pool of browsers for the pages without vacancies in their HTML, or None (BrowserPool).
+    10. cache : On-disk cache of the pages, read before and written after each request, or None (PageCache).
+    11. parser : Parser of the pages, see parse_vacancies (String).
+    """
+
+    def __init__(self, classes=DEFAULT_CLASSES, concurrency=8, rate_per_host=None, burst=1, retries=3,
+                 backoff=0.5, max_backoff=8.0, timeout=15, browser_pool=None, cache=None, parser=DEFAULT_PARSER):
+        self.classes = classes
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate_per_host, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.browser_pool = browser_pool
+        self.cache = cache
+        self.parser = parser
+        self.stats = ScrapeStats()
+
+    async def _fetch_with_retries(self, fetcher, url):
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait(host)
+            try:
+                return await fetcher.fetch(url), attempt + 1
+            except FetchError as error:
+                retryable = error.status is None or error.status in RETRY_STATUS
+                if not retryable or attempt == self.retries:
+                    raise
+                self.stats.retries += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                if error.retry_after is not None:
+                    delay = max(delay, min(error.retry_after, self.max_backoff))
+                await asyncio.sleep(delay)
+
+    async def _scrape_page(self, fetcher, index, job, number, url):
+        # Fresh pages of the crawl date are read from the cache, without any request
+        html = self.cache.get(url) if self.cache is not None else None
+        if html is not None:
+            return Page(index, job, number, url, 200, html, parse_vacancies(html, self.classes, self.parser), 'cache', 0, None)
+
+        try:
+            html, attempts = await self._fetch_with_retries(fetcher, url)
+        except FetchError as error:
+            return Page(index, job, number, url, error.status, None, [], 'http', self.retries + 1, str(error))
+
+        records = parse_vacancies(html, self.classes, self.parser)
+        source = 'http'
+        if not records and self.browser_pool is not None:
+            # Without vacancies in the HTML, the results may be rendered by JavaScript
+            try:
+                html = await self.browser_pool.fetch(url)
+                records = parse_vacancies(html, self.classes, self.parser)
+                source = 'browser'
+            except Exception as error:
+                return Page(index, job, number, url, 200, html, [], 'browser', attempts, str(error))
+
+        if self.cache is not None:
+            self.cache.put(url, html)
+        return Page(index, job, number, url, 200, html, records, source, attempts, None)
+
+    async def iter_pages(self, urls):
+        """
+        This function scrapes pages concurrently and yields them as soon as they are ready.
+
+        It requires 1 input:
+        1. urls : List of (job, page number, url) tuples, as returned by page_urls (List).
+
+        Output:
+        1. Asynchronous generator of Page tuples, in completion order.
+        """
+        queue = asyncio.Queue()
+        for index, (job, number, url) in enumerate(urls):
+            queue.put_nowait((index, job, number, url))
+        results = asyncio.Queue(maxsize=2 * self.concurrency)
+
+        self.stats = ScrapeStats()
+        self.stats.start = time.perf_counter()
+
+        async with HttpFetcher(self.concurrency, self.timeout) as fetcher:
+
+            async def worker():
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await results.put(await self._scrape_page(fetcher, *item))
+
+            workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(urls)))]
+            try:
+                for _ in range(len(urls)):
+                    page = await results.get()
+                    self.stats.pages += 1
+                    self.stats.failures += page.error is not None
+                    self.stats.browser_pages += page.source == 'browser'
+                    self.stats.cached_pages += page.source == 'cache'
+                    self.stats.vacancies += len(page.records)
+                    yield page
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self.stats.end = time.perf_counter()
+
+    async def scrape_async(self, jobs_list, number_pages, base_url=BASE_URL, verbose=False):
+        """
+        This function scrapes the result pages of a list of jobs (coroutine version of scrape).
+        """
+        pages = []
+        async for page in self.iter_pages(page_urls(jobs_list, number_pages, base_url)):
+            pages.append(page)
+            if verbose and page.error is not None:
+                print('Failed to retrieve:', page.url, f'({page.error})')
+
+        if verbose:
+            print('Job done!', self.stats)
+
+        # Same order as occscraper: by job, then by page
+        pages.sort(key=lambda page: page.index)
+        data = [record for page in pages for record in page.records]
+        return pd.DataFrame(data, columns=COLUMNS)
+
+    def scrape(self, jobs_list, number_pages, base_url=BASE_URL, verbose=True):
+        """
+        This function scrapes job data from the OCC website: Position Name, Salary, Company and Location.
+
+        It requires 2 inputs (plus 2 optional ones):
+        1. jobs_list : List with the name of the Data Jobs in both English and Spanish and avoiding empty words (Python list of strings).
+        2. number_pages : Number of pages to scrape from the website per job (Integer).
+        3. base_url : Base url of the searcher (String).
+        4. verbose : Whether to print the failed pages and the statistics of the crawl (Boolean).
+
+        Output:
+        1. Pandas Dataframe with the results in a tabular form from the web scraping.
+        """
+        return asyncio.run(self.scrape_async(jobs_list, number_pages, base_url, verbose))
+
+
+def _parse_cached_page(path, classes, parser):
+    # Vacancies of a page of the cache, read and parsed in a worker process
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        return parse_vacancies(file.read(), dict(classes), parser)
+
+
+def extract_cached(cache, jobs_list, number_pages, classes=DEFAULT_CLASSES, base_url=BASE_URL, crawl_date=None,
+                   processes=None, parser=DEFAULT_PARSER, verbose=False):
+    """
+    This function extracts the vacancies of the pages of a crawl from the cache, without any request to the website.
+
+    The pages are parsed in a pool of processes (each distinct page once), so the vacancies of a
+    whole crawl can be extracted again in seconds, for instance with new class identifiers.
+
+    It requires 3 inputs (plus 6 optional ones):
+    1. cache : On-disk cache of the pages of the crawl (PageCache).
+    2. jobs_list : List with the name of the Data Jobs of the crawl (Python list of strings).
+    3. number_pages : Number of pages scraped per job (Integer).
+    4. classes : Class identifiers of the page elements, see DEFAULT_CLASSES (Dictionary).
+    5. base_url : Base url of the searcher of the crawl (String).
+    6. crawl_date : Crawl date of the pages; the default crawl date of the cache if None (String or date).
+    7. processes : Number of worker processes; all the CPUs if None, and no pool if 1 (Integer).
+    8. parser : Parser of the pages, see parse_vacancies (String).
+    9. verbose : Whether to print the pages missing from the cache (Boolean).
+
+    Output:
+    1. Pandas Dataframe with the vacancies, in the same order as a crawl by occscraper.
+    """
+    entries = cache.entries(crawl_date)
+    digests = []
+    for _, _, url in page_urls(jobs_list, number_pages, base_url):
+        if url in entries:
+            digests.append(entries[url][0])
+        elif verbose:
+            print('Not in the cache:', url)
+
+    unique = list(dict.fromkeys(digests))
+    paths = [cache.object_path(digest) for digest in unique]
+    parse = functools.partial(_parse_cached_page, classes=tuple(classes.items()), parser=parser)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(paths) <= 1:
+        parsed = list(map(parse, paths))
+    else:
+        # Chunks of pages per task, about four per worker, so the workers are not fed one small page at a time
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parsed = list(executor.map(parse, paths, chunksize=max(1, len(paths) // (4 * processes))))
+
+    records = dict(zip(unique, parsed))
+    return pd.DataFrame([record for digest in digests for record in records[digest]], columns=COLUMNS)
+
+
+def occscraper(jobs_list, number_pages, vacancy_class, jobname_class, salary_class, company_class, location_class,
+               concurrency=8, rate_per_host=4, base_url=BASE_URL, browser_pool=None, cache=None):
+    """
+    This function scrapes job data from the OCC Website (occ.com.mx): Position Name, Salary, Company and Location.
+
+    It takes the same inputs as the occscraper function of 1-DataCollection.ipynb (plus 5 optional ones) and
+    returns the same dataframe, but fetches the pages concurrently.
+
+    It requires 7 inputs (plus 5 optional ones):
+    1. jobs_list : List with the name of the Data Jobs in both English and Spanish and avoiding empty words (Python list of strings).
+    2. number_pages : Number of pages to scrap from the website (Integer).
+    3. vacancy_class : Class identifier for the vacancy, for instance: 'c0132 c011010' (String)
+    4. jobname_class : Class identifier for the name of the position, for instance: 'c01584 c01588 c01604 c01990 c011016' (String)
+    5. salary_class : Class identifier for the salary of the position, for instance: 'c01584 c01591 c01604 c01993' (String)
+    6. company_class : Class identifier for the company offering the position, for instance: 'c011000' (String)
+    7. location_class : Class identifier for the geographical location of the position, for instance: 'c011005 c011006' (String)
+    8. concurrency : Maximum number of pages fetched at the same time (Integer).
+    9. rate_per_host : Maximum number of requests per second sent to the website (Float).
+    10. base_url : Base url of the searcher (String).
+    11. browser_pool : Pool of browsers for the pages rendered with JavaScript, or None (BrowserPool).
+    12. cache : On-disk cache of the pages, so a new run of the same day only requests the missing pages (PageCache).
+
+    Output:
+    1. Pandas Dataframe with the results in a tabular form from the web scraping.
+    """
+    classes = {'vacancy': vacancy_class, 'jobname': jobname_class, 'salary': salary_class,
+               'company': company_class, 'location': location_class}
+    scraper = Scraper(classes, concurrency=concurrency, rate_per_host=rate_per_host, browser_pool=browser_pool, cache=cache)
+    return scraper.scrape(jobs_list, number_pages, base_url=base_url)
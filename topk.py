@@ -0,0 +1,110 @@
+### TOP-K SELECTION OF THE MOST FREQUENT VALUES
+
+"""
+Exact top-k selection of the most frequent values of a column, such as the companies with
+the most vacancies, without sorting every distinct value.
+
+The counts of the values are selected with np.partition, in linear time, and only the k
+selected values are sorted. Counting the values of the filtered rows is a single
+np.bincount over their integer codes (see aggregates.py), so answering "top N companies
+for this filter" no longer involves a group-by nor a sort of the companies.
+
+The TopKCounter keeps exact counts of a stream of values, such as the companies of the
+postings ingested by the pipeline, and updates them batch by batch.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+
+def top_k_positions(counts, k):
+    """
+    This function returns the positions of the k largest counts, in decreasing order of count.
+
+    Ties are broken by position (the order of the codes, i.e., the alphabetical order of
+    sorted categories), as a stable sort would; zero counts are never selected.
+
+    It requires 2 inputs:
+    1. counts : Count of each value (NumPy array).
+    2. k : Number of values to select (Integer).
+
+    Output:
+    1. NumPy array with the positions of at most k values.
+    """
+    counts = np.asarray(counts)
+    k = min(k, int(np.count_nonzero(counts)))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # k-th largest count: every larger count is selected, then the first ties by position
+    threshold = np.partition(counts, len(counts) - k)[len(counts) - k]
+    above = np.flatnonzero(counts > threshold)
+    ties = np.flatnonzero(counts == threshold)[:k - len(above)]
+    selected = np.concatenate([above, ties])
+
+    return selected[np.lexsort((selected, -counts[selected]))]
+
+
+class TopKCounter:
+    """
+    Exact counts of a stream of values, updated batch by batch, with top-k queries.
+
+    Ties are broken by the alphabetical order of the values.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._values = []
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._values)
+
+    def update(self, values):
+        """
+        This function adds a batch of values to the counts (missing values are ignored).
+
+        Input:
+        1. values : Values of the batch, for instance, the Company column of new postings (Iterable).
+        """
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+
+        # Ids of the distinct values of the batch, new values getting the next ids in order
+        known = len(self._values)
+        ids = np.fromiter((self._ids.setdefault(value, len(self._ids)) for value in uniques),
+                          dtype=np.intp, count=len(uniques))
+        self._values.extend(uniques[ids >= known])
+
+        if len(self._values) > len(self._counts):
+            self._counts = np.concatenate([self._counts, np.zeros(len(self._values) - len(self._counts), dtype=np.int64)])
+        self._counts += np.bincount(ids[codes[codes >= 0]], minlength=len(self._counts))
+
+    def count(self, value):
+        """
+        This function returns the count of a value (0 if it was never seen).
+        """
+        return int(self._counts[self._ids[value]]) if value in self._ids else 0
+
+    def top(self, k):
+        """
+        This function returns the k most frequent values.
+
+        Input:
+        1. k : Number of values (Integer).
+
+        Output:
+        1. List of (value, count) tuples, in decreasing order of count.
+        """
+        counts = self._counts
+        k = min(k, int(np.count_nonzero(counts)))
+        if k <= 0:
+            return []
+
+        threshold = np.partition(counts, len(counts) - k)[len(counts) - k]
+        above = np.flatnonzero(counts > threshold).tolist()
+        ties = heapq.nsmallest(k - len(above), np.flatnonzero(counts == threshold).tolist(),
+                               key=self._values.__getitem__)
+
+        return sorted(((self._values[i], int(counts[i])) for i in above + ties), key=lambda item: (-item[1], item[0]))
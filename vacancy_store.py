@@ -0,0 +1,359 @@
+### INCREMENTAL STORE OF THE CLEANED JOB DATA
+
+"""
+Append-only store of the cleaned vacancies, filled batch by batch while the OCC website is
+being scraped.
+
+The store is a directory with one CSV file per batch ('part-000001.csv', ...), in the
+format of Dataset_Clean.csv. Each part is written into a temporary file which is renamed
+once complete, so a reader never sees a partially written batch and a crash of the
+scraper loses at most the batch being written. The dashboard can load the vacancies
+stored so far at any moment (see data_loader.load_dataset).
+
+Repeated scrapes are kept in a SnapshotStore instead, which stores each posting only once
+along with the dates it was first and last seen, partitioned by scrape date.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from cleaning import CLEAN_COLUMNS
+
+PART_PATTERN = re.compile(r'^part-(\d{6})\.csv$')
+
+# Origin of the day numbers of the index of a SnapshotStore
+EPOCH = datetime.date(1970, 1, 1)
+EPOCH_DAY = np.datetime64('1970-01-01', 'D')
+
+
+class IncrementalStore:
+    """
+    Directory of CSV parts with the cleaned vacancies, appended one batch at a time.
+
+    It requires 1 input:
+    1. directory : Directory of the store, created if needed (String).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def parts(self):
+        """
+        This function returns the paths of the complete parts of the store, in order.
+        """
+        names = sorted(name for name in os.listdir(self.directory) if PART_PATTERN.match(name))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _next_number(self):
+        parts = self.parts()
+        return int(PART_PATTERN.match(os.path.basename(parts[-1])).group(1)) + 1 if parts else 1
+
+    def append(self, batch):
+        """
+        This function stores a batch of cleaned vacancies as a new part.
+
+        Input:
+        1. batch : Cleaned vacancies with the columns of Dataset_Clean.csv (Pandas dataframe).
+
+        Output:
+        1. Path of the new part (String), or None if the batch is empty.
+        """
+        if len(batch) == 0:
+            return None
+
+        path = os.path.join(self.directory, f'part-{self._next_number():06d}.csv')
+        file_descriptor, temp_path = tempfile.mkstemp(prefix='.part-', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8', newline='') as file:
+                batch.to_csv(file, index=False, columns=CLEAN_COLUMNS)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
+
+    def read(self):
+        """
+        This function returns every vacancy stored so far (Pandas dataframe).
+        """
+        parts = [pd.read_csv(path) for path in self.parts()]
+        if not parts:
+            return pd.DataFrame({column: pd.Series(dtype=object if column != 'Average Salary' else float)
+                                 for column in CLEAN_COLUMNS})
+        return pd.concat(parts, ignore_index=True)
+
+    def export(self, csv_path):
+        """
+        This function writes every vacancy stored so far into a single CSV file, like Dataset_Clean.csv.
+        """
+        df = self.read()
+        directory = os.path.dirname(os.path.abspath(csv_path))
+        file_descriptor, temp_path = tempfile.mkstemp(prefix='.export-', suffix='.tmp', dir=directory)
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8', newline='') as file:
+            df.to_csv(file, index=False)
+        os.replace(temp_path, csv_path)
+        return len(df)
+
+    def clear(self):
+        """
+        This function removes every part of the store.
+        """
+        for path in self.parts():
+            os.remove(path)
+
+
+def posting_fingerprints(df):
+    """
+    This function returns the fingerprint of each posting from its normalized Job, Company, Location and salary.
+
+    The company names are compared regardless of letter case and spacing, and the salaries
+    to the cent, so the same posting published again gets the same fingerprint.
+
+    Input:
+    1. df : Cleaned vacancies with the columns of Dataset_Clean.csv (Pandas dataframe).
+
+    Output:
+    1. NumPy array of 64-bit fingerprints (int64).
+    """
+    company = df['Company'].astype(str).str.casefold().str.split().str.join(' ')
+    salary = df['Average Salary'].map(lambda value: '' if value != value else f'{value:.2f}')
+    keys = df['Job'].astype(str) + '\x1f' + company + '\x1f' + df['Location'].astype(str).str.strip() + '\x1f' + salary
+
+    digests = b''.join(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest() for key in keys)
+    return np.frombuffer(digests, dtype=np.int64).copy()
+
+
+def _as_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+def _write_atomic(path, write):
+    # Writes a file through a temporary file renamed once complete
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(prefix='.part-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class SnapshotStore:
+    """
+    Append-only store of the postings of repeated scrapes, partitioned by scrape date.
+
+    Each posting is identified by its fingerprint (see posting_fingerprints) and stored only
+    once, in the partition of the date it was first seen; every later scrape only records
+    the fingerprints it saw. An index keeps the first-seen and last-seen dates of every
+    posting, so a query over a date range only reads the partitions holding its postings.
+
+    Layout of the directory:
+    - postings/date=YYYY-MM-DD/part-NNNNNN.csv: new postings of a batch (Fingerprint plus
+      the columns of Dataset_Clean.csv),
+    - sightings/date=YYYY-MM-DD/part-NNNNNN.npy: fingerprints seen in a batch,
+    - index.npz and index.json: first-seen and last-seen dates of every posting, the date
+      of the partition holding it, and the sighting files already folded into them.
+
+    Every file is written into a temporary file renamed once complete, and the index is
+    rebuilt from the sighting files it misses when the store is opened, so a crash loses
+    at most the batch being written.
+
+    It requires 1 input (plus 1 optional one):
+    1. directory : Directory of the store, created if needed (String).
+    2. scrape_date : Date of the scrape appended by append; today if None (String or date).
+    """
+
+    def __init__(self, directory, scrape_date=None):
+        self.directory = directory
+        self.scrape_date = _as_date(scrape_date or datetime.date.today())
+        os.makedirs(directory, exist_ok=True)
+
+        self._positions = {}
+        self._fingerprints = []
+        self._first_seen = []
+        self._last_seen = []
+        self._stored = []
+        self._folded = set()
+        self._load_index()
+
+    @staticmethod
+    def _day(date):
+        return (_as_date(date) - EPOCH).days
+
+    def _partition(self, kind, date):
+        return os.path.join(self.directory, kind, f'date={_as_date(date).isoformat()}')
+
+    def _parts(self, kind, date):
+        directory = self._partition(kind, date)
+        if not os.path.isdir(directory):
+            return []
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                if name.startswith('part-') and not name.endswith('.tmp')]
+
+    def dates(self):
+        """
+        This function returns the scrape dates of the store, in order.
+        """
+        directory = os.path.join(self.directory, 'sightings')
+        if not os.path.isdir(directory):
+            return []
+        return sorted(_as_date(name.split('=', 1)[1]) for name in os.listdir(directory) if name.startswith('date='))
+
+    def _load_index(self):
+        index_path = os.path.join(self.directory, 'index.npz')
+        meta_path = os.path.join(self.directory, 'index.json')
+        if os.path.exists(index_path) and os.path.exists(meta_path):
+            with np.load(index_path) as index:
+                self._fingerprints = index['fingerprint'].tolist()
+                self._first_seen = index['first_seen'].tolist()
+                self._last_seen = index['last_seen'].tolist()
+                self._stored = index['stored'].tolist()
+            with open(meta_path, encoding='utf-8') as file:
+                self._folded = set(json.load(file)['folded'])
+            self._positions = {fingerprint: position for position, fingerprint in enumerate(self._fingerprints)}
+
+        # Sightings written after the last save of the index (e.g., before a crash)
+        for date in self.dates():
+            for path in self._parts('sightings', date):
+                name = os.path.relpath(path, self.directory)
+                if name not in self._folded:
+                    self._fold(np.load(path), self._day(date))
+                    self._folded.add(name)
+
+    def _fold(self, fingerprints, day):
+        for fingerprint in fingerprints.tolist():
+            position = self._positions.get(fingerprint)
+            if position is None:
+                self._positions[fingerprint] = len(self._fingerprints)
+                self._fingerprints.append(fingerprint)
+                self._first_seen.append(day)
+                self._last_seen.append(day)
+                self._stored.append(day)
+            else:
+                self._first_seen[position] = min(self._first_seen[position], day)
+                self._last_seen[position] = max(self._last_seen[position], day)
+
+    def save_index(self):
+        """
+        This function saves the index, so the next opening of the store does not rebuild it.
+        """
+        arrays = {'fingerprint': np.array(self._fingerprints, dtype=np.int64),
+                  'first_seen': np.array(self._first_seen, dtype=np.int32),
+                  'last_seen': np.array(self._last_seen, dtype=np.int32),
+                  'stored': np.array(self._stored, dtype=np.int32)}
+        _write_atomic(os.path.join(self.directory, 'index.npz'), lambda file: np.savez(file, **arrays))
+        meta = json.dumps({'folded': sorted(self._folded)}, indent=1).encode('utf-8')
+        _write_atomic(os.path.join(self.directory, 'index.json'), lambda file: file.write(meta))
+
+    def append(self, batch, scrape_date=None):
+        """
+        This function records a batch of cleaned vacancies seen on a scrape date.
+
+        The postings never seen before are stored in the partition of the date; for the other
+        ones, only their fingerprint is recorded, which extends their last-seen date.
+
+        It requires 1 input (plus 1 optional one):
+        1. batch : Cleaned vacancies with the columns of Dataset_Clean.csv (Pandas dataframe).
+        2. scrape_date : Date of the scrape; the date of the store if None (String or date).
+
+        Output:
+        1. Number of new postings in the batch (Integer).
+        """
+        if len(batch) == 0:
+            return 0
+        date = _as_date(scrape_date or self.scrape_date)
+        day = self._day(date)
+
+        fingerprints = posting_fingerprints(batch)
+        unique, first = np.unique(fingerprints, return_index=True)
+        new = np.array([fingerprint not in self._positions for fingerprint in unique.tolist()], dtype=bool)
+        rows = np.sort(first[new])
+
+        number = len(self._parts('sightings', date)) + 1
+        if len(rows):
+            postings = batch.iloc[rows][CLEAN_COLUMNS].copy()
+            postings.insert(0, 'Fingerprint', fingerprints[rows])
+            path = os.path.join(self._partition('postings', date), f'part-{number:06d}.csv')
+            _write_atomic(path, lambda file: file.write(postings.to_csv(index=False).encode('utf-8')))
+
+        # The sightings are written last: they make the batch part of the store
+        path = os.path.join(self._partition('sightings', date), f'part-{number:06d}.npy')
+        _write_atomic(path, lambda file: np.save(file, unique))
+        self._fold(unique, day)
+        self._folded.add(os.path.relpath(path, self.directory))
+        return int(new.sum())
+
+    def index(self):
+        """
+        This function returns the fingerprint, first-seen and last-seen dates of every posting (Pandas dataframe).
+        """
+        return pd.DataFrame({'Fingerprint': np.array(self._fingerprints, dtype=np.int64),
+                             'First Seen': EPOCH_DAY + np.array(self._first_seen, dtype='timedelta64[D]'),
+                             'Last Seen': EPOCH_DAY + np.array(self._last_seen, dtype='timedelta64[D]')})
+
+    def read(self, start=None, end=None, new_only=False):
+        """
+        This function returns the postings seen within a range of scrape dates.
+
+        Only the partitions holding the selected postings are read.
+
+        It requires 3 optional inputs:
+        1. start : First scrape date of the range, None for no lower bound (String or date).
+        2. end : Last scrape date of the range, None for no upper bound (String or date).
+        3. new_only : Whether to select only the postings first seen within the range, instead
+           of every posting seen at least once within it (Boolean).
+
+        Output:
+        1. Pandas dataframe with the columns of Dataset_Clean.csv plus First Seen and Last Seen.
+        """
+        first_seen = np.array(self._first_seen, dtype=np.int64)
+        last_seen = np.array(self._last_seen, dtype=np.int64)
+        low = self._day(start) if start is not None else np.iinfo(np.int64).min
+        high = self._day(end) if end is not None else np.iinfo(np.int64).max
+
+        fingerprints = np.array(self._fingerprints, dtype=np.int64)
+        selected = (first_seen <= high) & ((first_seen >= low) if new_only else (last_seen >= low))
+        if not new_only:
+            # A posting first seen before the range and last seen after it may have been missed by every scrape
+            # within it: it is kept only if a sighting partition of the range holds it
+            spanning = selected & (first_seen < low) & (last_seen > high)
+            if spanning.any():
+                seen = [np.load(path) for date in self.dates() if low <= self._day(date) <= high
+                        for path in self._parts('sightings', date)]
+                selected[spanning] = np.isin(fingerprints[spanning], np.concatenate(seen) if seen else [])
+        fingerprints = fingerprints[selected]
+
+        parts = []
+        # Partition of each posting: the date it was stored, usually its first-seen date
+        # (unless an older scrape was appended later)
+        for day in np.unique(np.array(self._stored, dtype=np.int64)[selected]).tolist():
+            parts.extend(pd.read_csv(path) for path in self._parts('postings', EPOCH + datetime.timedelta(days=day)))
+
+        columns = ['Fingerprint'] + CLEAN_COLUMNS
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+        df = df[df['Fingerprint'].isin(fingerprints)].drop_duplicates('Fingerprint')
+
+        df = df.merge(self.index(), on='Fingerprint', how='left')
+        return df.drop(columns='Fingerprint').reset_index(drop=True)
+
+    def stats(self):
+        return {'postings': len(self._fingerprints), 'dates': [date.isoformat() for date in self.dates()]}
@@ -0,0 +1,80 @@
+### PRODUCTION ENTRY POINT OF THE DASHBOARD
+
+"""
+WSGI entry point of the dashboard for a pre-forking server such as Gunicorn, instead of the
+development server of 'python 4-Dashboard.py' (single process, debug mode and reloader on):
+
+gunicorn --preload --workers 4 --bind 0.0.0.0:8050 'wsgi:create_app()'
+
+With --preload, the app is created once in the master process before the workers are forked:
+the dataset is memory-mapped from its read-only columnar snapshot (see data_loader.py) and the
+filter index, the simplified map and the layout are built once, so every worker shares the
+same physical pages instead of loading, parsing and indexing its own copy of the data. Without
+--preload, each worker maps the same snapshot files, whose pages are still shared through the
+page cache of the operating system, but builds its own index.
+
+The state of the callbacks does not depend on the worker serving them: the filter state sent
+by the browser carries the filters, so a worker that did not compute the filtered rows of a
+state rebuilds them (see filter_store.py).
+
+Before serving, the caches are warmed up with the figures of the six plots for the most
+common filter states (see figure_bundle.py), read from the static bundle exported at deploy
+time when there is one, so the first visitors do not wait for them; with --preload, the
+workers inherit them. The salary tests are left out of this warm-up: in the master process,
+their caches would only reach the workers as copy-on-write pages, so each worker computes
+them on its first requests.
+
+With DASHBOARD_RELOAD_INTERVAL set, each worker watches the source of the dataset from its
+first request on (the threads of the master process do not survive the fork) and swaps in
+the new versions on its own (see dataset_reload.py).
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_dashboard():
+    """
+    This function imports 4-Dashboard.py as the module 'dashboard' and returns it.
+
+    The module is imported once per process (4-Dashboard.py is not an importable module name).
+    """
+    if 'dashboard' in sys.modules:
+        return sys.modules['dashboard']
+
+    spec = importlib.util.spec_from_file_location('dashboard', os.path.join(ROOT, '4-Dashboard.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['dashboard'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_app(dataset=None, snapshot=None, warm_up=None):
+    """
+    This function creates the dashboard, warms up its caches and returns its WSGI application.
+
+    It requires 3 optional inputs; the first two default to the environment variables DASHBOARD_DATASET
+    and DASHBOARD_SNAPSHOT (and then to the local 'Dataset_Clean.csv' and 'snapshot/' directory):
+    1. dataset : Path of the CSV file with the dataset, or directory of a store of pipeline.py (String).
+    2. snapshot : Directory of the memory-mapped snapshot of the CSV file (String).
+    3. warm_up : Whether to compute the figures of the six plots for the common filter states before serving
+       (Boolean; by default, unless the environment variable DASHBOARD_WARM_UP is set to 0).
+
+    Output:
+    1. Flask application serving the dashboard (WSGI callable).
+    """
+    if dataset is not None:
+        os.environ['DASHBOARD_DATASET'] = dataset
+    if snapshot is not None:
+        os.environ['DASHBOARD_SNAPSHOT'] = snapshot
+
+    dashboard = load_dashboard()
+    if warm_up is None:
+        warm_up = os.environ.get('DASHBOARD_WARM_UP', '1') != '0'
+    if warm_up:
+        # Possibly in the master process of a pre-forking server: the salary tests are computed by each worker
+        dashboard.warm_up(plots=list(dashboard.figures.values()))
+    return dashboard.app.server